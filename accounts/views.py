@@ -1,6 +1,3 @@
-import os
-import boto3
-
 from django import forms
 from django.core.files.images import get_image_dimensions
 from django.core.urlresolvers import reverse
@@ -10,6 +7,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views import generic
+from django.views.decorators.http import require_http_methods
+from songs.s3 import S3AvatarUploadClient
 from users.models import Profile, Skill
 
 from .forms import UserProfileForm
@@ -84,17 +83,16 @@ def password_reset_complete(request):
 
 
 @login_required
+@require_http_methods(["POST"])
 def avatar_upload(request, **kwargs):
     if request.POST:
         avatar_file = request.FILES.get('avatar')
         user = request.user
 
-        s3_bucket = os.environ.get('S3_BUCKET')
-        s3_avatar_bucket_path = '%s/avatars/%s' % (user, avatar_file.name)
-        s3_avatar_file_path = 'https://s3-us-west-2.amazonaws.com/%s/%s' % (s3_bucket, s3_avatar_bucket_path)
+        upload_client = S3AvatarUploadClient(user, avatar_file.name, avatar_file.content_type)
 
         form = UserProfileForm({
-            'avatar_url': s3_avatar_file_path,
+            'avatar_url': upload_client.get_upload_url(),
             'avatar_file_name': avatar_file.name
         })
 
@@ -112,11 +110,7 @@ def avatar_upload(request, **kwargs):
         if form.is_valid():
             form.save()
 
-            s3_client = boto3.client('s3')
-            s3_client.upload_fileobj(avatar_file, s3_bucket, s3_avatar_bucket_path, ExtraArgs={
-                'ACL': 'public-read',
-                'ContentType': avatar_file.content_type
-            })
+            upload_client.upload_file_obj(avatar_file)
 
             messages.success(request, 'Profile photo uploaded')
 
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'created')
+    readonly_fields = ('last_error',)
+    search_fields = ('name',)
+    list_filter = ('status', 'name', 'created')
+
+
+admin.site.register(Job, JobAdmin)
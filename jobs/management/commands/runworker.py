@@ -0,0 +1,42 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import Worker
+
+
+def run_worker(poll_interval):
+    Worker(poll_interval=poll_interval).run()
+
+
+class Command(BaseCommand):
+    help = 'Runs background job workers until stopped, each worker process runs one job at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        if options['processes'] == 1:
+            return run_worker(options['poll_interval'])
+
+        # forked workers must not share the parent's database connection
+        connections.close_all()
+        processes = [multiprocessing.Process(target=run_worker, args=(options['poll_interval'],))
+                     for _ in range(options['processes'])]
+
+        for process in processes:
+            process.start()
+
+        def stop(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        for process in processes:
+            process.join()
@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    )
+
+    # module:qualname of the function registered with @job
+    name = models.CharField(max_length=255)
+    arguments = models.TextField(default='[[], {}]')
+    priority = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    # seconds a worker may hold a running job before another worker assumes it died and takes the job over
+    timeout = models.IntegerField(default=600)
+    # when a queued job becomes due, or when the claim on a running job expires
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '%s [%s]' % (self.name, self.status)
+
+    class Meta:
+        db_table = 'jobs_jobs'
+        index_together = (("status", "run_at"),)
@@ -0,0 +1,140 @@
+import importlib
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models
+from django.utils import timezone
+
+from .models import Job
+
+DEFAULT_RETRY_DELAY = 10
+
+CLAIM_JOB_SQL = '''
+    UPDATE jobs_jobs
+    SET status = %s, attempts = attempts + 1, locked_by = %s, run_at = %s + timeout * interval '1 second',
+        updated = %s
+    WHERE id = (
+        SELECT id FROM jobs_jobs
+        WHERE status IN (%s, %s) AND run_at <= %s
+        ORDER BY priority DESC, run_at, id
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    RETURNING id
+'''
+
+
+class JobEncoder(DjangoJSONEncoder):
+    """
+    Model instances are passed to jobs by reference and fetched again when the job runs.
+    """
+
+    def default(self, o):
+        if isinstance(o, models.Model):
+            return {'__model__': o._meta.label, 'pk': o.pk}
+
+        return super().default(o)
+
+
+def decode_job_object(value):
+    if '__model__' in value:
+        return apps.get_model(value['__model__'])._default_manager.get(pk=value['pk'])
+
+    return value
+
+
+def get_job_name(func):
+    return '%s:%s' % (func.__module__, func.__qualname__)
+
+
+def get_job_function(name):
+    module_name, qualname = name.split(':')
+    func = importlib.import_module(module_name)
+
+    for attribute in qualname.split('.'):
+        func = getattr(func, attribute)
+
+    return func
+
+
+def enqueue(func, args=(), kwargs=None, priority=0, max_attempts=3, timeout=600, unique=False, run_at=None):
+    name = get_job_name(func)
+    arguments = json.dumps([args, kwargs or {}], cls=JobEncoder, sort_keys=True)
+
+    # a job that has not been picked up yet will already see the latest state when it runs
+    if unique and Job.objects.filter(name=name, arguments=arguments, status=Job.QUEUED).exists():
+        return None
+
+    return Job.objects.create(name=name, arguments=arguments, priority=priority, max_attempts=max_attempts,
+                              timeout=timeout, run_at=run_at or timezone.now())
+
+
+def job(priority=0, max_attempts=3, timeout=600, retry_delay=DEFAULT_RETRY_DELAY, unique=False):
+    """
+    Registers a function as a job, `func.enqueue(*args, **kwargs)` then queues a call for the workers instead of
+    running it, `func.enqueue_at(run_at, *args, **kwargs)` a call that is not due before `run_at`. Arguments have
+    to be json serializable or model instances. The job row is written in the current transaction, so workers only
+    see it once the caller commits.
+    """
+
+    def decorator(func):
+        def enqueue_call(*args, **kwargs):
+            return enqueue(func, args, kwargs, priority=priority, max_attempts=max_attempts, timeout=timeout,
+                           unique=unique)
+
+        def enqueue_at_call(run_at, *args, **kwargs):
+            return enqueue(func, args, kwargs, priority=priority, max_attempts=max_attempts, timeout=timeout,
+                           unique=unique, run_at=run_at)
+
+        func.enqueue = enqueue_call
+        func.enqueue_at = enqueue_at_call
+        func.retry_delay = retry_delay
+        return func
+
+    return decorator
+
+
+def claim_job(worker_name):
+    now = timezone.now()
+
+    with connection.cursor() as cursor:
+        cursor.execute(CLAIM_JOB_SQL, [Job.RUNNING, worker_name, now, now, Job.QUEUED, Job.RUNNING, now])
+        row = cursor.fetchone()
+
+    return Job.objects.get(pk=row[0]) if row else None
+
+
+def run_job(job):
+    if job.attempts > job.max_attempts:
+        # the last attempt took its worker down with it
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, locked_by=None)
+        logging.error('job [%s] %s timed out on its final attempt' % (job.pk, job.name))
+        return False
+
+    func = None
+
+    try:
+        func = get_job_function(job.name)
+        args, kwargs = json.loads(job.arguments, object_hook=decode_job_object)
+        func(*args, **kwargs)
+    except Exception:
+        logging.exception('job [%s] %s failed on attempt [%s]' % (job.pk, job.name, job.attempts))
+        fail_job(job, traceback.format_exc(), getattr(func, 'retry_delay', DEFAULT_RETRY_DELAY))
+        return False
+
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).delete()
+    return True
+
+
+def fail_job(job, error, retry_delay):
+    if job.attempts < job.max_attempts:
+        status, run_at = Job.QUEUED, timezone.now() + timedelta(seconds=retry_delay * 2 ** (job.attempts - 1))
+    else:
+        status, run_at = Job.FAILED, job.run_at
+
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(status=status, run_at=run_at, locked_by=None,
+                                                                  last_error=error)
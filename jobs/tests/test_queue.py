@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Job
+from ..queue import claim_job, job, run_job
+from ..worker import Worker
+
+calls = []
+
+
+@job()
+def record_call(*args, **kwargs):
+    calls.append((args, kwargs))
+
+
+@job(unique=True)
+def record_unique_call(*args):
+    calls.append((args, {}))
+
+
+@job(max_attempts=2, retry_delay=60)
+def fail():
+    raise ValueError('job failed')
+
+
+class JobQueueTestCase(TestCase):
+    def setUp(self):
+        del calls[:]
+        self.worker = Worker(name='test-worker')
+
+    def test_enqueue_runs_job_with_model_arguments(self):
+        user = User.objects.create_user(username='creator', password='password')
+        record_call.enqueue(1, 'two', user=user)
+
+        self.assertTrue(self.worker.run_next_job())
+        self.assertEqual(calls, [((1, 'two'), {'user': user})])
+        self.assertFalse(Job.objects.exists())
+        self.assertFalse(self.worker.run_next_job())
+
+    def test_jobs_run_by_priority(self):
+        record_call.enqueue('low')
+        Job.objects.filter(pk=record_call.enqueue('high').pk).update(priority=10)
+
+        self.worker.run_next_job()
+        self.worker.run_next_job()
+
+        self.assertEqual([args for args, _ in calls], [('high',), ('low',)])
+
+    def test_unique_job_is_queued_once(self):
+        self.assertIsNotNone(record_unique_call.enqueue('song'))
+        self.assertIsNone(record_unique_call.enqueue('song'))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_job_enqueued_at_a_later_time_waits_until_due(self):
+        record_call.enqueue_at(timezone.now() + timedelta(minutes=5), 'later')
+
+        self.assertFalse(self.worker.run_next_job())
+
+        Job.objects.update(run_at=timezone.now())
+        self.assertTrue(self.worker.run_next_job())
+        self.assertEqual(calls, [(('later',), {})])
+
+    def test_failed_job_backs_off_then_fails(self):
+        fail.enqueue()
+
+        self.worker.run_next_job()
+        failed_job = Job.objects.get()
+        self.assertEqual(failed_job.status, Job.QUEUED)
+        self.assertEqual(failed_job.attempts, 1)
+        self.assertIn('job failed', failed_job.last_error)
+        self.assertGreater(failed_job.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertFalse(self.worker.run_next_job())
+
+        Job.objects.update(run_at=timezone.now())
+        self.worker.run_next_job()
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+        self.assertFalse(self.worker.run_next_job())
+
+    def test_expired_running_job_is_claimed_again(self):
+        record_call.enqueue()
+        claimed_job = claim_job('dead-worker')
+
+        self.assertIsNone(claim_job('test-worker'))
+
+        Job.objects.update(run_at=timezone.now() - timedelta(seconds=1))
+        reclaimed_job = claim_job('test-worker')
+
+        self.assertEqual(reclaimed_job.pk, claimed_job.pk)
+        self.assertEqual(reclaimed_job.attempts, 2)
+        self.assertTrue(run_job(reclaimed_job))
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,49 @@
+import logging
+import os
+import signal
+import socket
+import time
+
+from django.db import close_old_connections, connection
+
+from .queue import claim_job, run_job
+
+
+class Worker:
+    """
+    Claims and runs one job at a time until asked to stop. A stop request lets the current job finish, a job whose
+    worker is killed outright is picked up again once its timeout passes.
+    """
+
+    def __init__(self, name=None, poll_interval=1.0):
+        self.name = name or '%s:%s' % (socket.gethostname(), os.getpid())
+        self.poll_interval = poll_interval
+        self.stopping = False
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logging.info('worker [%s] started' % self.name)
+
+        try:
+            while not self.stopping:
+                close_old_connections()
+
+                if not self.run_next_job():
+                    time.sleep(self.poll_interval)
+        finally:
+            connection.close()
+            logging.info('worker [%s] stopped' % self.name)
+
+    def run_next_job(self):
+        job = claim_job(self.name)
+
+        if not job:
+            return False
+
+        logging.info('worker [%s] running job [%s] %s' % (self.name, job.pk, job.name))
+        run_job(job)
+        return True
@@ -0,0 +1,94 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+
+def get_version_key(scope, pk):
+    return 'version:%s:%s' % (scope, pk)
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            # a fresh counter never repeats a version an evicted one already handed out
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def bump_versions(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), None)
+
+
+def bump_song_versions(*song_ids):
+    bump_versions([get_version_key('song', pk) for pk in set(song_ids) if pk])
+
+
+def bump_user_versions(*user_ids):
+    bump_versions([get_version_key('user', pk) for pk in set(user_ids) if pk])
+
+
+def get_versioned_key(prefix, version_keys):
+    """
+    Returns a cache key that changes whenever one of the versions it was built from is bumped, so stale entries are
+    never read again and simply expire.
+    """
+    return '%s:%s' % (prefix, ':'.join(str(version) for version in get_versions(version_keys)))
+
+
+def get_user_id(username):
+    key = 'user_id:%s' % username
+    user_id = cache.get(key)
+
+    if user_id is None:
+        user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+        cache.set(key, user_id, None)
+
+    return user_id
+
+
+def set_user_id(username, user_id):
+    cache.set('user_id:%s' % username, user_id, None)
+
+
+class AnonymousPageCacheMixin(object):
+    """
+    Serves anonymous GET requests from a cached copy of the rendered page, keyed by the versions
+    `get_page_cache_version_keys` returns. Pages that hand out a csrf token or flash a message are never cached.
+    """
+    page_cache_timeout = settings.PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_version_keys(self):
+        raise NotImplementedError('subclasses of AnonymousPageCacheMixin must provide get_page_cache_version_keys()')
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated() or 'messages' in request.COOKIES:
+            return super().dispatch(request, *args, **kwargs)
+
+        path_digest = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+        key = get_versioned_key('page:%s' % path_digest, self.get_page_cache_version_keys())
+        response = cache.get(key)
+
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+
+        def cache_response(rendered_response):
+            if rendered_response.status_code == 200 and not request.META.get('CSRF_COOKIE_USED'):
+                cache.set(key, rendered_response, self.page_cache_timeout)
+
+        if hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(cache_response)
+
+        return response
@@ -0,0 +1,216 @@
+import json
+import math
+import os
+import random
+import resource
+import time
+import tracemalloc
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.urlresolvers import reverse
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from faker import Factory
+
+from melody_buddy.storage import S3Storage
+from songs.models import Song, SongStats, Track, TrackRequest
+from songs.notifications import NotificationTypes
+from songs.s3 import S3BaseUploadClient
+from songs.s3_local import LocalS3Client
+from users.models import Profile, Skill
+
+# the views timed, with the url kwargs of the seeded user and song
+BENCHMARK_VIEWS = (
+    ('songs:index', ()),
+    ('songs:detail', ('pk',)),
+    ('songs:download', ('pk',)),
+    ('users:track_requests', ('username',)),
+    ('accounts:edit', ()),
+)
+INSTRUMENTS = [value for category, instruments in Skill.SKILL_CHOICES for value, name in instruments]
+
+
+def get_percentile(values, percentile):
+    ordered = sorted(values)
+    return ordered[max(int(math.ceil(percentile / 100 * len(ordered))) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = 'Seeds a throwaway database with a fake catalogue and times the busiest views against a local s3 stand in'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--songs', type=int, default=200)
+        parser.add_argument('--tracks', type=int, default=4, help='tracks per song')
+        parser.add_argument('--skills', type=int, default=3, help='skills per user')
+        parser.add_argument('--track-requests', type=int, default=2, help='track requests per song')
+        parser.add_argument('--notifications', type=int, default=5, help='notifications per user')
+        parser.add_argument('--track-size', type=int, default=256 * 1024, help='bytes per downloadable track')
+        parser.add_argument('--requests', type=int, default=30, help='timed requests per view')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default=None, help='json file the results are written to')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        s3_client = LocalS3Client()
+        original_storage = S3BaseUploadClient.storage
+        S3BaseUploadClient.storage = S3Storage(s3_client)
+
+        try:
+            started = time.time()
+            user, song = self.seed(s3_client, options)
+            seed_time = time.time() - started
+
+            client = Client()
+            client.force_login(user)
+            results = {}
+
+            values = {'pk': song.pk, 'username': user.username}
+
+            for view_name, kwarg_names in BENCHMARK_VIEWS:
+                url = reverse(view_name, kwargs={name: values[name] for name in kwarg_names})
+                results[view_name] = self.time_view(client, url, options['requests'])
+        finally:
+            S3BaseUploadClient.storage = original_storage
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'catalogue': {name: options[name] for name in (
+                'users', 'songs', 'tracks', 'skills', 'track_requests', 'notifications', 'track_size', 'seed')},
+            'requests': options['requests'],
+            'seed_seconds': round(seed_time, 3),
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'views': results,
+        }
+
+        self.stdout.write('%-22s %6s %10s %10s %8s %12s' % ('view', 'status', 'p50', 'p95', 'queries', 'peak memory'))
+
+        for view_name, kwarg_names in BENCHMARK_VIEWS:
+            result = results[view_name]
+            self.stdout.write('%-22s %6d %8.1fms %8.1fms %8d %10.1fkb' % (
+                view_name, result['status'], result['p50_ms'], result['p95_ms'], result['queries'],
+                result['peak_memory_bytes'] / 1024))
+
+        output = options['output'] or 'benchmark-%s.json' % timezone.now().strftime('%Y%m%d-%H%M%S')
+
+        with open(output, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+
+        self.stdout.write('results written to [%s]' % output)
+
+    @transaction.atomic
+    def seed(self, s3_client, options):
+        """
+        Returns the user the views are requested as and their song the song views are timed on. Rows are created one
+        by one so every signal keeps its counters and caches current.
+        """
+        fake = Factory.create()
+        fake.seed(options['seed'])
+        rand = random.Random(options['seed'])
+        users = []
+
+        for index in range(options['users']):
+            user = User.objects.create_user(username='%s%d' % (fake.user_name(), index), email=fake.email(),
+                                            password='password', first_name=fake.first_name(),
+                                            last_name=fake.last_name())
+            Profile.objects.create(user=user)
+
+            for name in rand.sample(INSTRUMENTS, min(options['skills'], len(INSTRUMENTS))):
+                Skill.objects.create(user=user, name=name)
+
+            users.append(user)
+
+        songs = []
+        track_requests = []
+
+        for index in range(options['songs']):
+            creator = users[index % len(users)]
+            song = Song.objects.create(title=fake.sentence(nb_words=3)[:200], description=fake.text(),
+                                       created_by=creator)
+            SongStats.objects.create(song=song)
+            public_tracks = []
+
+            for track_index in range(options['tracks']):
+                # the last track of every song is an open slot waiting for contributions
+                public = track_index == options['tracks'] - 1
+                track = Track(instrument=rand.choice(INSTRUMENTS), created_by=creator, song=song, public=public,
+                              audio_name='%s.mp3' % track_index, audio_content_type='audio/mp3',
+                              audio_size=options['track_size'])
+
+                if not public:
+                    s3_key = 'benchmark/songs/%s/tracks/%s.mp3' % (song.uuid, track.uuid)
+                    track.audio_url = S3BaseUploadClient.storage.url(s3_key)
+
+                    # only the timed song is ever downloaded, the rest of the catalogue keeps no audio in memory
+                    if index == 0:
+                        s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=s3_key,
+                                             Body=os.urandom(options['track_size']))
+
+                track.save()
+
+                if public:
+                    public_tracks.append(track)
+
+            for _ in range(options['track_requests'] if public_tracks else 0):
+                contributor = rand.choice([user for user in users if user != creator] or users)
+                track_requests.append(TrackRequest.objects.create(
+                    track=rand.choice(public_tracks), created_by=contributor,
+                    status=rand.choice([status for status, name in TrackRequest.STATUS_CHOICES]),
+                    audio_url='https://example.com/%s.mp3' % uuid.uuid4(), audio_name='%s.mp3' % fake.word(),
+                    audio_content_type='audio/mp3'))
+
+            songs.append(song)
+
+        for user in users:
+            for _ in range(options['notifications'] if track_requests else 0):
+                track_request = rand.choice(track_requests)
+                NotificationTypes.track_request_pending(track_request.created_by, recipient=user,
+                                                        action_object=track_request, target=track_request.track.song)
+
+        return users[0], songs[0]
+
+    def time_view(self, client, url, request_count):
+        # the first request warms the caches and builds the song archive, only the ones after it are timed
+        status, queries = self.request(client, url)
+        timings = []
+
+        for _ in range(request_count):
+            started = time.perf_counter()
+            status, queries = self.request(client, url)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        tracemalloc.start()
+
+        try:
+            self.request(client, url)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'url': url,
+            'status': status,
+            'p50_ms': round(get_percentile(timings, 50), 3),
+            'p95_ms': round(get_percentile(timings, 95), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries': queries,
+            'peak_memory_bytes': peak_memory,
+        }
+
+    def request(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+            # streamed responses do most of their work while they are read
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+
+        return response.status_code, len(queries)
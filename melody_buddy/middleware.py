@@ -0,0 +1,47 @@
+import logging
+from collections import Counter
+
+from django.db import connection
+
+logger = logging.getLogger('melody_buddy.queries')
+
+
+def get_query_stats(queries):
+    """
+    Returns the number of queries, their total time in milliseconds and how many of them repeat a query already run
+    with the same sql and parameters.
+    """
+    total_time = sum(float(query['time']) for query in queries) * 1000
+    duplicates = sum(count - 1 for count in Counter(query['sql'] for query in queries).values())
+
+    return len(queries), total_time, duplicates
+
+
+class QueryBudgetMiddleware(object):
+    """
+    Records the queries every request runs and reports them per resolved view in the X-Query-Count, X-Query-Time and
+    X-Query-Duplicates headers and a log line. Only meant for debug and test settings, it keeps every query in memory.
+    """
+
+    def process_request(self, request):
+        request._query_log_start = len(connection.queries_log)
+        request._query_force_debug_cursor = connection.force_debug_cursor
+        connection.force_debug_cursor = True
+
+    def process_response(self, request, response):
+        if not hasattr(request, '_query_log_start'):
+            return response
+
+        connection.force_debug_cursor = request._query_force_debug_cursor
+        count, total_time, duplicates = get_query_stats(list(connection.queries_log)[request._query_log_start:])
+        resolver_match = getattr(request, 'resolver_match', None)
+        view_name = resolver_match.view_name if resolver_match else request.path
+
+        response['X-Query-Count'] = count
+        response['X-Query-Time'] = '%.1f' % total_time
+        response['X-Query-Duplicates'] = duplicates
+
+        logger.info('view [%s] ran [%d] queries in [%.1fms], [%d] duplicates', view_name, count, total_time,
+                    duplicates)
+
+        return response
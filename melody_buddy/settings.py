@@ -10,6 +10,7 @@ https://docs.djangoproject.com/en/1.8/ref/settings/
 """
 
 import os
+import sys
 import dj_database_url
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -24,6 +25,8 @@ SECRET_KEY = 'i+acxn5(akgsn!sr4^qgf(^m&*@+g1@u^t@=8s@axc41ml*f=s'
 
 DEBUG = os.environ.get('MELODY_BUDDY_DEBUG')
 
+TESTING = sys.argv[1:2] == ['test']
+
 # Application definition
 
 INSTALLED_APPS = (
@@ -39,6 +42,7 @@ INSTALLED_APPS = (
     'songs.apps.SongsConfig',
     'users.apps.UsersConfig',
     'accounts.apps.AccountsConfig',
+    'jobs.apps.JobsConfig',
     'registration.backends.simple',
     'melody_buddy',
     'notifications'
@@ -55,6 +59,10 @@ MIDDLEWARE_CLASSES = (
     'django.middleware.security.SecurityMiddleware',
 )
 
+# reports the queries of every request in response headers and the melody_buddy.queries log
+if DEBUG or TESTING:
+    MIDDLEWARE_CLASSES = ('melody_buddy.middleware.QueryBudgetMiddleware',) + MIDDLEWARE_CLASSES
+
 SITE_ID = 1
 
 ROOT_URLCONF = 'melody_buddy.urls'
@@ -127,9 +135,44 @@ LOGGING = {
             'handlers': ['console'],
             'level': os.getenv('DJANGO_LOG_LEVEL', 'ERROR'),
         },
+        'melody_buddy.queries': {
+            'handlers': ['console'],
+            'level': os.getenv('QUERY_LOG_LEVEL', 'INFO' if DEBUG else 'WARNING'),
+        },
+    },
+}
+
+# Caches
+# https://docs.djangoproject.com/en/1.9/topics/cache/
+# local memory caches are per process, run more than one process with a shared backend such as
+# 'django.core.cache.backends.filebased.FileBasedCache' or a redis backend so version bumps reach every process
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'melody-buddy'),
+        'KEY_PREFIX': 'melody_buddy',
+    },
+    # the opening bytes of the tracks being played, kept in every process so they are served without a storage read
+    'audio': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'melody-buddy-audio',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('AUDIO_CACHE_MAX_ENTRIES', 200)),
+        },
     },
 }
 
+# bytes of the start of every streamed track kept in the audio cache, about 16 seconds of a 128kbps rendition, and
+# the size of the chunks the rest is streamed in
+AUDIO_HEAD_CACHE_BYTES = int(os.environ.get('AUDIO_HEAD_CACHE_BYTES', 256 * 1024))
+AUDIO_STREAM_CHUNK_SIZE = int(os.environ.get('AUDIO_STREAM_CHUNK_SIZE', 64 * 1024))
+
+# seconds anonymous pages and template fragments are kept, their keys change as soon as the songs and users they
+# show are edited
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 5 * 60))
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 10 * 60))
+
 # Password validation
 # https://docs.djangoproject.com/en/1.9/ref/settings/#auth-password-validators
 
@@ -187,3 +230,33 @@ LOGIN_URL = '/accounts/login/'
 
 # attach extra arguments to notify.send(...) will be serialized as json data
 NOTIFICATIONS_USE_JSONFIELD=True
+
+# where uploaded audio, avatars and everything generated from them are stored, set STORAGE_BACKEND to
+# 'melody_buddy.storage.LocalFileStorage' to keep them on disk under STORAGE_ROOT instead of in the s3 bucket
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'melody_buddy.storage.S3Storage')
+STORAGE_ROOT = os.environ.get('STORAGE_ROOT', os.path.join(BASE_DIR, 'storage'))
+STORAGE_URL = '/storage/'
+S3_BUCKET = os.environ.get('S3_BUCKET')
+S3_DOMAIN = os.environ.get('S3_DOMAIN', 'https://s3-us-west-2.amazonaws.com')
+
+# bound how many s3 objects are fetched at once, per song download and across the whole process
+S3_DOWNLOAD_CONCURRENCY = int(os.environ.get('S3_DOWNLOAD_CONCURRENCY', 4))
+S3_MAX_CONCURRENCY = int(os.environ.get('S3_MAX_CONCURRENCY', 32))
+
+# uploads past the threshold are sent in resumable parts, a few at a time, each retried before the upload gives up
+S3_MULTIPART_THRESHOLD = int(os.environ.get('S3_MULTIPART_THRESHOLD', 16 * 1024 * 1024))
+S3_UPLOAD_CONCURRENCY = int(os.environ.get('S3_UPLOAD_CONCURRENCY', 4))
+S3_UPLOAD_PART_RETRIES = int(os.environ.get('S3_UPLOAD_PART_RETRIES', 3))
+
+# copies within the bucket past the threshold are made in parts by s3
+S3_MULTIPART_COPY_THRESHOLD = int(os.environ.get('S3_MULTIPART_COPY_THRESHOLD', 1024 * 1024 * 1024))
+
+# seconds the request audio of an approved track is kept after the track moved to its own copy, players that
+# loaded the request before the move keep streaming it until then
+APPROVED_AUDIO_DELETE_DELAY = int(os.environ.get('APPROVED_AUDIO_DELETE_DELAY', 60 * 60 * 24))
+
+# seconds song view, like and download counts are buffered per process before they are written to the database
+SONG_STATS_FLUSH_INTERVAL = int(os.environ.get('SONG_STATS_FLUSH_INTERVAL', 10))
+
+# flushes the buffered counts from a thread of each process, tests flush by hand inside their transaction
+SONG_STATS_BACKGROUND_FLUSH = not TESTING
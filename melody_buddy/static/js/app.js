@@ -1,9 +1,11 @@
+import {DirectUpload} from "./components/direct_upload";
 import {MediaPlayer} from "./components/media_player";
 import {Messages} from "./components/messages";
 import {secondsToDateTime} from "./utils/seconds_to_date_time";
 
 window.bm = {
     components: {
+        DirectUpload: DirectUpload,
         MediaPlayer: MediaPlayer,
         Messages: Messages
     },
@@ -28,4 +30,5 @@ $(document).ready(() => {
     $('.modal').modal();
 
     new window.bm.components.Messages();
+    new window.bm.components.DirectUpload();
 });
\ No newline at end of file
@@ -0,0 +1,72 @@
+export class DirectUpload {
+    constructor() {
+        const forms = $('form[data-direct-upload-url]');
+
+        forms.each((index, form) => {
+            new DirectUploadForm($(form));
+        });
+    }
+}
+
+/*
+ * Uploads the chosen audio file straight to s3 before the form is submitted, the form then only carries the signed
+ * upload token instead of the file itself.
+ */
+class DirectUploadForm {
+    constructor($form) {
+        this.$form = $form;
+        this.$file = this.$form.find('input[type=file][name=audio]');
+        this.submitting = false;
+        this.$form.on('submit', __submitHandler.bind(this));
+    }
+}
+
+function __submitHandler(event) {
+    const self = this;
+    const file = self.$file.length ? self.$file[0].files[0] : null;
+
+    if (!file || self.submitting || !window.FormData) {
+        return;
+    }
+
+    event.preventDefault();
+    self.submitting = true;
+    self.$form.find('[type=submit]').prop('disabled', true);
+
+    $.ajax({
+        url: self.$form.data('direct-upload-url'),
+        method: 'POST',
+        data: {
+            content_type: file.type,
+            csrfmiddlewaretoken: self.$form.find('[name=csrfmiddlewaretoken]').val()
+        }
+    }).then(upload => {
+        return __uploadFile(upload.post, file).then(() => upload);
+    }).done(upload => {
+        self.$form.find('[name=audio_upload_token]').val(upload.token);
+        self.$form.find('[name=audio_name]').val(file.name);
+        // the file is already in s3, do not send it a second time
+        self.$file.removeAttr('name');
+    }).fail(() => {
+        console.warn('direct upload failed, sending the audio file with the form instead');
+    }).always(() => {
+        self.$form[0].submit();
+    });
+}
+
+function __uploadFile(presignedPost, file) {
+    const formData = new FormData();
+
+    Object.keys(presignedPost.fields).forEach(field => {
+        formData.append(field, presignedPost.fields[field]);
+    });
+    formData.append('file', file);
+
+    return $.ajax({
+        url: presignedPost.url,
+        method: 'POST',
+        data: formData,
+        processData: false,
+        contentType: false
+    });
+}
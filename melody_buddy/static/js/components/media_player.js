@@ -1,18 +1,22 @@
 export class MediaPlayer {
-    constructor($element, tracks, trackRequests) {
+    constructor($element, manifestUrl, trackRequests) {
         const self = this;
 
         console.log("media player init", $element);
 
         self.$element = $element;
-        self.tracks = tracks || [];
+        self.tracks = [];
         self.trackRequests = trackRequests || [];
 
-        console.log("tracks", self.tracks);
         console.log("track requests", self.trackRequests);
 
+        $.getJSON(manifestUrl).done(manifest => {
+            self.tracks = __getPageTracks.bind(self)(manifest);
+            console.log("tracks", self.tracks);
 
-        self.loadTracks();
+            self.loadTracks();
+            self.$element.find(".media-player__track-changer").change();
+        });
 
         const $controls = {
             '$restart': self.$element.find('.media-player__control--restart'),
@@ -26,7 +30,6 @@ export class MediaPlayer {
 
         self.$element.find(".media-player__track-control--mute").on("click", __handleTrackMuteClick.bind(self));
         self.$element.find(".media-player__track-changer").on("change", __handleTrackRequestChange.bind(self));
-        self.$element.find(".media-player__track-changer").change();
     }
 
     loadTracks() {
@@ -109,7 +112,7 @@ export class MediaPlayer {
 
     getLongestTrack() {
         const self = this,
-            tracksWithMedia = self.tracks.filter(track => !!track.fields.audio_url);
+            tracksWithMedia = self.tracks.filter(track => !!track.audio_url);
 
         let longestTrack = undefined;
 
@@ -143,10 +146,27 @@ export class MediaPlayer {
     }
 }
 
+function __getPageTracks(manifest) {
+    const self = this,
+        $mixdown = self.$element.find('[data-track-id="mixdown"]'),
+        // the page decides which tracks are shown, the manifest only describes them
+        tracks = manifest.filter(track => self.$element.find("#waveform-" + track.pk).length > 0);
+
+    if ($mixdown.length) {
+        tracks.unshift({
+            pk: "mixdown",
+            audio_url: $mixdown.data("audioUrl"),
+            peaks_url: $mixdown.data("peaksUrl")
+        });
+    }
+
+    return tracks;
+}
+
 function __createAudioWave(track) {
     const self = this;
 
-    if (track.fields.audio_url) {
+    if (track.audio_url) {
         self.trackLoadingProgressMap[track.pk] = 0;
         var ctx = document.createElement('canvas').getContext('2d');
         var linGrad = ctx.createLinearGradient(0, 64, 0, 200);
@@ -159,7 +179,9 @@ function __createAudioWave(track) {
             progressColor: 'hsla(200, 100%, 30%, 0.5)',
             cursorColor: '#fff',
             height: 60,
-            barWidth: 3
+            barWidth: 3,
+            // precomputed peaks let the waveform draw while the audio element streams
+            backend: track.peaks_url ? 'MediaElement' : 'WebAudio'
         });
 
         wavesurfer.on('ready', () => {
@@ -171,7 +193,13 @@ function __createAudioWave(track) {
         });
         wavesurfer.on('seek', __onTrackSeekEvent.bind(self));
 
-        wavesurfer.load(track.fields.audio_url);
+        if (track.peaks_url) {
+            __loadPeaks(track.peaks_url, peaks => {
+                wavesurfer.load(track.audio_url, peaks);
+            });
+        } else {
+            wavesurfer.load(track.audio_url);
+        }
 
         track.__audio = wavesurfer;
     } else {
@@ -180,6 +208,40 @@ function __createAudioWave(track) {
 
     return track;
 }
+
+function __loadPeaks(peaksUrl, callback) {
+    const request = new XMLHttpRequest();
+
+    request.open("GET", peaksUrl);
+    request.responseType = "arraybuffer";
+    request.onload = () => {
+        // fall back to decoding the audio in the browser when no peaks have been generated yet
+        callback(request.status === 200 ? __parsePeaks(request.response) : undefined);
+    };
+    request.onerror = () => callback(undefined);
+    request.send();
+}
+
+function __parsePeaks(arrayBuffer) {
+    // audiowaveform .dat layout: version, flags, sample rate, samples per pixel, length, then (min, max) pairs
+    const view = new DataView(arrayBuffer),
+        eightBit = (view.getUint32(4, true) & 1) === 1,
+        length = view.getUint32(16, true),
+        sampleSize = eightBit ? 1 : 2,
+        scale = eightBit ? 128 : 32768,
+        peaks = [];
+
+    for (let i = 0; i < length; i++) {
+        const offset = 20 + i * 2 * sampleSize,
+            min = eightBit ? view.getInt8(offset) : view.getInt16(offset, true),
+            max = eightBit ? view.getInt8(offset + 1) : view.getInt16(offset + 2, true);
+
+        // wavesurfer expects (max, min) pairs between -1 and 1
+        peaks.push(max / scale, min / scale);
+    }
+
+    return peaks;
+}
 // //
 // //     function toggleSoloForTrack(track, $event) {
 // //         track.isSolo = !track.isSolo;
@@ -214,11 +276,12 @@ function __loadTrackRequests() {
 
     self.trackRequests.forEach(trackRequest => {
         const matchingTrack = self.tracks.filter(track => {
-            return track.pk === trackRequest.fields.track
+            return track.pk === trackRequest.track
         })[0];
 
         if (matchingTrack) {
-            matchingTrack.fields.audio_url = trackRequest.fields.audio_url;
+            matchingTrack.audio_url = trackRequest.audio_url;
+            matchingTrack.peaks_url = trackRequest.peaks_url;
         }
     });
 }
@@ -251,7 +314,7 @@ function __onTrackErrorEvent(error) {
 
 function __onTrackSeekEvent(progress) {
     const self = this,
-        tracksWithMedia = self.tracks.filter(track => !!track.fields.audio_url);
+        tracksWithMedia = self.tracks.filter(track => !!track.audio_url);
 
     // prevent excess seek events from firing
     let promises = tracksWithMedia.map(track => {
@@ -346,6 +409,7 @@ function __handleTrackRequestChange(event) {
 
     $trackControl.parents(".media-player__track--no-media").removeClass("media-player__track--no-media");
 
-    track.fields.audio_url = $trackControl.val();
+    track.audio_url = $trackControl.val();
+    track.peaks_url = undefined;
     self.replaceTrackById(trackId, track);
 }
\ No newline at end of file
@@ -0,0 +1,510 @@
+import hashlib
+import os
+import posixpath
+import shutil
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from tempfile import NamedTemporaryFile
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.module_loading import import_string
+
+
+class StorageError(Exception):
+    pass
+
+
+class MissingObject(StorageError):
+    pass
+
+
+class MissingUpload(StorageError):
+    pass
+
+
+class Storage:
+    """
+    Where uploaded audio, avatars and everything generated from them are kept. Objects are addressed by a `/`
+    separated key and handed to browsers by url, the rows storing those urls map them back with `get_key`.
+    """
+    # whether browsers can be handed a signed form to upload straight into the storage
+    direct_uploads = False
+
+    def url(self, key):
+        raise NotImplementedError('subclasses of Storage must provide url()')
+
+    def get_key(self, url):
+        prefix = self.url('')
+
+        if not url.startswith(prefix):
+            raise ValueError('url [%s] does not belong to storage [%s]' % (url, prefix))
+
+        return url[len(prefix):]
+
+    def put(self, key, file_obj, content_type):
+        raise NotImplementedError('subclasses of Storage must provide put()')
+
+    def open(self, key):
+        """
+        Returns a readable file object streaming the whole object.
+        """
+        raise NotImplementedError('subclasses of Storage must provide open()')
+
+    def iter_chunks(self, key, chunk_size=1024 * 1024, start=0, end=None):
+        """
+        Yields the bytes from `start` up to and including `end`, or the end of the object, `chunk_size` at a time.
+        """
+        raise NotImplementedError('subclasses of Storage must provide iter_chunks()')
+
+    def get_range(self, key, start, end):
+        """
+        Returns the bytes from `start` up to and including `end`, fewer when the object is shorter, and the size of
+        the whole object.
+        """
+        raise NotImplementedError('subclasses of Storage must provide get_range()')
+
+    def size(self, key):
+        raise NotImplementedError('subclasses of Storage must provide size()')
+
+    def copy(self, source_key, key):
+        raise NotImplementedError('subclasses of Storage must provide copy()')
+
+    def delete(self, key):
+        """
+        Deletes an object, deleting one that does not exist is not an error.
+        """
+        raise NotImplementedError('subclasses of Storage must provide delete()')
+
+    def list(self, prefix=''):
+        """
+        Yields the key of every object starting with `prefix`.
+        """
+        raise NotImplementedError('subclasses of Storage must provide list()')
+
+    def create_multipart_upload(self, key, content_type):
+        raise NotImplementedError('subclasses of Storage must provide create_multipart_upload()')
+
+    def upload_part(self, key, upload_id, part_number, data):
+        """
+        Stores one part of a multipart upload and returns its etag, the quoted md5 of the part.
+        """
+        raise NotImplementedError('subclasses of Storage must provide upload_part()')
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        """
+        Joins the `(part_number, etag)` parts of an upload into the object at `key`.
+        """
+        raise NotImplementedError('subclasses of Storage must provide complete_multipart_upload()')
+
+    def abort_multipart_upload(self, key, upload_id):
+        raise NotImplementedError('subclasses of Storage must provide abort_multipart_upload()')
+
+    def list_multipart_uploads(self):
+        """
+        Yields a `(key, upload_id, initiated)` tuple for every multipart upload that was neither completed nor
+        aborted.
+        """
+        raise NotImplementedError('subclasses of Storage must provide list_multipart_uploads()')
+
+    def get_presigned_post(self, key, content_type, max_size, expires_in):
+        raise NotImplementedError('%s does not support direct uploads' % self.__class__.__name__)
+
+    def get_presigned_put_url(self, key, content_type, expires_in):
+        raise NotImplementedError('%s does not support direct uploads' % self.__class__.__name__)
+
+
+@contextmanager
+def s3_errors():
+    try:
+        yield
+    except ClientError as e:
+        code = e.response['Error']['Code']
+
+        if code == 'NoSuchUpload':
+            raise MissingUpload(str(e)) from e
+        if code in ('NoSuchKey', 'NotFound', '404'):
+            raise MissingObject(str(e)) from e
+
+        raise StorageError(str(e)) from e
+    except BotoCoreError as e:
+        raise StorageError(str(e)) from e
+
+
+class S3Storage(Storage):
+    """
+    Keeps every object public-read in a single s3 bucket. `client` is any boto3 compatible s3 client, the in memory
+    `songs.s3_local.LocalS3Client` in tests and benchmarks.
+    """
+    direct_uploads = True
+    multipart_copy_threshold = settings.S3_MULTIPART_COPY_THRESHOLD
+    copy_part_size = 256 * 1024 * 1024
+
+    def __init__(self, client=None, bucket=None, domain=None):
+        # boto3 clients are thread safe, share one connection pool sized for concurrent track fetches
+        self.client = client or boto3.client('s3', config=Config(max_pool_connections=settings.S3_MAX_CONCURRENCY))
+        self.bucket = bucket or settings.S3_BUCKET
+        self.domain = domain or settings.S3_DOMAIN
+
+    def url(self, key):
+        return '%s/%s/%s' % (self.domain, self.bucket, key)
+
+    def put(self, key, file_obj, content_type):
+        with s3_errors():
+            self.client.upload_fileobj(file_obj, self.bucket, key, ExtraArgs={
+                'ACL': 'public-read',
+                'ContentType': content_type
+            })
+
+    def get_object(self, key, start=0, end=None):
+        kwargs = {}
+
+        if start or end is not None:
+            kwargs['Range'] = 'bytes=%d-%s' % (start, '' if end is None else end)
+
+        with s3_errors():
+            return self.client.get_object(Bucket=self.bucket, Key=key, **kwargs)
+
+    def open(self, key):
+        return self.get_object(key)['Body']
+
+    def iter_chunks(self, key, chunk_size=1024 * 1024, start=0, end=None):
+        body = self.get_object(key, start, end)['Body']
+
+        try:
+            with s3_errors():
+                chunk = body.read(chunk_size)
+                while chunk:
+                    yield chunk
+                    chunk = body.read(chunk_size)
+        finally:
+            body.close()
+
+    def get_range(self, key, start, end):
+        response = self.get_object(key, start, end)
+
+        try:
+            with s3_errors():
+                data = response['Body'].read()
+        finally:
+            response['Body'].close()
+
+        content_range = response.get('ContentRange')
+        return data, int(content_range.rsplit('/', 1)[1]) if content_range else len(data)
+
+    def size(self, key):
+        with s3_errors():
+            return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+
+    def copy(self, source_key, key):
+        """
+        Copies within the bucket, s3 moves the bytes without them passing through us. Objects past
+        S3_MULTIPART_COPY_THRESHOLD are copied in parts, a single copy is limited to 5GB.
+        """
+        copy_source = {'Bucket': self.bucket, 'Key': source_key}
+
+        with s3_errors():
+            source = self.client.head_object(Bucket=self.bucket, Key=source_key)
+
+            if source['ContentLength'] <= self.multipart_copy_threshold:
+                self.client.copy_object(Bucket=self.bucket, Key=key, ACL='public-read', CopySource=copy_source)
+                return
+
+        upload_id = self.create_multipart_upload(key, source.get('ContentType'))
+
+        try:
+            parts = []
+
+            for part_number, first in enumerate(range(0, source['ContentLength'], self.copy_part_size), 1):
+                last = min(first + self.copy_part_size, source['ContentLength']) - 1
+
+                with s3_errors():
+                    response = self.client.upload_part_copy(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                                            PartNumber=part_number, CopySource=copy_source,
+                                                            CopySourceRange='bytes=%d-%d' % (first, last))
+
+                parts.append((part_number, response['CopyPartResult']['ETag']))
+
+            self.complete_multipart_upload(key, upload_id, parts)
+        except BaseException:
+            self.abort_multipart_upload(key, upload_id)
+            raise
+
+    def delete(self, key):
+        with s3_errors():
+            self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def list(self, prefix=''):
+        list_kwargs = {'Bucket': self.bucket, 'Prefix': prefix}
+
+        while True:
+            with s3_errors():
+                response = self.client.list_objects_v2(**list_kwargs)
+
+            for s3_object in response.get('Contents', []):
+                yield s3_object['Key']
+
+            if not response.get('IsTruncated'):
+                return
+
+            list_kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+    def create_multipart_upload(self, key, content_type):
+        with s3_errors():
+            return self.client.create_multipart_upload(Bucket=self.bucket, Key=key, ACL='public-read',
+                                                       ContentType=content_type)['UploadId']
+
+    def upload_part(self, key, upload_id, part_number, data):
+        with s3_errors():
+            return self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number,
+                                           Body=data)['ETag']
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        with s3_errors():
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': [{'ETag': etag, 'PartNumber': part_number}
+                                           for part_number, etag in parts]})
+
+    def abort_multipart_upload(self, key, upload_id):
+        with s3_errors():
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    def list_multipart_uploads(self):
+        list_kwargs = {'Bucket': self.bucket}
+
+        while True:
+            with s3_errors():
+                response = self.client.list_multipart_uploads(**list_kwargs)
+
+            for upload in response.get('Uploads', []):
+                yield upload['Key'], upload['UploadId'], upload['Initiated']
+
+            if not response.get('IsTruncated'):
+                return
+
+            list_kwargs.update(KeyMarker=response['NextKeyMarker'], UploadIdMarker=response['NextUploadIdMarker'])
+
+    def get_presigned_post(self, key, content_type, max_size, expires_in):
+        return self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={
+                'acl': 'public-read',
+                'Content-Type': content_type
+            },
+            Conditions=[
+                {'acl': 'public-read'},
+                {'Content-Type': content_type},
+                ['content-length-range', 1, max_size]
+            ],
+            ExpiresIn=expires_in)
+
+    def get_presigned_put_url(self, key, content_type, expires_in):
+        return self.client.generate_presigned_url('put_object', Params={
+            'Bucket': self.bucket,
+            'Key': key,
+            'ACL': 'public-read',
+            'ContentType': content_type
+        }, ExpiresIn=expires_in)
+
+
+class LocalFileStorage(Storage):
+    """
+    Keeps objects as plain files under `root`, for development, offline benchmarks and single server deployments.
+    Objects are served by `melody_buddy.views.storage_file` as file responses, which the wsgi server hands to
+    sendfile instead of copying through python. Objects are always written to a temporary file first and moved into
+    place, so readers never see half an object.
+    """
+    uploads_dir = '.uploads'
+
+    def __init__(self, root=None, base_url=None):
+        self.root = os.path.abspath(root or settings.STORAGE_ROOT)
+        self.base_url = base_url or settings.STORAGE_URL
+
+    def url(self, key):
+        return self.base_url + key
+
+    def path(self, key):
+        # safe_join refuses keys that climb out of the root
+        return safe_join(self.root, *key.split('/'))
+
+    @contextmanager
+    def replace(self, key):
+        """
+        Yields a temporary file that replaces the object at `key` once the block finishes without an error.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with NamedTemporaryFile(dir=os.path.dirname(path), prefix='.', delete=False) as temp_file:
+            try:
+                yield temp_file
+            except BaseException:
+                temp_file.close()
+                os.remove(temp_file.name)
+                raise
+
+        os.chmod(temp_file.name, 0o644)
+        os.replace(temp_file.name, path)
+
+    def put(self, key, file_obj, content_type):
+        with self.replace(key) as temp_file:
+            shutil.copyfileobj(file_obj, temp_file, 1024 * 1024)
+
+    def open(self, key):
+        try:
+            return open(self.path(key), 'rb')
+        except (FileNotFoundError, IsADirectoryError) as e:
+            raise MissingObject(str(e)) from e
+
+    def iter_chunks(self, key, chunk_size=1024 * 1024, start=0, end=None):
+        with self.open(key) as local_file:
+            local_file.seek(start)
+            remaining = None if end is None else end - start + 1
+
+            while remaining is None or remaining > 0:
+                chunk = local_file.read(chunk_size if remaining is None else min(chunk_size, remaining))
+
+                if not chunk:
+                    return
+
+                if remaining is not None:
+                    remaining -= len(chunk)
+
+                yield chunk
+
+    def get_range(self, key, start, end):
+        with self.open(key) as local_file:
+            local_file.seek(start)
+            return local_file.read(end - start + 1), os.fstat(local_file.fileno()).st_size
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError as e:
+            raise MissingObject(str(e)) from e
+
+    def copy(self, source_key, key):
+        """
+        Objects are never modified in place, so a copy shares the source file through a hard link where the file
+        system allows it.
+        """
+        source_path, path = self.path(source_key), self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = os.path.join(os.path.dirname(path), '.%s' % uuid.uuid4().hex)
+
+        try:
+            os.link(source_path, temp_path)
+        except FileNotFoundError as e:
+            raise MissingObject(str(e)) from e
+        except OSError:
+            with self.open(source_key) as source_file, self.replace(key) as temp_file:
+                shutil.copyfileobj(source_file, temp_file, 1024 * 1024)
+            return
+
+        os.replace(temp_path, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix=''):
+        for directory, directories, files in os.walk(self.root):
+            relative_directory = os.path.relpath(directory, self.root)
+            directories[:] = sorted(name for name in directories
+                                    if not (relative_directory == '.' and name == self.uploads_dir))
+
+            for name in sorted(files):
+                key = posixpath.normpath(posixpath.join(relative_directory.replace(os.sep, '/'), name))
+
+                if key.startswith(prefix) and not name.startswith('.'):
+                    yield key
+
+    def get_upload_path(self, upload_id, *names):
+        return os.path.join(self.root, self.uploads_dir, upload_id, *names)
+
+    def get_upload_key(self, upload_id):
+        try:
+            with open(self.get_upload_path(upload_id, 'key'), encoding='utf-8') as key_file:
+                return key_file.read()
+        except FileNotFoundError as e:
+            raise MissingUpload(upload_id) from e
+
+    def create_multipart_upload(self, key, content_type):
+        self.path(key)
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self.get_upload_path(upload_id))
+
+        with open(self.get_upload_path(upload_id, 'key'), 'w', encoding='utf-8') as key_file:
+            key_file.write(key)
+
+        return upload_id
+
+    def upload_part(self, key, upload_id, part_number, data):
+        self.get_upload_key(upload_id)
+        part_path = self.get_upload_path(upload_id, '%05d' % part_number)
+
+        with open(part_path + '.part', 'wb') as part_file:
+            part_file.write(data)
+
+        os.replace(part_path + '.part', part_path)
+        return '"%s"' % hashlib.md5(data).hexdigest()
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        if self.get_upload_key(upload_id) != key:
+            raise MissingUpload(upload_id)
+
+        with self.replace(key) as temp_file:
+            for part_number, etag in parts:
+                part_digest = hashlib.md5()
+
+                with open(self.get_upload_path(upload_id, '%05d' % part_number), 'rb') as part_file:
+                    for chunk in iter(lambda: part_file.read(1024 * 1024), b''):
+                        part_digest.update(chunk)
+                        temp_file.write(chunk)
+
+                if '"%s"' % part_digest.hexdigest() != etag:
+                    raise StorageError('part [%s] of [%s] does not match its etag' % (part_number, key))
+
+        shutil.rmtree(self.get_upload_path(upload_id))
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.get_upload_key(upload_id)
+        shutil.rmtree(self.get_upload_path(upload_id))
+
+    def list_multipart_uploads(self):
+        try:
+            upload_ids = sorted(os.listdir(os.path.join(self.root, self.uploads_dir)))
+        except FileNotFoundError:
+            return
+
+        for upload_id in upload_ids:
+            try:
+                key = self.get_upload_key(upload_id)
+                initiated = os.path.getmtime(self.get_upload_path(upload_id, 'key'))
+            except (MissingUpload, FileNotFoundError):
+                continue
+
+            yield key, upload_id, datetime.fromtimestamp(initiated, timezone.utc)
+
+
+class StorageFileResponse(FileResponse):
+    """
+    Streams an object opened from a storage, or any other iterable of chunks. Files on disk are handed to the wsgi
+    server's file wrapper, everything else is read in blocks large enough to keep a remote download busy.
+    """
+    block_size = 1024 * 1024
+
+
+def get_storage():
+    return import_string(settings.STORAGE_BACKEND)()
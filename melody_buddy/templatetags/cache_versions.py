@@ -0,0 +1,16 @@
+from django import template
+from django.conf import settings
+
+from ..cache import get_version_key, get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def cache_version(scope, pk):
+    return get_versions([get_version_key(scope, pk)])[0]
+
+
+@register.simple_tag
+def fragment_cache_timeout():
+    return settings.FRAGMENT_CACHE_TIMEOUT
@@ -0,0 +1,49 @@
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import modify_settings
+
+QUERY_BUDGET_MIDDLEWARE = 'melody_buddy.middleware.QueryBudgetMiddleware'
+
+
+def get_named_urls(urls_module):
+    """
+    Returns the (view name, url pattern) of every named url in `urls_module`, prefixed with its app namespace.
+    """
+    return [('%s:%s' % (urls_module.app_name, pattern.name), pattern)
+            for pattern in urls_module.urlpatterns if pattern.name]
+
+
+@modify_settings(MIDDLEWARE_CLASSES={'prepend': QUERY_BUDGET_MIDDLEWARE})
+class QueryBudgetTestCase(TestCase):
+    """
+    Test case asserting that views stay within the number of queries they are budgeted, as counted by
+    QueryBudgetMiddleware. Urls are requested signed in as `budget_user` when it is set.
+    """
+    budget_user = None
+
+    def get_query_count(self, url):
+        if self.budget_user:
+            self.client.force_login(self.budget_user)
+
+        response = self.client.get(url)
+        return int(response['X-Query-Count']), int(response['X-Query-Duplicates'])
+
+    def assertQueryBudget(self, url, budget, duplicate_budget=0):
+        count, duplicates = self.get_query_count(url)
+
+        self.assertLessEqual(count, budget, '%s ran %d queries, its budget is %d' % (url, count, budget))
+        self.assertLessEqual(duplicates, duplicate_budget, '%s ran %d duplicate queries, its budget is %d' % (
+            url, duplicates, duplicate_budget))
+
+    def assertUrlsWithinQueryBudgets(self, urls_module, budgets, get_kwargs):
+        """
+        Requests every named url of `urls_module` with the kwargs `get_kwargs(view_name, pattern)` returns and
+        asserts it against its (queries, duplicates) entry in `budgets`. A url missing from `budgets` fails too, so
+        every new view gets a budget.
+        """
+        for view_name, pattern in get_named_urls(urls_module):
+            with self.subTest(view_name=view_name):
+                self.assertIn(view_name, budgets, '%s has no query budget' % view_name)
+                budget, duplicate_budget = budgets[view_name]
+                url = reverse(view_name, kwargs=get_kwargs(view_name, pattern))
+                self.assertQueryBudget(url, budget, duplicate_budget)
@@ -0,0 +1,131 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+import accounts.urls
+import songs.urls
+import users.urls
+from songs.models import Song, SongStats, Track, TrackRequest
+from users.models import Profile, Skill
+from ..testing import QueryBudgetTestCase
+
+# (queries, duplicate queries) every view may run against the seeded dataset, signed in as the song creator
+SONGS_QUERY_BUDGETS = {
+    'songs:index': (3, 0),
+    'songs:index_json': (3, 0),
+    'songs:detail': (8, 0),
+    'songs:delete': (3, 0),
+    'songs:edit': (4, 0),
+    'songs:download': (9, 1),
+    'songs:mixdown_peaks': (3, 0),
+    'songs:wizard_create': (2, 0),
+    'songs:wizard_create_confirm': (5, 0),
+    'songs:wizard_track_create': (5, 0),
+    'songs:wizard_track_delete': (4, 0),
+    'songs:wizard_contributor_create': (5, 0),
+    'songs:wizard_contributor_delete': (4, 0),
+    'songs:wizard_complete': (3, 0),
+    'songs:track_manifest': (2, 0),
+    'songs:track_create': (3, 0),
+    'songs:track_upload': (2, 0),
+    'songs:track_delete': (4, 0),
+    'songs:track_update': (4, 0),
+    'songs:track_peaks': (4, 0),
+    'songs:track_audio': (4, 0),
+    'songs:contributor_create': (3, 0),
+    'songs:contributor_update': (4, 0),
+    'songs:contributor_delete': (4, 0),
+    'songs:track_request_create': (4, 0),
+    'songs:track_request_upload': (2, 0),
+    'songs:track_request_detail': (9, 0),
+    'songs:track_request_approve': (2, 0),
+    'songs:track_request_decline': (2, 0),
+    'songs:track_request_peaks': (4, 0),
+    'songs:track_request_audio': (4, 0),
+}
+
+USERS_QUERY_BUDGETS = {
+    'users:detail': (5, 0),
+    'users:songs': (4, 0),
+    'users:track_requests': (4, 0),
+    'users:skills': (4, 0),
+    'users:contributions': (4, 0),
+}
+
+ACCOUNTS_QUERY_BUDGETS = {
+    'accounts:login': (3, 0),
+    'accounts:logout': (4, 0),
+    'accounts:registration': (2, 0),
+    'accounts:password_change': (2, 0),
+    'accounts:password_change_done': (2, 0),
+    'accounts:password_reset': (2, 0),
+    'accounts:password_reset_done': (2, 0),
+    'accounts:password_reset_confirm': (3, 1),
+    'accounts:password_reset_complete': (2, 0),
+    'accounts:edit': (4, 1),
+    'accounts:avatar_upload': (2, 0),
+    'accounts:skills': (3, 0),
+    'accounts:skill_create': (2, 0),
+    'accounts:skill_delete': (5, 2),
+}
+
+
+class QueryBudgetsTestCase(QueryBudgetTestCase):
+    """
+    Fails when a view runs more queries than it is budgeted, lower a budget when a view gets cheaper.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user_creator = User.objects.create_user(username='creator', email='creator@email.com',
+                                                     password='password')
+        self.user_contributor = User.objects.create_user(username='contributor', email='contributor@email.com',
+                                                         password='password')
+
+        for user in (self.user_creator, self.user_contributor):
+            Profile.objects.create(user=user)
+            Skill.objects.create(user=user, name='bass')
+            Skill.objects.create(user=user, name='drums')
+
+        self.song = Song.objects.create(title='song title', description='song description',
+                                        created_by=self.user_creator)
+        SongStats.objects.create(song=self.song)
+        self.track = Track.objects.create(instrument='guitar_electric', created_by=self.user_creator, song=self.song,
+                                          audio_url='https://example.com/guitar.mp3')
+        Track.objects.create(instrument='piano', created_by=self.user_creator, song=self.song,
+                             audio_url='https://example.com/piano.mp3')
+        self.contributor = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song,
+                                                public=True)
+        Track.objects.create(instrument='drums', created_by=self.user_creator, song=self.song, public=True)
+
+        for status in ('approved', 'declined', 'pending'):
+            self.track_request = TrackRequest.objects.create(
+                track=self.contributor, created_by=self.user_contributor, status=status,
+                audio_url='https://example.com/bass-%s.mp3' % status)
+
+        self.budget_user = self.user_creator
+
+    def get_kwargs(self, view_name, pattern):
+        values = {
+            'pk': Skill.objects.filter(user=self.user_creator).first().pk if view_name.startswith('accounts:')
+            else self.song.pk,
+            'track_id': self.contributor.pk if 'contributor' in view_name or 'request' in view_name
+            else self.track.pk,
+            'track_request_id': self.track_request.pk,
+            'username': self.user_creator.username,
+            'uidb64': urlsafe_base64_encode(force_bytes(self.user_creator.pk)).decode('ascii'),
+            'token': default_token_generator.make_token(self.user_creator),
+        }
+
+        return {name: values[name] for name in pattern.regex.groupindex}
+
+    def test_songs_urls(self):
+        self.assertUrlsWithinQueryBudgets(songs.urls, SONGS_QUERY_BUDGETS, self.get_kwargs)
+
+    def test_users_urls(self):
+        self.assertUrlsWithinQueryBudgets(users.urls, USERS_QUERY_BUDGETS, self.get_kwargs)
+
+    def test_accounts_urls(self):
+        self.assertUrlsWithinQueryBudgets(accounts.urls, ACCOUNTS_QUERY_BUDGETS, self.get_kwargs)
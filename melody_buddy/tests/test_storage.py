@@ -0,0 +1,121 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from songs.models import Song
+from songs.s3 import S3BaseUploadClient, S3MultipartUpload, S3SongArchiveUploadClient, clear_abandoned_uploads
+from songs.tests.test_tracks import TrackTestCase
+from ..storage import LocalFileStorage, MissingObject, MissingUpload
+
+
+class LocalFileStorageTestCase(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.storage = LocalFileStorage(self.root, '/storage/')
+        self.storage.put('creator/songs/1234/tracks/guitar.mp3', io.BytesIO(b'guitar audio'), 'audio/mp3')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_objects_are_addressed_by_url(self):
+        self.assertEqual(self.storage.url('creator/avatars/me.png'), '/storage/creator/avatars/me.png')
+        self.assertEqual(self.storage.get_key('/storage/creator/avatars/me.png'), 'creator/avatars/me.png')
+
+        with self.assertRaises(ValueError):
+            self.storage.get_key('https://s3-us-west-2.amazonaws.com/bucket/creator/avatars/me.png')
+
+    def test_ranges(self):
+        key = 'creator/songs/1234/tracks/guitar.mp3'
+
+        self.assertEqual(self.storage.get_range(key, 0, 5), (b'guitar', 12))
+        self.assertEqual(self.storage.get_range(key, 7, 100), (b'audio', 12))
+        self.assertEqual(list(self.storage.iter_chunks(key, chunk_size=4, start=2, end=8)), [b'itar', b' au'])
+        self.assertEqual(b''.join(self.storage.iter_chunks(key, chunk_size=4)), b'guitar audio')
+
+    def test_copy_list_and_delete(self):
+        self.storage.copy('creator/songs/1234/tracks/guitar.mp3', 'creator/songs/1234/requests/guitar.mp3')
+
+        self.assertEqual(list(self.storage.list('creator/songs/1234/')), [
+            'creator/songs/1234/requests/guitar.mp3', 'creator/songs/1234/tracks/guitar.mp3'])
+
+        self.storage.delete('creator/songs/1234/tracks/guitar.mp3')
+        self.storage.delete('creator/songs/1234/tracks/guitar.mp3')
+
+        self.assertEqual(list(self.storage.list()), ['creator/songs/1234/requests/guitar.mp3'])
+        with self.assertRaises(MissingObject):
+            self.storage.size('creator/songs/1234/tracks/guitar.mp3')
+
+    def test_keys_can_not_leave_the_root(self):
+        with self.assertRaises(SuspiciousFileOperation):
+            self.storage.open('../outside')
+
+    def test_multipart_upload(self):
+        upload_id = self.storage.create_multipart_upload('creator/songs/1234/archives/song.zip', 'application/zip')
+        parts = [(part_number, self.storage.upload_part('creator/songs/1234/archives/song.zip', upload_id,
+                                                        part_number, data))
+                 for part_number, data in ((2, b' audio'), (1, b'guitar'))]
+
+        self.assertEqual([upload[:2] for upload in self.storage.list_multipart_uploads()],
+                         [('creator/songs/1234/archives/song.zip', upload_id)])
+
+        self.storage.complete_multipart_upload('creator/songs/1234/archives/song.zip', upload_id, sorted(parts))
+
+        with self.storage.open('creator/songs/1234/archives/song.zip') as archive_file:
+            self.assertEqual(archive_file.read(), b'guitar audio')
+        self.assertEqual(list(self.storage.list_multipart_uploads()), [])
+        with self.assertRaises(MissingUpload):
+            self.storage.abort_multipart_upload('creator/songs/1234/archives/song.zip', upload_id)
+
+
+class LocalFileStorageUploadTestCase(TrackTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.original_storage = S3BaseUploadClient.storage
+        S3BaseUploadClient.storage = LocalFileStorage(self.root, '/storage/')
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+        shutil.rmtree(self.root)
+
+    def test_upload_clients_write_through_the_storage(self):
+        song = Song(title='song title', created_by=self.user_creator)
+        upload = S3MultipartUpload(S3SongArchiveUploadClient(song, 'digest'))
+        upload.part_size = 4
+        upload.start()
+        upload.write(b'guitar audio')
+        upload.complete()
+
+        response = self.client.get(S3SongArchiveUploadClient(song, 'digest').get_upload_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(response['Content-Length'], '12')
+        self.assertEqual(b''.join(response.streaming_content), b'guitar audio')
+
+    def test_missing_objects_are_not_found(self):
+        response = self.client.get(reverse('storage_file', kwargs={'key': 'creator/avatars/missing.png'}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_direct_uploads_fall_back_to_the_form(self):
+        super().login(self.user_creator)
+        response = self.client.post(reverse('songs:track_upload', kwargs={'pk': self.song.pk}),
+                                    {'content_type': 'audio/mp3'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertNotContains(self.client.get(reverse('songs:track_create', kwargs={'pk': self.song.pk})),
+                               'data-direct-upload-url')
+
+    def test_abandoned_uploads_are_aborted(self):
+        upload_id = S3BaseUploadClient.storage.create_multipart_upload('untracked', 'audio/mp3')
+
+        self.assertEqual(clear_abandoned_uploads(timezone.now() + timedelta(minutes=1)), 1)
+        self.assertFalse(os.path.exists(S3BaseUploadClient.storage.get_upload_path(upload_id)))
@@ -2,13 +2,15 @@ from django.conf.urls import include, url
 from django.contrib import admin
 
 import notifications.urls
-from .views import index, follow
+from .views import index, follow, search, storage_file
 
 admin.autodiscover()
 
 urlpatterns = [
     url(r'^$', index, name='index'),
     url(r'^follow/', follow, name='follow'),
+    url(r'^search/$', search, name='search'),
+    url(r'^storage/(?P<key>.+)$', storage_file, name='storage_file'),
 
     url(r'^comments/', include('django_comments.urls')),
     url(r'^songs/', include('songs.urls')),
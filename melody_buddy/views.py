@@ -1,7 +1,23 @@
+import mimetypes
+
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
 from django.shortcuts import render, redirect
 from django.core.urlresolvers import reverse
+from django.views.decorators.http import require_http_methods
 
+from songs.models import Song
+from songs.s3 import S3BaseUploadClient
+from songs.streaming import stream_response
+from songs.search import search_songs
 from users.models import Follower
+from users.search import search_instruments, search_users
+
+from .storage import LocalFileStorage, MissingObject
+
+SEARCH_PAGE_SIZE = 20
 
 
 def index(request):
@@ -18,4 +34,46 @@ def follow(request):
             follower = Follower.objects.create(email=email)
             follower.save()
 
-    return redirect(reverse('index') + "?subscribed=true")
\ No newline at end of file
+    return redirect(reverse('index') + "?subscribed=true")
+
+
+def get_search_page(queryset, page):
+    results = list(queryset[(page - 1) * SEARCH_PAGE_SIZE:page * SEARCH_PAGE_SIZE + 1])
+    return results[:SEARCH_PAGE_SIZE], len(results) > SEARCH_PAGE_SIZE
+
+
+@login_required()
+@require_http_methods(["GET"])
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = request.GET.get('page', '1')
+    page = int(page) if page.isdigit() and int(page) > 0 else 1
+    context = {'query': query, 'page': page}
+
+    if query:
+        context['songs'], more_songs = get_search_page(
+            search_songs(Song.objects.select_related('created_by__profile'), query), page)
+        context['users'], more_users = get_search_page(
+            search_users(User.objects.select_related('profile'), query), page)
+        context['instruments'] = search_instruments(query) if page == 1 else []
+        context['next_page'] = page + 1 if more_songs or more_users else None
+        context['previous_page'] = page - 1 if page > 1 else None
+
+    return render(request, 'melody_buddy/search.html', context)
+
+
+@require_http_methods(["GET", "HEAD"])
+def storage_file(request, key):
+    """
+    Serves objects kept by the local file storage, which has no server of its own the way an s3 bucket does.
+    """
+    storage = S3BaseUploadClient.storage
+
+    if not isinstance(storage, LocalFileStorage):
+        raise Http404('Objects are not served from this storage')
+
+    try:
+        return stream_response(request, storage, key, storage.size(key),
+                               mimetypes.guess_type(key)[0] or 'application/octet-stream')
+    except (MissingObject, SuspiciousFileOperation):
+        raise Http404('No object found matching the key')
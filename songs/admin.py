@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Song, Track, TrackRequest
+from .search import search_songs
 
 
 class SongAdmin(admin.ModelAdmin):
@@ -10,6 +11,12 @@ class SongAdmin(admin.ModelAdmin):
     search_fields = ('title',)
     list_filter = ('updated', 'created')
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+
+        return search_songs(queryset, search_term), False
+
 
 class TrackAdmin(admin.ModelAdmin):
     list_display = ('instrument', 'song', 'created_by', 'contributed_by', 'updated', 'created')
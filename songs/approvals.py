@@ -0,0 +1,122 @@
+import logging
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.queue import job
+from melody_buddy.storage import StorageError
+
+from .models import AudioPeaks, AudioRendition, Track, TrackRequest
+from .renditions import RENDITION_CONTENT_TYPES
+from .s3 import S3AudioRenditionUploadClient, S3BaseUploadClient, S3TrackUploadClient
+
+
+def copy_object(source_key, key):
+    """
+    Copies an object within the storage and only returns once the copy is there in full.
+    """
+    storage = S3BaseUploadClient.storage
+    storage.copy(source_key, key)
+
+    if storage.size(key) != storage.size(source_key):
+        raise StorageError('copy of [%s] to [%s] is incomplete' % (source_key, key))
+
+
+def is_referenced(audio_url):
+    return Track.objects.filter(audio_url=audio_url).exists() or \
+        TrackRequest.objects.filter(audio_url=audio_url).exists() or \
+        AudioRendition.objects.filter(rendition_url=audio_url).exists()
+
+
+@job()
+def delete_stale_audio(keys):
+    for key in keys:
+        # the key could have been handed out again since the deletion was scheduled
+        if is_referenced(S3BaseUploadClient.storage.url(key)):
+            continue
+
+        logging.info('deleting stale audio [%s]' % key)
+        S3BaseUploadClient.delete_object(key)
+
+
+def schedule_stale_audio_deletion(keys, delay=None):
+    if keys:
+        delay = settings.APPROVED_AUDIO_DELETE_DELAY if delay is None else delay
+        delete_stale_audio.enqueue_at(timezone.now() + timedelta(seconds=delay), keys)
+
+
+def swap_audio_url(track, audio_url, new_audio_url, renditions):
+    """
+    Points everything using `audio_url` at its copy, `renditions` maps the renditions that were copied along to the
+    urls of their copies. Returns the keys nothing points at anymore.
+    """
+    source_renditions = AudioRendition.objects.filter(audio_url=audio_url)
+    stale_keys = [S3BaseUploadClient.get_key_from_url(url)
+                  for url in [audio_url] + list(source_renditions.values_list('rendition_url', flat=True))]
+
+    # renditions transcoded while the copies were made are dropped and rendered again for the copy
+    source_renditions.exclude(pk__in=renditions).delete()
+
+    for pk, rendition_url in renditions.items():
+        AudioRendition.objects.filter(pk=pk).update(audio_url=new_audio_url, rendition_url=rendition_url)
+
+    AudioPeaks.objects.filter(audio_url=audio_url).update(audio_url=new_audio_url)
+    TrackRequest.objects.filter(audio_url=audio_url).update(audio_url=new_audio_url, updated=timezone.now())
+
+    # saved rather than updated, so the song caches, archive and mixdown follow the new url
+    track.audio_url = new_audio_url
+    track.save()
+
+    return stale_keys
+
+
+@job(unique=True, timeout=60 * 60)
+def move_approved_audio(track_id, audio_url):
+    """
+    Copies the audio of an approved track request from the requests prefix into the tracks prefix of its song,
+    renditions included, then points the track, the request, the peaks and the renditions at the copies in one
+    transaction. The request's objects are deleted a while later, once players that loaded them have moved on.
+    """
+    track = Track.objects.select_related('song__created_by').filter(pk=track_id, audio_url=audio_url).first()
+
+    if track is None or not track.audio_content_type:
+        # the track got other audio since it was approved, or there is no type to name the copy after
+        return
+
+    source_key = S3BaseUploadClient.get_key_from_url(audio_url)
+    upload_client = S3TrackUploadClient(track.song, posixpath.splitext(posixpath.basename(source_key))[0],
+                                        track.audio_content_type)
+
+    if upload_client.get_upload_path() == source_key:
+        return
+
+    logging.info('moving approved audio [%s] to [%s]' % (source_key, upload_client.get_upload_path()))
+    copy_object(source_key, upload_client.get_upload_path())
+    copied_keys = [upload_client.get_upload_path()]
+    renditions = {}
+
+    for rendition in AudioRendition.objects.filter(audio_url=audio_url):
+        rendition_client = S3AudioRenditionUploadClient(upload_client.get_upload_url(), rendition.bitrate,
+                                                        RENDITION_CONTENT_TYPES[rendition.format])
+        copy_object(S3BaseUploadClient.get_key_from_url(rendition.rendition_url), rendition_client.get_upload_path())
+        copied_keys.append(rendition_client.get_upload_path())
+        renditions[rendition.pk] = rendition_client.get_upload_url()
+
+    with transaction.atomic():
+        track = Track.objects.select_for_update().filter(pk=track_id, audio_url=audio_url).first()
+        stale_keys = swap_audio_url(track, audio_url, upload_client.get_upload_url(), renditions) if track else None
+
+    if stale_keys is None:
+        # the track got other audio while the copies were made, nothing points at them
+        for key in copied_keys:
+            S3BaseUploadClient.delete_object(key)
+        return
+
+    schedule_stale_audio_deletion(stale_keys)
+
+
+def schedule_approved_audio_move(track):
+    move_approved_audio.enqueue(track.pk, track.audio_url)
@@ -5,3 +5,6 @@ from django.apps import AppConfig
 
 class SongsConfig(AppConfig):
     name = 'songs'
+
+    def ready(self):
+        from . import signals  # noqa
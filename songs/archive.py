@@ -0,0 +1,312 @@
+import hashlib
+import logging
+import struct
+import time
+import zlib
+from datetime import timedelta
+from zipfile import LargeZipFile, ZIP64_LIMIT, ZIP_DEFLATED, ZIP_STORED
+
+from django.utils import timezone
+
+from jobs.queue import job
+
+from .models import Song, SongArchive, Track
+from .s3 import S3BaseUploadClient, S3MultipartUpload, S3SongArchiveUploadClient, iter_objects
+
+# these formats are already compressed, deflating them again only burns cpu
+COMPRESSED_AUDIO_CONTENT_TYPES = (
+    'audio/aac',
+    'audio/flac',
+    'audio/m4a',
+    'audio/mp3',
+    'audio/mp4',
+    'audio/mpeg',
+    'audio/ogg',
+    'audio/opus',
+    'audio/webm',
+    'audio/x-flac',
+    'audio/x-m4a',
+)
+
+ZIP_VERSION = 45
+ZIP_FLAGS = 0x08 | 0x800  # sizes follow in a data descriptor, utf-8 file names
+ZIP_MAX_ENTRIES = 0xFFFF
+ZIP64_EXTRA_TAG = 0x0001
+
+# a build that has not finished by then is assumed to have died with its worker
+ARCHIVE_BUILD_TIMEOUT = timedelta(hours=1)
+
+
+class ZipStreamEntry:
+    def __init__(self, name, method, date_time, offset, zip64):
+        self.name = name.encode('utf-8')
+        self.method = method
+        self.date_time = date_time
+        self.offset = offset
+        self.zip64 = zip64
+        self.crc = 0
+        self.compressed_size = 0
+        self.file_size = 0
+
+    def get_dos_date_time(self):
+        year, month, day, hour, minute, second = self.date_time
+        dos_date = (max(year, 1980) - 1980) << 9 | month << 5 | day
+        dos_time = hour << 11 | minute << 5 | second // 2
+        return dos_date, dos_time
+
+
+class ZipStream:
+    """
+    Writes a zip archive as a sequence of byte chunks without ever seeking, so it can be sent to the client while
+    the archive is still being built. Entry sizes are written in a trailing data descriptor and ZIP64 records are
+    used whenever an entry or the archive grows past the classic 4GB limits.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.offset = 0
+
+    def _emit(self, data):
+        self.offset += len(data)
+        return data
+
+    def write(self, name, chunks, size=None, compress=False, date_time=None):
+        if len(self.entries) >= ZIP_MAX_ENTRIES:
+            raise LargeZipFile('Too many entries for a zip archive')
+
+        method = ZIP_DEFLATED if compress else ZIP_STORED
+        zip64 = size is None or size * 1.05 > ZIP64_LIMIT
+        entry = ZipStreamEntry(name, method, date_time or time.localtime()[:6], self.offset, zip64)
+        self.entries.append(entry)
+
+        yield self._emit(self._get_local_header(entry))
+
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15) if compress else None
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            entry.crc = zlib.crc32(chunk, entry.crc)
+            entry.file_size += len(chunk)
+
+            if compressor:
+                chunk = compressor.compress(chunk)
+
+            if chunk:
+                entry.compressed_size += len(chunk)
+                yield self._emit(chunk)
+
+        if compressor:
+            chunk = compressor.flush()
+            entry.compressed_size += len(chunk)
+            yield self._emit(chunk)
+
+        if not zip64 and max(entry.file_size, entry.compressed_size) > ZIP64_LIMIT:
+            raise LargeZipFile('Entry [%s] is larger than its declared size of [%s] bytes' % (name, size))
+
+        yield self._emit(self._get_data_descriptor(entry))
+
+    def close(self):
+        central_directory_offset = self.offset
+
+        for entry in self.entries:
+            yield self._emit(self._get_central_directory_header(entry))
+
+        central_directory_size = self.offset - central_directory_offset
+        entry_count = len(self.entries)
+
+        if central_directory_offset > ZIP64_LIMIT or central_directory_size > ZIP64_LIMIT:
+            zip64_end_offset = self.offset
+            yield self._emit(struct.pack('<LQHHLLQQQQ', 0x06064b50, 44, ZIP_VERSION, ZIP_VERSION, 0, 0, entry_count,
+                                         entry_count, central_directory_size, central_directory_offset))
+            yield self._emit(struct.pack('<LLQL', 0x07064b50, 0, zip64_end_offset, 1))
+            central_directory_offset = min(central_directory_offset, 0xFFFFFFFF)
+            central_directory_size = min(central_directory_size, 0xFFFFFFFF)
+
+        yield self._emit(struct.pack('<LHHHHLLH', 0x06054b50, 0, 0, entry_count, entry_count,
+                                     central_directory_size, central_directory_offset, 0))
+
+    def _get_local_header(self, entry):
+        dos_date, dos_time = entry.get_dos_date_time()
+        extra = b''
+        size = 0
+
+        if entry.zip64:
+            # the real sizes are only known once the data descriptor is written
+            extra = struct.pack('<HHQQ', ZIP64_EXTRA_TAG, 16, 0, 0)
+            size = 0xFFFFFFFF
+
+        return struct.pack('<LHHHHHLLLHH', 0x04034b50, ZIP_VERSION, ZIP_FLAGS, entry.method, dos_time, dos_date,
+                           0, size, size, len(entry.name), len(extra)) + entry.name + extra
+
+    def _get_data_descriptor(self, entry):
+        if entry.zip64:
+            return struct.pack('<LLQQ', 0x08074b50, entry.crc, entry.compressed_size, entry.file_size)
+
+        return struct.pack('<LLLL', 0x08074b50, entry.crc, entry.compressed_size, entry.file_size)
+
+    def _get_central_directory_header(self, entry):
+        dos_date, dos_time = entry.get_dos_date_time()
+        zip64_fields = []
+        file_size, compressed_size, offset = entry.file_size, entry.compressed_size, entry.offset
+
+        if file_size > ZIP64_LIMIT:
+            zip64_fields.append(file_size)
+            file_size = 0xFFFFFFFF
+        if compressed_size > ZIP64_LIMIT:
+            zip64_fields.append(compressed_size)
+            compressed_size = 0xFFFFFFFF
+        if offset > ZIP64_LIMIT:
+            zip64_fields.append(offset)
+            offset = 0xFFFFFFFF
+
+        extra = b''
+
+        if zip64_fields:
+            extra = struct.pack('<HH%dQ' % len(zip64_fields), ZIP64_EXTRA_TAG, 8 * len(zip64_fields), *zip64_fields)
+
+        return struct.pack('<LHHHHHHLLLHHHHHLL', 0x02014b50, ZIP_VERSION | 3 << 8, ZIP_VERSION, ZIP_FLAGS,
+                           entry.method, dos_time, dos_date, entry.crc, compressed_size, file_size,
+                           len(entry.name), len(extra), 0, 0, 0, 0o100644 << 16, offset) + entry.name + extra
+
+
+def get_track_archive_name(track, taken_names):
+    name = track.audio_name or '%s_%s' % (track.instrument, track.uuid)
+    base_name, dot, extension = name.rpartition('.')
+
+    if not dot:
+        base_name, extension = name, ''
+
+    suffix = 1
+    while name in taken_names:
+        suffix += 1
+        name = '%s (%s)%s%s' % (base_name, suffix, dot, extension)
+
+    taken_names.add(name)
+    return name
+
+
+def is_compressible(content_type):
+    return content_type not in COMPRESSED_AUDIO_CONTENT_TYPES
+
+
+def stream_song_archive(song, tracks, concurrency=None):
+    archive = ZipStream()
+    taken_names = set()
+
+    tracks = [track for track in tracks if track.audio_url]
+    s3_keys = [S3BaseUploadClient.get_key_from_url(track.audio_url) for track in tracks]
+
+    # entries are always written in track order, only the s3 reads ahead of the current track run in parallel
+    for track, s3_key, chunks in zip(tracks, s3_keys, iter_objects(s3_keys, concurrency)):
+        archive_name = get_track_archive_name(track, taken_names)
+        logging.info('streaming track [%s] into archive as [%s]' % (s3_key, archive_name))
+
+        yield from archive.write(archive_name, chunks, size=track.audio_size,
+                                 compress=is_compressible(track.audio_content_type))
+
+    yield from archive.close()
+
+
+def get_downloadable_tracks(song_pk):
+    return Track.objects.filter(song_id=song_pk).exclude(public=True).order_by('pk')
+
+
+def get_track_set_digest(tracks):
+    digest = hashlib.sha1()
+
+    for track in tracks:
+        digest.update(('%s\n%s\n%s\n%s\n%s\n%s\n' % (
+            track.uuid, track.audio_url, track.audio_size, track.license, track.audio_name,
+            track.audio_content_type)).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def claim_song_archive(song, digest):
+    """
+    Returns the cached archive for a track set digest and whether the caller is responsible for building it.
+    """
+    song_archive, created = SongArchive.objects.get_or_create(song=song, digest=digest, defaults={
+        'archive_url': S3SongArchiveUploadClient(song, digest).get_upload_url()
+    })
+
+    if created or song_archive.built:
+        return song_archive, created
+
+    stale = timezone.now() - ARCHIVE_BUILD_TIMEOUT
+    claimed = SongArchive.objects.filter(pk=song_archive.pk, built=False, updated__lt=stale).update(
+        updated=timezone.now())
+
+    return song_archive, bool(claimed)
+
+
+def cache_song_archive(song, song_archive, chunks):
+    upload = S3MultipartUpload(S3SongArchiveUploadClient(song, song_archive.digest))
+    upload.start()
+    archive_size = 0
+
+    try:
+        for chunk in chunks:
+            upload.write(chunk)
+            archive_size += len(chunk)
+            yield chunk
+
+        upload.complete()
+    except BaseException:
+        # includes the client disconnecting half way, the next download gets to build it again
+        logging.warning('aborting song archive build [%s]' % song_archive.archive_url)
+        upload.abort()
+        SongArchive.objects.filter(pk=song_archive.pk, built=False).delete()
+        raise
+
+    if not SongArchive.objects.filter(pk=song_archive.pk).update(built=True, archive_size=archive_size):
+        # the track set changed while this archive was being built
+        S3BaseUploadClient.delete_object(upload.key)
+
+
+def stream_cached_song_archive(song, tracks, digest):
+    """
+    Returns the archive of a song and its total size when it is already known. A cached archive is returned as an
+    open file to be streamed as is, otherwise as chunks of the archive being built and stored on the way to the
+    client.
+    """
+    song_archive, build = claim_song_archive(song, digest)
+
+    if song_archive.built:
+        logging.info('serving cached song archive [%s]' % song_archive.archive_url)
+        s3_key = S3BaseUploadClient.get_key_from_url(song_archive.archive_url)
+        return S3BaseUploadClient.storage.open(s3_key), song_archive.archive_size
+
+    chunks = stream_song_archive(song, tracks)
+
+    if build:
+        chunks = cache_song_archive(song, song_archive, chunks)
+
+    return chunks, None
+
+
+@job(unique=True, timeout=int(ARCHIVE_BUILD_TIMEOUT.total_seconds()))
+def build_song_archive(song_id):
+    """
+    Builds the archive for the current track set ahead of the first download so it is served from the cache.
+    """
+    song = Song.objects.filter(pk=song_id).first()
+    tracks = list(get_downloadable_tracks(song_id))
+
+    if not song or not any(track.audio_url for track in tracks):
+        return
+
+    song_archive, build = claim_song_archive(song, get_track_set_digest(tracks))
+
+    if build:
+        for _ in cache_song_archive(song, song_archive, stream_song_archive(song, tracks)):
+            pass
+
+
+def clear_song_archives(song_id):
+    for song_archive in SongArchive.objects.filter(song_id=song_id):
+        logging.info('clearing song archive [%s]' % song_archive.archive_url)
+        S3BaseUploadClient.delete_object(S3BaseUploadClient.get_key_from_url(song_archive.archive_url))
+        song_archive.delete()
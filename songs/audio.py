@@ -0,0 +1,50 @@
+import logging
+from contextlib import contextmanager
+from tempfile import NamedTemporaryFile
+
+from pydub import AudioSegment
+
+from .s3 import S3BaseUploadClient
+
+AUDIO_FORMATS = {
+    'audio/aac': 'aac',
+    'audio/flac': 'flac',
+    'audio/m4a': 'mp4',
+    'audio/mp3': 'mp3',
+    'audio/mp4': 'mp4',
+    'audio/mpeg': 'mp3',
+    'audio/ogg': 'ogg',
+    'audio/wav': 'wav',
+    'audio/wave': 'wav',
+    'audio/webm': 'webm',
+    'audio/x-flac': 'flac',
+    'audio/x-m4a': 'mp4',
+    'audio/x-wav': 'wav',
+}
+
+
+def get_audio_format(content_type):
+    # unknown formats are left for ffmpeg to detect
+    return AUDIO_FORMATS.get(content_type)
+
+
+@contextmanager
+def fetch_audio_file(audio_url):
+    """
+    Streams an audio object into a temporary file and yields its path, the audio never has to fit in memory.
+    """
+    s3_key = S3BaseUploadClient.get_key_from_url(audio_url)
+
+    with NamedTemporaryFile() as audio_file:
+        for chunk in S3BaseUploadClient.iter_object_chunks(s3_key):
+            audio_file.write(chunk)
+
+        audio_file.flush()
+        yield audio_file.name
+
+
+def load_audio_segment(audio_url, content_type):
+    logging.info('decoding audio [%s]' % audio_url)
+
+    with fetch_audio_file(audio_url) as audio_path:
+        return AudioSegment.from_file(audio_path, format=get_audio_format(content_type))
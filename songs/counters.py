@@ -0,0 +1,100 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import SongStats
+
+
+class StatsBuffer:
+    """
+    Collects counter increments in memory and adds them to the counter rows with a single UPDATE at most every
+    `flush_interval` seconds, so a popular song does not take a row lock on every request. With `background_flush`
+    a thread of each process flushes once an interval passed even when no more requests arrive, and the buffer is
+    flushed when the process exits. Only a process killed outright loses what it counted since the last flush.
+    """
+
+    def __init__(self, model, key_field, fields, flush_interval, background_flush=False):
+        self.model = model
+        self.key_field = key_field
+        self.fields = fields
+        self.flush_interval = flush_interval
+        self.background_flush = background_flush
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.flusher_pid = None
+        self.stopped = threading.Event()
+
+    def increment(self, key, field, amount=1):
+        if field not in self.fields:
+            raise ValueError('[%s] is not a counter of %s' % (field, self.model.__name__))
+
+        with self.lock:
+            self.counts[(key, field)] += amount
+            due = time.monotonic() - self.last_flush >= self.flush_interval
+            # forked workers do not inherit the thread of the process they were forked from
+            start_flusher = self.background_flush and self.flusher_pid != os.getpid()
+
+            if start_flusher:
+                self.flusher_pid = os.getpid()
+
+        if start_flusher:
+            self.start_flusher()
+
+        if due:
+            self.flush()
+
+    def start_flusher(self):
+        threading.Thread(target=self.run_flusher, name='%s flusher' % self.model.__name__, daemon=True).start()
+        atexit.register(self.close)
+
+    def run_flusher(self):
+        while not self.stopped.wait(self.flush_interval):
+            if time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+                # the thread has a connection of its own, it would otherwise stay open while the process idles
+                connection.close()
+
+    def close(self):
+        self.stopped.set()
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.last_flush = time.monotonic()
+
+        if not counts:
+            return 0
+
+        updates = {}
+
+        for field in self.fields:
+            amounts = [When(then=Value(amount), **{self.key_field: key})
+                       for (key, counted_field), amount in sorted(counts.items()) if counted_field == field]
+
+            if amounts:
+                updates[field] = F(field) + Case(*amounts, default=Value(0), output_field=IntegerField())
+
+        keys = sorted({key for key, _ in counts})
+
+        try:
+            return self.model.objects.filter(**{'%s__in' % self.key_field: keys}).update(**updates)
+        except Exception:
+            logging.exception('failed to flush %s counters, keeping them for the next flush' % self.model.__name__)
+
+            with self.lock:
+                self.counts.update(counts)
+
+            return 0
+
+
+song_stats = StatsBuffer(SongStats, 'song_id', ('views', 'likes', 'downloads'), settings.SONG_STATS_FLUSH_INTERVAL,
+                         background_flush=settings.SONG_STATS_BACKGROUND_FLUSH)
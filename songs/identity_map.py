@@ -0,0 +1,51 @@
+from .models import Song, Track
+
+
+class IdentityMap:
+    """
+    Holds at most one instance per model and primary key for the lifetime of a request, so the access checks,
+    context and form handling of a view all work on the same row instead of querying it again.
+    """
+
+    def __init__(self):
+        self.objects = {}
+
+    def get(self, queryset, pk):
+        model = queryset.model
+        key = (model, model._meta.pk.to_python(pk))
+
+        if key not in self.objects:
+            self.objects[key] = queryset.get(pk=key[1])
+
+        return self.objects[key]
+
+
+def get_identity_map(request):
+    if not hasattr(request, 'identity_map'):
+        request.identity_map = IdentityMap()
+
+    return request.identity_map
+
+
+def link_track_songs(identity_map):
+    # tracks loaded before their song would otherwise query it again on `track.song`
+    for (model, _), track in identity_map.objects.items():
+        song = identity_map.objects.get((Song, getattr(track, 'song_id', None)))
+
+        if model is Track and song and not hasattr(track, track._meta.get_field('song').get_cache_name()):
+            track.song = song
+
+
+def get_song(request, pk):
+    identity_map = get_identity_map(request)
+    # owner checks, upload paths and templates all reach for the creator
+    song = identity_map.get(Song.objects.select_related('created_by'), pk)
+    link_track_songs(identity_map)
+    return song
+
+
+def get_track(request, pk):
+    identity_map = get_identity_map(request)
+    track = identity_map.get(Track.objects.all(), pk)
+    link_track_songs(identity_map)
+    return track
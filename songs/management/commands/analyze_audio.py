@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from songs.metadata import schedule_audio_analysis
+from songs.models import Track, TrackRequest
+
+
+class Command(BaseCommand):
+    help = 'Queues metadata analysis for every uploaded track and track request audio that has not been analyzed'
+
+    def handle(self, *args, **options):
+        audio = set()
+
+        for model in (Track, TrackRequest):
+            audio.update(model.objects.filter(audio_url__isnull=False, audio_duration__isnull=True).exclude(
+                audio_url='').values_list('audio_url', 'audio_content_type'))
+
+        for audio_url, content_type in audio:
+            schedule_audio_analysis(audio_url, content_type)
+
+        self.stdout.write('queued %d audio files' % len(audio))
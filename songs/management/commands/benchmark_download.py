@@ -0,0 +1,64 @@
+import os
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from melody_buddy.storage import S3Storage
+from songs.archive import stream_song_archive
+from songs.models import Song, Track
+from songs.s3 import S3BaseUploadClient
+from songs.s3_local import LocalS3Client
+
+
+class Command(BaseCommand):
+    help = 'Times song archive downloads against a local s3 stand in, sequentially and with concurrent fetches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tracks', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--track-size', type=int, default=2 * 1024 * 1024, help='bytes per track')
+        parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every s3 request')
+        parser.add_argument('--bandwidth', type=int, default=50 * 1024 * 1024, help='bytes per second per object')
+        parser.add_argument('--concurrency', type=int, default=None)
+
+    def handle(self, *args, **options):
+        s3_client = LocalS3Client(bandwidth=options['bandwidth'])
+        original_storage = S3BaseUploadClient.storage
+        S3BaseUploadClient.storage = S3Storage(s3_client)
+
+        try:
+            self.stdout.write('%8s %14s %14s' % ('tracks', 'sequential', 'concurrent'))
+
+            for track_count in options['tracks']:
+                s3_client.latency = 0
+                song, tracks = self.create_song(s3_client, track_count, options['track_size'])
+                s3_client.latency = options['latency']
+
+                sequential = self.time_download(song, tracks, concurrency=1)
+                concurrent = self.time_download(song, tracks, concurrency=options['concurrency'])
+
+                self.stdout.write('%8d %13.3fs %13.3fs' % (track_count, sequential, concurrent))
+        finally:
+            S3BaseUploadClient.storage = original_storage
+
+    def create_song(self, s3_client, track_count, track_size):
+        song = Song(title='benchmark', uuid=uuid.uuid4())
+        tracks = []
+
+        for index in range(track_count):
+            track = Track(instrument='guitar_electric', song=song, uuid=uuid.uuid4(), audio_name='%s.mp3' % index,
+                          audio_content_type='audio/mp3', audio_size=track_size)
+            s3_key = 'benchmark/songs/%s/tracks/%s.mp3' % (song.uuid, track.uuid)
+            track.audio_url = S3BaseUploadClient.storage.url(s3_key)
+            s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=s3_key, Body=os.urandom(track_size))
+            tracks.append(track)
+
+        return song, tracks
+
+    def time_download(self, song, tracks, concurrency):
+        start = time.time()
+
+        for _ in stream_song_archive(song, tracks, concurrency=concurrency):
+            pass
+
+        return time.time() - start
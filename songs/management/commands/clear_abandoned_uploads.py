@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from songs.s3 import clear_abandoned_uploads
+
+
+class Command(BaseCommand):
+    help = 'Aborts multipart uploads to s3 that have not made progress for a while, meant to run from cron'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='abort uploads idle for longer than this')
+
+    def handle(self, *args, **options):
+        aborted = clear_abandoned_uploads(timezone.now() - timedelta(hours=options['hours']))
+        self.stdout.write('aborted %d abandoned uploads' % aborted)
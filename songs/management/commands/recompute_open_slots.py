@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from songs.slots import recompute_open_slots
+
+
+class Command(BaseCommand):
+    help = 'Recounts the open contributor slots of every song in bulk and fixes the ones that drifted'
+
+    def handle(self, *args, **options):
+        self.stdout.write('fixed %d drifted songs' % recompute_open_slots())
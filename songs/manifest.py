@@ -0,0 +1,67 @@
+import hashlib
+import json
+
+from django.db.models import Count, Max
+
+from .models import Song, Track, get_track_audio_url, get_track_peaks_url
+
+TRACK_MANIFEST_FIELDS = ('pk', 'uuid', 'instrument', 'audio_url', 'audio_size', 'audio_duration', 'public', 'updated',
+                         'created_by__username', 'contributed_by__username')
+
+
+def get_track_manifest_state(request, pk):
+    """
+    Returns when the song or any of its tracks last changed and how many tracks it has, or None for a missing song.
+    The state is read once per request and shared by the ETag and Last-Modified checks.
+    """
+    if not hasattr(request, 'track_manifest_state'):
+        request.track_manifest_state = Song.objects.filter(pk=pk).annotate(
+            tracks_updated=Max('track__updated'), track_count=Count('track')
+        ).values_list('updated', 'tracks_updated', 'track_count').first()
+
+    return request.track_manifest_state
+
+
+def get_track_manifest_etag(request, pk):
+    state = get_track_manifest_state(request, pk)
+
+    if state is None:
+        return None
+
+    # the track count changes when a track is deleted, the timestamps do not
+    return hashlib.sha1(('%s\n%s\n%s' % state).encode('utf-8')).hexdigest()
+
+
+def get_track_manifest_last_modified(request, pk):
+    state = get_track_manifest_state(request, pk)
+
+    if state is None:
+        return None
+
+    song_updated, tracks_updated, track_count = state
+    return max(song_updated, tracks_updated or song_updated)
+
+
+def build_track_manifest(song_id):
+    """
+    Returns the json the media player loads a song from, only the fields it plays tracks with. Tracks are streamed
+    by the track audio endpoint, which serves their lightest rendition, the lossless originals are only served by
+    song downloads.
+    """
+    manifest = []
+
+    for track in Track.objects.filter(song_id=song_id).order_by('pk').values(*TRACK_MANIFEST_FIELDS):
+        manifest.append({
+            'pk': track['pk'],
+            'uuid': str(track['uuid']),
+            'instrument': track['instrument'],
+            'audio_url': get_track_audio_url(song_id, track['pk'], track['updated']) if track['audio_url'] else None,
+            'audio_size': track['audio_size'],
+            'audio_duration': track['audio_duration'],
+            'peaks_url': get_track_peaks_url(song_id, track['pk'], track['updated']) if track['audio_url'] else None,
+            'public': track['public'],
+            'contributor': track['contributed_by__username'] or track['created_by__username']
+        })
+
+    # every value is already a plain json type, so the c encoder serializes the list without python callbacks
+    return json.dumps(manifest, separators=(',', ':'))
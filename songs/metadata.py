@@ -0,0 +1,187 @@
+import logging
+import struct
+from contextlib import contextmanager
+from tempfile import NamedTemporaryFile
+
+import eyed3
+from django.utils import timezone
+from pydub.utils import mediainfo
+
+from jobs.queue import job
+from melody_buddy.cache import bump_song_versions
+
+from .audio import fetch_audio_file, get_audio_format
+from .models import Track, TrackRequest
+from .renditions import schedule_audio_renditions
+from .s3 import S3BaseUploadClient
+
+# enough for the wav fmt chunk, an mp3 frame header with its xing/vbri header and most containers' stream headers
+AUDIO_HEADER_BYTES = 256 * 1024
+
+AUDIO_METADATA_FIELDS = ('audio_duration', 'audio_sample_rate', 'audio_channels', 'audio_bit_depth', 'audio_bitrate',
+                         'audio_codec')
+
+RIFF_HEADER = struct.Struct('<4sI4s')
+RIFF_CHUNK_HEADER = struct.Struct('<4sI')
+WAVE_FORMAT = struct.Struct('<HHIIHH')
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+WAVE_CODECS = {
+    1: 'pcm',
+    3: 'pcm_float',
+    6: 'alaw',
+    7: 'mulaw',
+}
+
+
+class AudioMetadataError(Exception):
+    pass
+
+
+def get_audio_metadata(duration=None, sample_rate=None, channels=None, bit_depth=None, bitrate=None, codec=None):
+    return {
+        'audio_duration': duration,
+        'audio_sample_rate': sample_rate,
+        'audio_channels': channels,
+        'audio_bit_depth': bit_depth,
+        'audio_bitrate': bitrate,
+        'audio_codec': codec,
+    }
+
+
+def read_wav_metadata(head, size):
+    """
+    Reads the fmt chunk and the size of the data chunk from the start of a wav file.
+    """
+    if len(head) < RIFF_HEADER.size:
+        raise AudioMetadataError('not a wav file')
+
+    riff, riff_size, wave = RIFF_HEADER.unpack_from(head)
+
+    if riff != b'RIFF' or wave != b'WAVE':
+        raise AudioMetadataError('not a wav file')
+
+    offset = RIFF_HEADER.size
+    audio_format = None
+
+    while offset + RIFF_CHUNK_HEADER.size <= len(head):
+        chunk_id, chunk_size = RIFF_CHUNK_HEADER.unpack_from(head, offset)
+        offset += RIFF_CHUNK_HEADER.size
+
+        if chunk_id == b'fmt ' and offset + WAVE_FORMAT.size <= len(head):
+            audio_format = list(WAVE_FORMAT.unpack_from(head, offset))
+
+            # the codec of an extensible wav is the first two bytes of its sub format guid
+            if audio_format[0] == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26 and offset + 26 <= len(head):
+                audio_format[0] = struct.unpack_from('<H', head, offset + 24)[0]
+        elif chunk_id == b'data':
+            if audio_format is None:
+                raise AudioMetadataError('wav data chunk before its fmt chunk')
+
+            codec, channels, sample_rate, byte_rate, block_align, bit_depth = audio_format
+
+            # recorders streaming a wav leave the data size at 0 or the maximum until they finish
+            if not chunk_size or chunk_size > size - offset:
+                chunk_size = size - offset
+
+            return get_audio_metadata(duration=chunk_size / byte_rate if byte_rate else None,
+                                      sample_rate=sample_rate, channels=channels, bit_depth=bit_depth,
+                                      bitrate=byte_rate * 8, codec=WAVE_CODECS.get(codec, 'wav'))
+
+        offset += chunk_size + chunk_size % 2
+
+    raise AudioMetadataError('no wav data chunk in the first %d bytes' % len(head))
+
+
+def read_mp3_metadata(audio_path):
+    audio_file = eyed3.load(audio_path)
+
+    if audio_file is None or audio_file.info is None:
+        raise AudioMetadataError('no mp3 frame header found')
+
+    info = audio_file.info
+    return get_audio_metadata(duration=info.time_secs, sample_rate=info.sample_freq,
+                              channels=1 if info.mode == 'Mono' else 2, bitrate=info.bit_rate[1] * 1000,
+                              codec='mp3')
+
+
+def get_probed_int(info, key):
+    value = info.get(key, '')
+    return int(value) if value.isdigit() and int(value) else None
+
+
+def read_probed_metadata(audio_path):
+    info = mediainfo(audio_path)
+
+    try:
+        duration = float(info['duration'])
+    except (KeyError, ValueError):
+        raise AudioMetadataError('ffprobe found no duration')
+
+    return get_audio_metadata(duration=duration, sample_rate=get_probed_int(info, 'sample_rate'),
+                              channels=get_probed_int(info, 'channels'),
+                              bit_depth=get_probed_int(info, 'bits_per_sample'),
+                              bitrate=get_probed_int(info, 'bit_rate'), codec=info.get('codec_name'))
+
+
+@contextmanager
+def sparse_audio_file(head, size):
+    """
+    Yields the path of a file holding `head` that is as long as the whole object, so readers that work out the
+    length from the file size get it right without the rest of the audio ever being fetched.
+    """
+    with NamedTemporaryFile() as audio_file:
+        audio_file.write(head)
+        audio_file.truncate(size)
+        audio_file.flush()
+        yield audio_file.name
+
+
+def read_audio_metadata(audio_url, content_type):
+    """
+    Returns the duration, sample rate, channels, bit depth, bitrate and codec of an uploaded audio file. Only the
+    start of the file is fetched, unless its headers are not enough, as with an mp4 keeping its index at the end.
+    """
+    audio_format = get_audio_format(content_type)
+    head, size = S3BaseUploadClient.read_object_head(S3BaseUploadClient.get_key_from_url(audio_url),
+                                                     AUDIO_HEADER_BYTES)
+
+    try:
+        if audio_format == 'wav':
+            return read_wav_metadata(head, size)
+
+        with sparse_audio_file(head, size) as audio_path:
+            if audio_format == 'mp3':
+                return read_mp3_metadata(audio_path)
+
+            return read_probed_metadata(audio_path)
+    except AudioMetadataError as error:
+        logging.info('headers of [%s] are not enough, probing the whole file: %s' % (audio_url, error))
+
+    with fetch_audio_file(audio_url) as audio_path:
+        return read_probed_metadata(audio_path)
+
+
+@job(unique=True)
+def analyze_audio(audio_url, content_type):
+    tracks = Track.objects.filter(audio_url=audio_url)
+    track_requests = TrackRequest.objects.filter(audio_url=audio_url)
+
+    if not tracks.filter(audio_duration__isnull=True).exists() and \
+            not track_requests.filter(audio_duration__isnull=True).exists():
+        return
+
+    logging.info('reading audio metadata of [%s]' % audio_url)
+    metadata = read_audio_metadata(audio_url, content_type)
+
+    # the new updated time moves the track manifest etag, so players pick up the lengths
+    now = timezone.now()
+    tracks.update(updated=now, **metadata)
+    track_requests.update(updated=now, **metadata)
+    bump_song_versions(*tracks.values_list('song_id', flat=True))
+
+    # renditions are only worth rendering below the bitrate just read
+    schedule_audio_renditions(audio_url, content_type)
+
+
+def schedule_audio_analysis(audio_url, content_type):
+    analyze_audio.enqueue(audio_url, content_type)
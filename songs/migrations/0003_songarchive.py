@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0002_auto_20170104_1822'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SongArchive',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=40)),
+                ('archive_url', models.CharField(max_length=500)),
+                ('archive_size', models.BigIntegerField(blank=True, null=True)),
+                ('built', models.BooleanField(default=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='songs.Song')),
+            ],
+            options={
+                'db_table': 'songs_song_archives',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='songarchive',
+            unique_together=set([('song', 'digest')]),
+        ),
+    ]
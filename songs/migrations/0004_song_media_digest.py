@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0003_songarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='media_digest',
+            field=models.CharField(blank=True, max_length=40, null=True),
+        ),
+    ]
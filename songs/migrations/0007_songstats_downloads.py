@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0006_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='songstats',
+            name='downloads',
+            field=models.IntegerField(default=0),
+        ),
+    ]
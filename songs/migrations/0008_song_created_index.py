@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0007_songstats_downloads'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='song',
+            index_together=set([('created', 'id')]),
+        ),
+    ]
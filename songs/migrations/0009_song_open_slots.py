@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0008_song_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='open_slot_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='song',
+            name='open_instruments',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True,
+                                                            default=list, size=None),
+        ),
+        migrations.RunSQL(
+            '''
+            UPDATE songs_song
+            SET open_slot_count = (SELECT COUNT(*) FROM songs_track WHERE song_id = songs_song.id AND public),
+                open_instruments = ARRAY(SELECT DISTINCT instrument FROM songs_track
+                                         WHERE song_id = songs_song.id AND public ORDER BY instrument)
+            ''',
+            migrations.RunSQL.noop,
+        ),
+        # only the few songs still looking for contributors are indexed
+        migrations.RunSQL(
+            [
+                'CREATE INDEX songs_song_open_slots ON songs_song (created DESC, id DESC) WHERE open_slot_count > 0',
+                '''
+                CREATE INDEX songs_song_open_instruments ON songs_song USING GIN (open_instruments)
+                WHERE open_slot_count > 0
+                ''',
+            ],
+            [
+                'DROP INDEX songs_song_open_slots',
+                'DROP INDEX songs_song_open_instruments',
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0009_song_open_slots'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ['CREATE EXTENSION IF NOT EXISTS pg_trgm'],
+            migrations.RunSQL.noop,
+        ),
+        # search_vector is only read through songs.search, so the column is left out of the model
+        migrations.RunSQL(
+            [
+                'ALTER TABLE songs_song ADD COLUMN search_vector tsvector',
+                '''
+                CREATE FUNCTION songs_song_search_vector_update() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector :=
+                        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+                ''',
+                '''
+                CREATE TRIGGER songs_song_search_vector_update BEFORE INSERT OR UPDATE OF title, description
+                ON songs_song FOR EACH ROW EXECUTE PROCEDURE songs_song_search_vector_update()
+                ''',
+                'UPDATE songs_song SET title = title',
+                'CREATE INDEX songs_song_search_vector ON songs_song USING GIN (search_vector)',
+                'CREATE INDEX songs_song_title_trgm ON songs_song USING GIN (title gin_trgm_ops)',
+            ],
+            [
+                'DROP INDEX songs_song_title_trgm',
+                'DROP TRIGGER songs_song_search_vector_update ON songs_song',
+                'DROP FUNCTION songs_song_search_vector_update()',
+                'ALTER TABLE songs_song DROP COLUMN search_vector',
+            ],
+        ),
+    ]
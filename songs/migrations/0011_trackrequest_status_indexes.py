@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('songs', '0010_song_search'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='trackrequest',
+            index_together=set([('status', 'track'), ('created_by', 'status')]),
+        ),
+    ]
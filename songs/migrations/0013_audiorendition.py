@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0012_audio_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioRendition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audio_url', models.CharField(max_length=500)),
+                ('format', models.CharField(max_length=10)),
+                ('bitrate', models.IntegerField(help_text='kbps')),
+                ('rendition_url', models.CharField(max_length=500)),
+                ('size', models.IntegerField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'songs_audio_renditions',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='audiorendition',
+            unique_together=set([('audio_url', 'format', 'bitrate')]),
+        ),
+    ]
@@ -0,0 +1,85 @@
+import io
+import logging
+import math
+
+from pydub import AudioSegment
+
+from jobs.queue import job
+from melody_buddy.cache import bump_song_versions
+
+from .archive import get_downloadable_tracks, get_track_set_digest
+from .audio import load_audio_segment
+from .models import AudioPeaks, Song
+from .peaks import store_audio_peaks
+from .s3 import S3BaseUploadClient, S3SongMixdownUploadClient
+
+MIXDOWN_CHANNELS = 2
+MIXDOWN_FRAME_RATE = 44100
+MIXDOWN_BITRATE = '128k'
+
+
+def mix_audio_segments(segments, segment_count):
+    # keep the summed tracks from clipping by giving each one an equal share of the headroom
+    gain = -10 * math.log10(max(segment_count, 1))
+    mixdown = AudioSegment.silent(duration=0, frame_rate=MIXDOWN_FRAME_RATE).set_channels(MIXDOWN_CHANNELS)
+
+    for segment in segments:
+        segment = segment.set_frame_rate(MIXDOWN_FRAME_RATE).set_channels(MIXDOWN_CHANNELS).apply_gain(gain)
+
+        if len(segment) > len(mixdown):
+            # overlay never grows the base segment, pad it to the longest track first
+            mixdown += AudioSegment.silent(duration=len(segment) - len(mixdown), frame_rate=MIXDOWN_FRAME_RATE) \
+                .set_channels(MIXDOWN_CHANNELS)
+
+        mixdown = mixdown.overlay(segment)
+
+    return mixdown
+
+
+@job(unique=True, timeout=30 * 60)
+def render_song_mixdown(song_id):
+    try:
+        song = Song.objects.select_related('created_by').get(pk=song_id)
+    except Song.DoesNotExist:
+        return
+
+    tracks = list(get_downloadable_tracks(song.pk))
+    digest = get_track_set_digest(tracks)
+
+    if song.media_digest == digest:
+        return
+
+    tracks_with_audio = [track for track in tracks if track.audio_url]
+    media_url = None
+
+    if tracks_with_audio:
+        logging.info('rendering mixdown for song [%s] revision [%s]' % (song.pk, digest))
+        mixdown = mix_audio_segments(
+            (load_audio_segment(track.audio_url, track.audio_content_type) for track in tracks_with_audio),
+            len(tracks_with_audio))
+
+        s3_mixdown_upload_client = S3SongMixdownUploadClient(song, digest)
+        media_url = s3_mixdown_upload_client.get_upload_url()
+        mixdown_file = mixdown.export(io.BytesIO(), format='mp3', bitrate=MIXDOWN_BITRATE)
+        mixdown_file.seek(0)
+        s3_mixdown_upload_client.upload_file_obj(mixdown_file)
+        store_audio_peaks(media_url, mixdown)
+
+    # only publish the render if the track set did not change again while it was being mixed
+    current_digest = get_track_set_digest(get_downloadable_tracks(song.pk))
+    published = current_digest == digest and Song.objects.filter(pk=song.pk).update(
+        media_url=media_url, media_digest=digest)
+
+    if published:
+        bump_song_versions(song.pk)
+        stale_url = song.media_url if song.media_url != media_url else None
+    else:
+        stale_url = media_url
+
+    if stale_url:
+        S3BaseUploadClient.delete_object(S3BaseUploadClient.get_key_from_url(stale_url))
+        AudioPeaks.objects.filter(audio_url=stale_url).delete()
+
+
+def schedule_song_mixdown(song_id):
+    render_song_mixdown.enqueue(song_id)
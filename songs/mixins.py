@@ -1,11 +1,19 @@
 import logging
+import uuid
 
-from django.core import serializers
+from django.core import signing
 from django.core.urlresolvers import reverse
+from django.http import Http404
 from django.shortcuts import redirect
 from django.views.generic.base import ContextMixin
 
+from .identity_map import get_song, get_track
+from .metadata import AUDIO_METADATA_FIELDS
 from .models import Song, Track
+from .peaks import clear_audio_peaks
+from .renditions import clear_audio_renditions
+from .s3 import S3TrackUploadClient
+from .uploads import confirm_upload
 
 
 class HasAccessToSongMixin(object):
@@ -15,9 +23,9 @@ class HasAccessToSongMixin(object):
         })
 
     def dispatch(self, *args, **kwargs):
-        song = Song.objects.get(pk=self.kwargs['pk'])
+        song = get_song(self.request, self.kwargs['pk'])
 
-        if song.created_by == self.request.user:
+        if song.created_by_id == self.request.user.pk:
             return super(HasAccessToSongMixin, self).dispatch(*args, **kwargs)
         else:
             logging.warning(
@@ -33,24 +41,40 @@ class HasAccessToTrack(object):
         })
 
     def dispatch(self, *args, **kwargs):
-        track = Track.objects.get(pk=self.kwargs['track_id'])
+        track = get_track(self.request, self.kwargs['track_id'])
 
-        if track.created_by == self.request.user:
+        if track.created_by_id == self.request.user.pk:
             return super(HasAccessToTrack, self).dispatch(*args, **kwargs)
         else:
             logging.warning(
-                'user: [%s] attempted to access restricted action for track: [%s]' % (
-                    self.request.user, track.created_by))
+                'user: [%s] attempted to access restricted action for track of user: [%s]' % (
+                    self.request.user, track.created_by_id))
             return redirect(self.get_redirect_url())
 
 
+class SongObjectMixin(object):
+    def get_object(self, queryset=None):
+        try:
+            return get_song(self.request, self.kwargs['pk'])
+        except Song.DoesNotExist:
+            raise Http404('No song found matching the query')
+
+
+class TrackObjectMixin(object):
+    def get_object(self, queryset=None):
+        try:
+            return get_track(self.request, self.kwargs['track_id'])
+        except Track.DoesNotExist:
+            raise Http404('No track found matching the query')
+
+
 class SongMixin(ContextMixin):
     def get_context_data(self, **kwargs):
         context = super(SongMixin, self).get_context_data(**kwargs)
         song_pk = self.kwargs.get('pk')
 
         if song_pk:
-            context['song'] = Song.objects.get(pk=self.kwargs['pk'])
+            context['song'] = get_song(self.request, self.kwargs['pk'])
             context['tracks'] = context['song'].track_set.filter(public=False)
             context['contributor_tracks'] = context['song'].track_set.filter(public=True)
 
@@ -60,6 +84,90 @@ class SongMixin(ContextMixin):
 class MediaPlayerMixin(ContextMixin):
     def get_context_data(self, **kwargs):
         context = super(MediaPlayerMixin, self).get_context_data(**kwargs)
-        context['tracks'] = context['song'].track_set.all()
-        context['tracks_json'] = serializers.serialize("json", context['tracks'])
+        context['tracks'] = context['song'].track_set.select_related('created_by__profile', 'contributed_by__profile')
         return context
+
+
+class AudioUploadMixin(ContextMixin):
+    """
+    Sets the audio fields of a track form from either a file posted through the form or a file the browser already
+    uploaded straight to the storage with a signed upload token.
+    """
+    upload_client_class = S3TrackUploadClient
+    upload_kind = 'track'
+
+    def get_direct_upload_url(self):
+        return reverse('songs:track_upload', kwargs={
+            'pk': self.kwargs['pk']
+        })
+
+    def get_context_data(self, **kwargs):
+        context = super(AudioUploadMixin, self).get_context_data(**kwargs)
+        # without direct uploads the audio file is sent along with the form
+        context['direct_upload_url'] = self.get_direct_upload_url() \
+            if self.upload_client_class.storage.direct_uploads else ''
+        return context
+
+    def get_pending_upload_key(self, song, audio_file):
+        """
+        A new track or request has no uuid of its own yet. The one its audio went to is kept in the session until the
+        upload finished, so sending the same file again after a failure resumes the upload under the same key.
+        """
+        return 'pending_audio_upload:%s:%s:%s:%s' % (self.upload_kind, song.pk, audio_file.name, audio_file.size)
+
+    def set_audio(self, form, song, audio_uuid=None):
+        """
+        Returns the uuid the audio was stored under, or None when no audio was sent with the form.
+        """
+        audio_file = self.request.FILES.get('audio')
+        upload_token = self.request.POST.get('audio_upload_token')
+
+        if audio_file:
+            pending_upload_key = None if audio_uuid else self.get_pending_upload_key(song, audio_file)
+
+            if pending_upload_key:
+                audio_uuid = self.request.session.get(pending_upload_key) or str(uuid.uuid4())
+                self.request.session[pending_upload_key] = audio_uuid
+                # saved now rather than with the response, a worker killed half way through never sends one
+                self.request.session.save()
+
+            upload_client = self.upload_client_class(song, audio_uuid, audio_file.content_type)
+            form.instance.audio_name = audio_file.name
+            form.instance.audio_size = audio_file.size
+            upload_client.upload_file_obj(audio_file)
+
+            if pending_upload_key:
+                del self.request.session[pending_upload_key]
+        elif upload_token:
+            upload = confirm_upload(upload_token, song, self.request.user, self.upload_kind)
+
+            if audio_uuid and upload['uuid'] != str(audio_uuid):
+                raise signing.BadSignature('upload token was not issued for this track')
+
+            audio_uuid = upload['uuid']
+            upload_client = self.upload_client_class(song, audio_uuid, upload['content_type'])
+            # the browser could have uploaded anything within the signed limits, trust the storage over the form
+            form.instance.audio_size = upload_client.get_uploaded_size()
+            form.instance.audio_name = self.request.POST.get('audio_name') or upload_client.file_name
+        else:
+            return None
+
+        # the archive and mixdown digests would not notice new audio under the url the track already had
+        form.instance.audio_replaced = form.instance.audio_url == upload_client.get_upload_url()
+        form.instance.audio_url = upload_client.get_upload_url()
+        form.instance.audio_content_type = upload_client.file_content_type
+
+        if form.instance.audio_replaced:
+            # a replaced track keeps its key, what was derived from the audio it had is stale
+            clear_audio_renditions(form.instance.audio_url)
+            clear_audio_peaks(form.instance.audio_url)
+
+        for field in AUDIO_METADATA_FIELDS:
+            setattr(form.instance, field, None)
+
+        return audio_uuid
+
+    def audio_upload_invalid(self, form):
+        logging.warning('user: [%s] sent an audio upload that could not be confirmed' % self.request.user)
+        form.add_error(None, 'The uploaded audio file could not be found, please upload it again.')
+        return self.form_invalid(form)
@@ -1,5 +1,7 @@
 import uuid
 
+from django.contrib.postgres.fields import ArrayField
+from django.core.urlresolvers import reverse
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -13,11 +15,19 @@ class Song(models.Model):
     updated = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     media_url = models.CharField(max_length=500, null=True, blank=True)
+    media_digest = models.CharField(max_length=40, null=True, blank=True)
     description = models.TextField(max_length=2000, null=True, blank=True)
     published = models.BooleanField(default=False)
     license = models.CharField(choices=(("cc-by-4.0", "Creative Commons Attribution 4.0"),), default="cc-by-4.0",
                                max_length=100)
     uuid = models.UUIDField(default=uuid.uuid4)
+    # public tracks waiting for a contributor, kept current by songs.slots
+    open_slot_count = models.IntegerField(default=0)
+    open_instruments = ArrayField(models.CharField(max_length=100), default=list, blank=True)
+
+    class Meta:
+        # the song index pages newest first by (created, id)
+        index_together = [('created', 'id')]
 
     def __str__(self):
         return self.title
@@ -30,11 +40,26 @@ class SongStats(models.Model):
     song = models.OneToOneField(Song, on_delete=models.CASCADE)
     likes = models.IntegerField(default=0)
     views = models.IntegerField(default=0)
+    downloads = models.IntegerField(default=0)
 
     class Meta:
         db_table = 'songs_song_stats'
 
 
+def get_track_peaks_url(song_id, track_id, updated):
+    return '%s?v=%d' % (reverse('songs:track_peaks', kwargs={
+        'pk': song_id,
+        'track_id': track_id
+    }), updated.timestamp())
+
+
+def get_track_audio_url(song_id, track_id, updated):
+    return '%s?v=%d' % (reverse('songs:track_audio', kwargs={
+        'pk': song_id,
+        'track_id': track_id
+    }), updated.timestamp())
+
+
 class Track(models.Model):
     TRACK_INSTRUMENT_CHOICES = Skill.SKILL_CHOICES
 
@@ -45,6 +70,13 @@ class Track(models.Model):
     audio_name = models.CharField(max_length=500, null=True, blank=True)
     audio_size = models.IntegerField(null=True, blank=True)
     audio_content_type = models.CharField(max_length=100, null=True, blank=True)
+    # read from the audio headers by songs.metadata after upload
+    audio_duration = models.FloatField(null=True, blank=True)
+    audio_sample_rate = models.IntegerField(null=True, blank=True)
+    audio_channels = models.IntegerField(null=True, blank=True)
+    audio_bit_depth = models.IntegerField(null=True, blank=True)
+    audio_bitrate = models.IntegerField(null=True, blank=True)
+    audio_codec = models.CharField(max_length=50, null=True, blank=True)
     public = models.BooleanField(default=False)
     song = models.ForeignKey(Song, on_delete=models.CASCADE)
     created = models.DateTimeField(auto_now_add=True)
@@ -59,6 +91,12 @@ class Track(models.Model):
     def get_license_information(self):
         return license[self.license]
 
+    def get_peaks_url(self):
+        return get_track_peaks_url(self.song_id, self.pk, self.updated)
+
+    def get_audio_url(self):
+        return get_track_audio_url(self.song_id, self.pk, self.updated)
+
 
 class TrackRequest(models.Model):
     STATUS_CHOICES = (
@@ -72,6 +110,13 @@ class TrackRequest(models.Model):
     audio_name = models.CharField(max_length=500, null=True, blank=True)
     audio_size = models.IntegerField(null=True, blank=True)
     audio_content_type = models.CharField(max_length=100, null=True, blank=True)
+    # read from the audio headers by songs.metadata after upload
+    audio_duration = models.FloatField(null=True, blank=True)
+    audio_sample_rate = models.IntegerField(null=True, blank=True)
+    audio_channels = models.IntegerField(null=True, blank=True)
+    audio_bit_depth = models.IntegerField(null=True, blank=True)
+    audio_bitrate = models.IntegerField(null=True, blank=True)
+    audio_codec = models.CharField(max_length=50, null=True, blank=True)
     status = models.CharField(default='pending', max_length=100, choices=STATUS_CHOICES)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -83,5 +128,96 @@ class TrackRequest(models.Model):
     def __str__(self):
         return self.audio_name
 
+    def get_peaks_url(self):
+        return '%s?v=%d' % (reverse('songs:track_request_peaks', kwargs={
+            'pk': self.track.song_id,
+            'track_id': self.track_id,
+            'track_request_id': self.pk
+        }), self.updated.timestamp())
+
+    def get_audio_url(self):
+        return '%s?v=%d' % (reverse('songs:track_request_audio', kwargs={
+            'pk': self.track.song_id,
+            'track_id': self.track_id,
+            'track_request_id': self.pk
+        }), self.updated.timestamp())
+
     class Meta:
         db_table = 'songs_track_requests'
+        # track request dashboards page the requests of a song owner's tracks and of a contributor by status
+        index_together = [('status', 'track'), ('created_by', 'status')]
+
+
+class SongArchive(models.Model):
+    song = models.ForeignKey(Song, on_delete=models.CASCADE)
+    digest = models.CharField(max_length=40)
+    archive_url = models.CharField(max_length=500)
+    archive_size = models.BigIntegerField(null=True, blank=True)
+    built = models.BooleanField(default=False)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.digest
+
+    class Meta:
+        db_table = 'songs_song_archives'
+        unique_together = (("song", "digest"),)
+
+
+class AudioPeaks(models.Model):
+    audio_url = models.CharField(max_length=500, unique=True)
+    data = models.BinaryField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.audio_url
+
+    class Meta:
+        db_table = 'songs_audio_peaks'
+
+
+class AudioRendition(models.Model):
+    # the original upload the rendition was transcoded from
+    audio_url = models.CharField(max_length=500)
+    format = models.CharField(max_length=10)
+    bitrate = models.IntegerField(help_text='kbps')
+    rendition_url = models.CharField(max_length=500)
+    size = models.IntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.rendition_url
+
+    class Meta:
+        db_table = 'songs_audio_renditions'
+        unique_together = [('audio_url', 'format', 'bitrate')]
+
+
+class UploadSession(models.Model):
+    key = models.CharField(max_length=500, unique=True)
+    upload_id = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    part_size = models.IntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        db_table = 'songs_upload_sessions'
+
+
+class UploadSessionPart(models.Model):
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name='parts')
+    part_number = models.IntegerField()
+    etag = models.CharField(max_length=100)
+
+    def __str__(self):
+        return '%s [%s]' % (self.session, self.part_number)
+
+    class Meta:
+        db_table = 'songs_upload_session_parts'
+        unique_together = (("session", "part_number"),)
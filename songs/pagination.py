@@ -0,0 +1,48 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+SONG_PAGE_SIZE = 25
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(song):
+    value = '%s|%d' % (song.created.isoformat(), song.pk)
+    return base64.urlsafe_b64encode(value.encode('ascii')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        created, pk = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii').split('|')
+        created = parse_datetime(created)
+    except (binascii.Error, TypeError, ValueError):
+        raise InvalidCursor(cursor)
+
+    if created is None or not pk.isdigit():
+        raise InvalidCursor(cursor)
+
+    return created, int(pk)
+
+
+def get_keyset_page(queryset, cursor=None, page_size=SONG_PAGE_SIZE):
+    """
+    Returns one page of songs, newest first, and the cursor of the next page or None on the last one. Pages seek past
+    the (created, id) of the previous page instead of using an offset, so a deep page costs the same as the first.
+    """
+
+    queryset = queryset.order_by('-created', '-id')
+
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        # the redundant created bound lets postgres start the index scan at the cursor instead of the newest song
+        queryset = queryset.filter(Q(created__lt=created) | Q(created=created, id__lt=pk), created__lte=created)
+
+    songs = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(songs[page_size - 1]) if len(songs) > page_size else None
+
+    return songs[:page_size], next_cursor
@@ -0,0 +1,94 @@
+import logging
+import math
+import struct
+
+import numpy as np
+
+from jobs.queue import job
+
+from .audio import load_audio_segment
+from .models import AudioPeaks
+
+# min/max pairs per zoom level, from the overview down to the most detailed
+PEAK_ZOOM_LEVELS = (256, 1024, 4096)
+
+# each level is stored as an audiowaveform .dat (version 1) block so it can be served and parsed on its own
+PEAKS_VERSION = 1
+PEAKS_FLAG_8_BIT = 1
+PEAKS_HEADER = struct.Struct('<iIiiI')
+
+SAMPLE_TYPES = {
+    1: np.int8,
+    2: np.int16,
+    4: np.int32,
+}
+
+
+def compute_peaks(segment, levels=PEAK_ZOOM_LEVELS, bits=8):
+    if segment.sample_width not in SAMPLE_TYPES:
+        segment = segment.set_sample_width(2)
+
+    samples = np.frombuffer(segment.raw_data, dtype=SAMPLE_TYPES[segment.sample_width])
+    samples = samples[:len(samples) - len(samples) % segment.channels].reshape(-1, segment.channels)
+
+    # fold every channel into a single waveform
+    lows = samples.min(axis=1)
+    highs = samples.max(axis=1)
+
+    output_type, flags = (np.int8, PEAKS_FLAG_8_BIT) if bits == 8 else (np.int16, 0)
+    output_max = np.iinfo(output_type).max
+    scale = output_max / float(2 ** (8 * segment.sample_width - 1))
+
+    data = b''
+
+    for level in levels:
+        length = min(level, len(samples))
+        samples_per_pixel = int(math.ceil(len(samples) / length)) if length else 0
+        peaks = np.empty(2 * length, dtype=output_type)
+
+        if length:
+            starts = (np.arange(length, dtype=np.int64) * len(samples)) // length
+            peaks[0::2] = np.clip(np.round(np.minimum.reduceat(lows, starts) * scale), -output_max - 1, output_max)
+            peaks[1::2] = np.clip(np.round(np.maximum.reduceat(highs, starts) * scale), -output_max - 1, output_max)
+
+        data += PEAKS_HEADER.pack(PEAKS_VERSION, flags, segment.frame_rate, samples_per_pixel, length)
+        data += peaks.astype(np.dtype(output_type).newbyteorder('<')).tobytes()
+
+    return data
+
+
+def get_peaks_level(data, zoom):
+    offset = 0
+
+    for level in range(zoom + 1):
+        version, flags, sample_rate, samples_per_pixel, length = PEAKS_HEADER.unpack_from(data, offset)
+        size = PEAKS_HEADER.size + 2 * length * (1 if flags & PEAKS_FLAG_8_BIT else 2)
+
+        if level == zoom:
+            return data[offset:offset + size]
+
+        offset += size
+
+
+def store_audio_peaks(audio_url, segment):
+    AudioPeaks.objects.update_or_create(audio_url=audio_url, defaults={
+        'data': compute_peaks(segment)
+    })
+
+
+def clear_audio_peaks(audio_url):
+    # a new upload to the same key would otherwise keep showing the waveform of the audio it replaced
+    AudioPeaks.objects.filter(audio_url=audio_url).delete()
+
+
+@job(unique=True)
+def generate_audio_peaks(audio_url, content_type):
+    if AudioPeaks.objects.filter(audio_url=audio_url).exists():
+        return
+
+    logging.info('generating peaks for [%s]' % audio_url)
+    store_audio_peaks(audio_url, load_audio_segment(audio_url, content_type))
+
+
+def schedule_audio_peaks(audio_url, content_type):
+    generate_audio_peaks.enqueue(audio_url, content_type)
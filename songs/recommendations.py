@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.expressions import RawSQL
+
+from melody_buddy.cache import bump_versions, get_versioned_key
+from users.models import Skill
+from .models import Song
+from .slots import get_open_songs
+
+RECOMMENDATION_COUNT = 10
+RECOMMENDATION_CACHE_TIMEOUT = 15 * 60
+
+# how many of the open instruments of a song are in the given list
+MATCHING_INSTRUMENTS_SQL = '''
+    cardinality(ARRAY(SELECT unnest(songs_song.open_instruments) INTERSECT SELECT unnest(%s::varchar[])))
+'''
+
+
+def get_instrument_version_keys(kind, instruments):
+    return ['recommendations:%s:%s' % (kind, instrument) for instrument in sorted(instruments)]
+
+
+def instrument_slots_changed(*instruments):
+    bump_versions(get_instrument_version_keys('slots', [instrument for instrument in instruments if instrument]))
+
+
+def instrument_skills_changed(*instruments):
+    bump_versions(get_instrument_version_keys('skills', instruments))
+
+
+def get_cached(prefix, version_keys, compute):
+    """
+    Results are cached under the versions of every instrument they were computed from, so a change to one instrument
+    only recomputes the recommendations that involve it.
+    """
+    key = get_versioned_key(prefix, version_keys)
+    result = cache.get(key)
+
+    if result is None:
+        result = compute()
+        cache.set(key, result, RECOMMENDATION_CACHE_TIMEOUT)
+
+    return result
+
+
+def get_songs_needing_user(user):
+    """
+    Returns the songs with open slots for the instruments `user` plays, the ones matching the most skills first.
+    """
+    instruments = list(Skill.objects.filter(user=user).order_by('name').values_list('name', flat=True))
+
+    if not instruments:
+        return []
+
+    def compute():
+        songs = get_open_songs(Song.objects.select_related('created_by__profile'), exclude_user=user).filter(
+            open_instruments__overlap=instruments
+        ).annotate(matching_instruments=RawSQL(MATCHING_INSTRUMENTS_SQL, (instruments,)))
+
+        return list(songs.order_by('-matching_instruments', '-created', '-id')[:RECOMMENDATION_COUNT])
+
+    return get_cached('recommendations:songs:%s:%s' % (user.pk, ','.join(instruments)),
+                      get_instrument_version_keys('slots', instruments), compute)
+
+
+def get_musicians_for_song(song):
+    """
+    Returns the users who play an instrument the open slots of `song` need, the ones covering the most slots and with
+    the most contributions first.
+    """
+    if not song.open_instruments:
+        return []
+
+    def compute():
+        skilled_users = Skill.objects.filter(name__in=song.open_instruments).values('user_id')
+        musicians = User.objects.filter(pk__in=skilled_users).exclude(pk=song.created_by_id).annotate(
+            matching_instruments=RawSQL(
+                'SELECT COUNT(*) FROM users_skill WHERE users_skill.user_id = auth_user.id AND users_skill.name IN %s',
+                (tuple(song.open_instruments),))
+        ).select_related('profile', 'profilestats')
+
+        return list(musicians.order_by('-matching_instruments', '-profilestats__contribution_count', 'username')[
+                    :RECOMMENDATION_COUNT])
+
+    version_keys = get_instrument_version_keys('skills', song.open_instruments)
+    return get_cached('recommendations:musicians:%s:%s' % (song.pk, ','.join(sorted(song.open_instruments))),
+                      version_keys, compute)
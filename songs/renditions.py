@@ -0,0 +1,111 @@
+import io
+import logging
+
+from django.utils import timezone
+
+from jobs.queue import job
+from melody_buddy.cache import bump_song_versions
+
+from .audio import load_audio_segment
+from .models import AudioRendition, Track, TrackRequest
+from .s3 import S3AudioRenditionUploadClient, S3BaseUploadClient
+
+# (format, kbps) of the renditions the player streams instead of the original upload
+STREAMING_RENDITIONS = (
+    ('mp3', 96),
+    ('mp3', 160),
+)
+
+RENDITION_CONTENT_TYPES = {
+    'mp3': 'audio/mp3',
+    'opus': 'audio/ogg',
+}
+
+RENDITION_CODECS = {
+    'opus': 'libopus',
+}
+
+
+def get_stream_rendition(audio_url):
+    """
+    Returns the lightest rendition of an upload, which players stream instead of the original, or None until one
+    has been transcoded.
+    """
+    return AudioRendition.objects.filter(audio_url=audio_url).order_by('bitrate').first()
+
+
+def get_missing_renditions(audio_url, source_bitrate):
+    """
+    Returns the renditions an upload still needs. A rendition is only worth streaming when it is lighter than the
+    original, an upload already compressed below every rendition is streamed as it is.
+    """
+    existing = set(AudioRendition.objects.filter(audio_url=audio_url).values_list('format', 'bitrate'))
+
+    return [(audio_format, bitrate) for audio_format, bitrate in STREAMING_RENDITIONS
+            if (audio_format, bitrate) not in existing and (not source_bitrate or bitrate * 1000 < source_bitrate)]
+
+
+def clear_audio_renditions(audio_url):
+    """
+    Drops the renditions of an upload whose object was replaced, a new upload to the same key would otherwise count
+    as rendered and keep streaming the old audio.
+    """
+    renditions = AudioRendition.objects.filter(audio_url=audio_url)
+
+    for rendition_url in renditions.values_list('rendition_url', flat=True):
+        S3BaseUploadClient.delete_object(S3BaseUploadClient.get_key_from_url(rendition_url))
+
+    renditions.delete()
+
+
+def get_source_bitrate(audio_url):
+    """
+    Returns the bitrate analyze_audio stored for an upload, which schedules the renditions once it knows it.
+    """
+    for model in (Track, TrackRequest):
+        bitrate = model.objects.filter(audio_url=audio_url).exclude(audio_bitrate=None).values_list(
+            'audio_bitrate', flat=True).first()
+
+        if bitrate:
+            return bitrate
+
+    return None
+
+
+@job(unique=True, timeout=30 * 60)
+def render_audio_renditions(audio_url, content_type):
+    # every rendition there already, whatever the original's bitrate
+    if not get_missing_renditions(audio_url, None):
+        return
+
+    renditions = get_missing_renditions(audio_url, get_source_bitrate(audio_url))
+
+    if not renditions:
+        return
+
+    logging.info('rendering %s for [%s]' % (', '.join('%s %dk' % rendition for rendition in renditions), audio_url))
+    segment = load_audio_segment(audio_url, content_type)
+
+    for audio_format, bitrate in renditions:
+        upload_client = S3AudioRenditionUploadClient(audio_url, bitrate, RENDITION_CONTENT_TYPES[audio_format])
+        rendition_file = segment.export(io.BytesIO(), format=audio_format, bitrate='%dk' % bitrate,
+                                        codec=RENDITION_CODECS.get(audio_format))
+        size = len(rendition_file.getvalue())
+        rendition_file.seek(0)
+        upload_client.upload_file_obj(rendition_file)
+
+        AudioRendition.objects.update_or_create(audio_url=audio_url, format=audio_format, bitrate=bitrate, defaults={
+            'rendition_url': upload_client.get_upload_url(),
+            'size': size
+        })
+
+    # the new updated time moves the track manifest etag, so players switch over to the rendition
+    now = timezone.now()
+    tracks = Track.objects.filter(audio_url=audio_url)
+    tracks.update(updated=now)
+    TrackRequest.objects.filter(audio_url=audio_url).update(updated=now)
+    bump_song_versions(*tracks.values_list('song_id', flat=True))
+
+
+def schedule_audio_renditions(audio_url, content_type):
+    render_audio_renditions.enqueue(audio_url, content_type)
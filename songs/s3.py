@@ -1,11 +1,39 @@
+import hashlib
+import logging
+import math
 import os
-import boto3
+import posixpath
+import queue
+import threading
+import time
+
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.conf import settings
+from django.utils import timezone
+
+from melody_buddy.storage import MissingUpload, StorageError, get_storage
+from .models import UploadSession, UploadSessionPart
+
+# shared by every download in the process so the total number of in flight s3 fetches stays bounded
+fetch_executor = ThreadPoolExecutor(max_workers=settings.S3_MAX_CONCURRENCY)
+# kept apart from the fetches so a burst of large uploads can not stall downloads
+upload_executor = ThreadPoolExecutor(max_workers=settings.S3_MAX_CONCURRENCY)
+
+
+def get_file_size(file_obj):
+    size = getattr(file_obj, 'size', None)
+
+    if size is None:
+        position = file_obj.tell()
+        size = file_obj.seek(0, os.SEEK_END)
+        file_obj.seek(position)
+
+    return size
 
 
 class S3BaseUploadClient:
-    bucket = os.environ.get('S3_BUCKET')
-    client = boto3.client('s3')
-    s3_domain = 'https://s3-us-west-2.amazonaws.com'
+    # every upload and download goes through the configured storage, s3 unless STORAGE_BACKEND says otherwise
+    storage = get_storage()
 
     def __init__(self, file_name, file_content_type):
         file_extension = str(file_content_type.split("/")[1])
@@ -16,13 +44,293 @@ class S3BaseUploadClient:
         raise Exception('Override this base method')
 
     def get_upload_url(self):
-        return '%s/%s/%s' % (self.s3_domain, self.bucket, self.get_upload_path())
+        return self.storage.url(self.get_upload_path())
+
+    @classmethod
+    def get_key_from_url(cls, url):
+        return cls.storage.get_key(url)
+
+    @classmethod
+    def iter_object_chunks(cls, key, chunk_size=1024 * 1024):
+        return cls.storage.iter_chunks(key, chunk_size)
+
+    @classmethod
+    def read_object_head(cls, key, length):
+        """
+        Returns the first `length` bytes of an object, or all of it when it is shorter, and the size of the whole
+        object.
+        """
+        return cls.storage.get_range(key, 0, length - 1)
+
+    @classmethod
+    def delete_object(cls, key):
+        cls.storage.delete(key)
+
+    def get_presigned_post(self, max_size, expires_in=3600):
+        return self.storage.get_presigned_post(self.get_upload_path(), self.file_content_type, max_size, expires_in)
+
+    def get_presigned_put_url(self, expires_in=3600):
+        return self.storage.get_presigned_put_url(self.get_upload_path(), self.file_content_type, expires_in)
+
+    def get_uploaded_size(self):
+        return self.storage.size(self.get_upload_path())
 
     def upload_file_obj(self, file_obj):
-        self.client.upload_fileobj(file_obj, self.bucket, self.get_upload_path(), ExtraArgs={
-            'ACL': 'public-read',
-            'ContentType': file_obj.content_type
-        })
+        if get_file_size(file_obj) >= settings.S3_MULTIPART_THRESHOLD:
+            return S3ResumableUpload(self).upload(file_obj)
+
+        self.storage.put(self.get_upload_path(), file_obj, self.file_content_type)
+
+
+class S3ObjectFetch:
+    """
+    Reads an s3 object on a worker thread into a small bounded buffer so the next tracks of a download are already
+    transferring while the current one is being written out.
+    """
+    done = object()
+
+    def __init__(self, key, chunk_size=1024 * 1024, buffer_chunks=8):
+        self.key = key
+        self.chunk_size = chunk_size
+        self.buffer = queue.Queue(maxsize=buffer_chunks)
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def start(self):
+        self.future = fetch_executor.submit(self.run)
+
+    def cancel(self):
+        self.cancelled.set()
+
+        if self.future:
+            self.future.cancel()
+
+    def run(self):
+        try:
+            for chunk in S3BaseUploadClient.iter_object_chunks(self.key, self.chunk_size):
+                if not self.put(chunk):
+                    return
+            self.put(self.done)
+        except Exception as e:
+            self.put(e)
+
+    def put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def __iter__(self):
+        if self.future is None or self.future.cancel():
+            # the fetch never reached a worker, read it on the calling thread instead of waiting behind other
+            # downloads' prefetches
+            yield from S3BaseUploadClient.iter_object_chunks(self.key, self.chunk_size)
+            return
+
+        while True:
+            item = self.buffer.get()
+
+            if item is self.done:
+                return
+            if isinstance(item, Exception):
+                raise item
+
+            yield item
+
+
+def iter_objects(keys, concurrency=None):
+    """
+    Yields a chunk iterator for every key in the given order while up to `concurrency` of the following objects are
+    fetched in the background.
+    """
+    concurrency = concurrency or settings.S3_DOWNLOAD_CONCURRENCY
+    fetches = [S3ObjectFetch(key) for key in keys]
+
+    try:
+        for index, fetch in enumerate(fetches):
+            for prefetch in fetches[index + 1:index + concurrency]:
+                if prefetch.future is None:
+                    prefetch.start()
+
+            yield fetch
+    finally:
+        for fetch in fetches:
+            fetch.cancel()
+
+
+class S3MultipartUpload:
+    part_size = 8 * 1024 * 1024
+
+    def __init__(self, upload_client):
+        self.upload_client = upload_client
+        self.key = upload_client.get_upload_path()
+        self.buffer = bytearray()
+        self.parts = []
+        self.upload_id = None
+
+    def start(self):
+        self.upload_id = S3BaseUploadClient.storage.create_multipart_upload(self.key,
+                                                                            self.upload_client.file_content_type)
+
+    def write(self, data):
+        self.buffer.extend(data)
+
+        while len(self.buffer) >= self.part_size:
+            self.upload_part(bytes(self.buffer[:self.part_size]))
+            del self.buffer[:self.part_size]
+
+    def upload_part(self, data):
+        part_number = len(self.parts) + 1
+        etag = S3BaseUploadClient.storage.upload_part(self.key, self.upload_id, part_number, data)
+        self.parts.append((part_number, etag))
+
+    def complete(self):
+        if self.buffer or not self.parts:
+            self.upload_part(bytes(self.buffer))
+            self.buffer = bytearray()
+
+        S3BaseUploadClient.storage.complete_multipart_upload(self.key, self.upload_id, self.parts)
+
+    def abort(self):
+        S3BaseUploadClient.storage.abort_multipart_upload(self.key, self.upload_id)
+
+
+class S3ResumableUpload:
+    """
+    Uploads a seekable file in parts, a few at a time. Every finished part is recorded on an UploadSession so an
+    upload that fails part way only sends the missing parts the next time the same key is uploaded.
+    """
+    part_size = 8 * 1024 * 1024
+    retries = settings.S3_UPLOAD_PART_RETRIES
+    retry_delay = 1
+
+    def __init__(self, upload_client, concurrency=None):
+        self.upload_client = upload_client
+        self.key = upload_client.get_upload_path()
+        self.concurrency = concurrency or settings.S3_UPLOAD_CONCURRENCY
+        self.session = None
+
+    def get_session(self, size):
+        session = UploadSession.objects.filter(key=self.key).first()
+
+        if session and (session.size, session.part_size, session.content_type) == (
+                size, self.part_size, self.upload_client.file_content_type):
+            logging.info('resuming upload [%s] with [%s] parts done' % (self.key, session.parts.count()))
+            return session
+
+        if session:
+            abort_upload_session(session)
+
+        upload_id = S3BaseUploadClient.storage.create_multipart_upload(self.key, self.upload_client.file_content_type)
+
+        return UploadSession.objects.create(key=self.key, upload_id=upload_id, size=size,
+                                            part_size=self.part_size,
+                                            content_type=self.upload_client.file_content_type)
+
+    def upload(self, file_obj):
+        try:
+            self._upload(file_obj)
+        except MissingUpload:
+            # the multipart upload expired or was cleaned up under the session, start over
+            logging.warning('multipart upload for [%s] is gone, restarting it' % self.key)
+            UploadSession.objects.filter(pk=self.session.pk).delete()
+            self._upload(file_obj)
+
+    def _upload(self, file_obj):
+        size = get_file_size(file_obj)
+        self.session = self.get_session(size)
+        parts = dict(self.session.parts.values_list('part_number', 'etag'))
+        in_flight = {}
+
+        try:
+            for part_number in range(1, max(1, math.ceil(size / self.part_size)) + 1):
+                file_obj.seek((part_number - 1) * self.part_size)
+                data = file_obj.read(self.part_size)
+
+                # part etags are the md5 of the part, a match means this exact part is already stored
+                if parts.get(part_number) == '"%s"' % hashlib.md5(data).hexdigest():
+                    continue
+
+                if len(in_flight) >= self.concurrency:
+                    self.record_parts(in_flight, parts, FIRST_COMPLETED)
+
+                in_flight[upload_executor.submit(self.upload_part, part_number, data)] = part_number
+
+            self.record_parts(in_flight, parts, ALL_COMPLETED)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+
+            # keep whatever did make it so the next attempt can skip it
+            wait(in_flight)
+            for future, part_number in in_flight.items():
+                if not future.cancelled() and not future.exception():
+                    self.record_part(part_number, future.result())
+            raise
+
+        S3BaseUploadClient.storage.complete_multipart_upload(self.key, self.session.upload_id, sorted(parts.items()))
+        self.session.delete()
+
+    def record_parts(self, in_flight, parts, return_when):
+        done, _ = wait(in_flight, return_when=return_when)
+
+        for future in done:
+            part_number = in_flight.pop(future)
+            parts[part_number] = future.result()
+            self.record_part(part_number, parts[part_number])
+
+    def record_part(self, part_number, etag):
+        UploadSessionPart.objects.update_or_create(session=self.session, part_number=part_number,
+                                                   defaults={'etag': etag})
+        UploadSession.objects.filter(pk=self.session.pk).update(updated=timezone.now())
+
+    def upload_part(self, part_number, data):
+        for attempt in range(self.retries + 1):
+            try:
+                return S3BaseUploadClient.storage.upload_part(self.key, self.session.upload_id, part_number, data)
+            except StorageError as e:
+                if attempt == self.retries or isinstance(e, MissingUpload):
+                    raise
+
+                logging.warning('retrying part [%s] of [%s] after error [%s]' % (part_number, self.key, e))
+                time.sleep(self.retry_delay * 2 ** attempt)
+
+
+def abort_upload_session(session):
+    logging.info('aborting multipart upload [%s] for [%s]' % (session.upload_id, session.key))
+
+    try:
+        S3BaseUploadClient.storage.abort_multipart_upload(session.key, session.upload_id)
+    except MissingUpload:
+        pass
+
+    session.delete()
+
+
+def clear_abandoned_uploads(older_than):
+    """
+    Aborts multipart uploads nobody touched since `older_than`, both the tracked sessions and any upload the bucket
+    still holds without one, since the stored parts take up space until they are aborted.
+    """
+    aborted = 0
+
+    for session in UploadSession.objects.filter(updated__lt=older_than):
+        abort_upload_session(session)
+        aborted += 1
+
+    live_upload_ids = set(UploadSession.objects.values_list('upload_id', flat=True))
+
+    for key, upload_id, initiated in list(S3BaseUploadClient.storage.list_multipart_uploads()):
+        if upload_id not in live_upload_ids and initiated < older_than:
+            logging.info('aborting untracked multipart upload [%s] for [%s]' % (upload_id, key))
+            S3BaseUploadClient.storage.abort_multipart_upload(key, upload_id)
+            aborted += 1
+
+    return aborted
 
 
 class S3TrackUploadClient(S3BaseUploadClient):
@@ -41,3 +349,44 @@ class S3TrackRequestUploadClient(S3BaseUploadClient):
 
     def get_upload_path(self):
         return '%s/songs/%s/requests/%s' % (self.song.created_by, self.song.uuid, self.file_name)
+
+
+class S3SongArchiveUploadClient(S3BaseUploadClient):
+    def __init__(self, song, file_name):
+        self.song = song
+        super().__init__(file_name, 'application/zip')
+
+    def get_upload_path(self):
+        return '%s/songs/%s/archives/%s' % (self.song.created_by, self.song.uuid, self.file_name)
+
+
+class S3SongMixdownUploadClient(S3BaseUploadClient):
+    def __init__(self, song, file_name):
+        self.song = song
+        super().__init__(file_name, 'audio/mp3')
+
+    def get_upload_path(self):
+        return '%s/songs/%s/mixdowns/%s' % (self.song.created_by, self.song.uuid, self.file_name)
+
+
+class S3AudioRenditionUploadClient(S3BaseUploadClient):
+    """
+    Stores a streaming rendition next to its original upload, `tracks/guitar.wav` gets `tracks/guitar.96k.mp3`.
+    """
+
+    def __init__(self, audio_url, bitrate, file_content_type):
+        self.source_key = self.get_key_from_url(audio_url)
+        super().__init__('%s.%dk' % (posixpath.splitext(self.source_key)[0], bitrate), file_content_type)
+
+    def get_upload_path(self):
+        return self.file_name
+
+
+class S3AvatarUploadClient(S3BaseUploadClient):
+    def __init__(self, user, file_name, file_content_type):
+        self.user = user
+        self.avatar_file_name = file_name
+        super().__init__(file_name, file_content_type)
+
+    def get_upload_path(self):
+        return '%s/avatars/%s' % (self.user, self.avatar_file_name)
@@ -0,0 +1,193 @@
+import hashlib
+import io
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+
+class LocalS3StreamingBody:
+    def __init__(self, data, bandwidth=None):
+        self.stream = io.BytesIO(data)
+        self.bandwidth = bandwidth
+
+    def read(self, amt=None):
+        chunk = self.stream.read(amt)
+
+        if self.bandwidth and chunk:
+            time.sleep(len(chunk) / self.bandwidth)
+
+        return chunk
+
+    def close(self):
+        self.stream.close()
+
+
+class LocalS3Client:
+    """
+    In memory stand in for a boto3 s3 client used by tests and benchmarks. `latency` is added to every request in
+    seconds and `bandwidth` throttles object reads in bytes per second to approximate a remote bucket.
+    """
+
+    def __init__(self, latency=0, bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.objects = {}
+        self.multipart_uploads = {}
+        self.lock = threading.Lock()
+
+    def _request(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _get(self, bucket, key):
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': key}}, 'GetObject')
+
+    def put_object(self, Bucket, Key, Body=b'', ContentType=None, **kwargs):
+        self._request()
+
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+
+        with self.lock:
+            self.objects[(Bucket, Key)] = {'Body': Body, 'ContentType': ContentType}
+
+        return {}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, **kwargs):
+        self.put_object(Bucket, Key, Fileobj, **(ExtraArgs or {}))
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self._request()
+        s3_object = self._get(Bucket, Key)
+        body = s3_object['Body']
+        response = {'ContentType': s3_object['ContentType']}
+
+        if Range:
+            start, end = Range[len('bytes='):].split('-')
+            end = min(int(end), len(body) - 1) if end else len(body) - 1
+            response['ContentRange'] = 'bytes %s-%d/%d' % (start, end, len(body))
+            body = body[int(start):end + 1]
+
+        response['Body'] = LocalS3StreamingBody(body, self.bandwidth)
+        response['ContentLength'] = len(body)
+        return response
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._request()
+        s3_object = self._get(Bucket, Key)
+
+        return {
+            'ContentLength': len(s3_object['Body']),
+            'ContentType': s3_object['ContentType']
+        }
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._request()
+
+        with self.lock:
+            self.objects.pop((Bucket, Key), None)
+
+        return {}
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        self._request()
+        s3_object = self._get(CopySource['Bucket'], CopySource['Key'])
+
+        with self.lock:
+            self.objects[(Bucket, Key)] = dict(s3_object)
+
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix='', **kwargs):
+        self._request()
+
+        with self.lock:
+            keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+
+        return {'Contents': [{'Key': key, 'Size': len(self.objects[(Bucket, key)]['Body'])} for key in keys],
+                'IsTruncated': False}
+
+    def generate_presigned_post(self, Bucket, Key, Fields=None, Conditions=None, ExpiresIn=3600):
+        fields = dict(Fields or {}, key=Key)
+        return {'url': 'https://%s.s3.local/' % Bucket, 'fields': fields}
+
+    def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600):
+        return 'https://%s.s3.local/%s?X-Amz-Expires=%s' % (Params['Bucket'], Params['Key'], ExpiresIn)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None, **kwargs):
+        self._request()
+        upload_id = uuid.uuid4().hex
+
+        with self.lock:
+            self.multipart_uploads[upload_id] = {'Bucket': Bucket, 'Key': Key, 'ContentType': ContentType,
+                                                 'Parts': {}, 'Initiated': datetime.now(timezone.utc)}
+
+        return {'Bucket': Bucket, 'Key': Key, 'UploadId': upload_id}
+
+    def _get_multipart_upload(self, upload_id):
+        try:
+            return self.multipart_uploads[upload_id]
+        except KeyError:
+            raise ClientError({'Error': {'Code': 'NoSuchUpload', 'Message': upload_id}}, 'UploadPart')
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self._request()
+
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+
+        etag = '"%s"' % hashlib.md5(Body).hexdigest()
+
+        with self.lock:
+            self._get_multipart_upload(UploadId)['Parts'][PartNumber] = (etag, Body)
+
+        return {'ETag': etag}
+
+    def upload_part_copy(self, Bucket, Key, UploadId, PartNumber, CopySource, CopySourceRange=None, **kwargs):
+        response = self.get_object(CopySource['Bucket'], CopySource['Key'], Range=CopySourceRange)
+        etag = self.upload_part(Bucket, Key, UploadId, PartNumber, response['Body'])['ETag']
+        return {'CopyPartResult': {'ETag': etag}}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        self._request()
+
+        with self.lock:
+            upload = self._get_multipart_upload(UploadId)
+            body = b''
+
+            for part in MultipartUpload['Parts']:
+                etag, data = upload['Parts'][part['PartNumber']]
+
+                if etag != part['ETag']:
+                    raise ClientError({'Error': {'Code': 'InvalidPart', 'Message': part['PartNumber']}},
+                                      'CompleteMultipartUpload')
+
+                body += data
+
+            self.objects[(Bucket, Key)] = {'Body': body, 'ContentType': upload['ContentType']}
+            del self.multipart_uploads[UploadId]
+
+        return {'Bucket': Bucket, 'Key': Key}
+
+    def list_multipart_uploads(self, Bucket, **kwargs):
+        self._request()
+
+        with self.lock:
+            uploads = [{'Key': upload['Key'], 'UploadId': upload_id, 'Initiated': upload['Initiated']}
+                       for upload_id, upload in self.multipart_uploads.items() if upload['Bucket'] == Bucket]
+
+        return {'Uploads': uploads, 'IsTruncated': False}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._request()
+
+        with self.lock:
+            self.multipart_uploads.pop(UploadId, None)
+
+        return {}
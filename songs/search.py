@@ -0,0 +1,18 @@
+# songs_song.search_vector is kept current by a trigger on title and description, see migration 0010_song_search
+SONG_MATCH_SQL = "songs_song.search_vector @@ plainto_tsquery('english', %s) OR songs_song.title %% %s"
+SONG_RANK_SQL = '''
+    GREATEST(ts_rank_cd(songs_song.search_vector, plainto_tsquery('english', %s)), similarity(songs_song.title, %s))
+'''
+
+
+def search_songs(queryset, query):
+    """
+    Narrows `queryset` to songs whose title or description match `query`, best match first. Whole words go through the
+    full text index, misspelled titles are still found by trigram similarity.
+    """
+    return queryset.extra(
+        select={'rank': SONG_RANK_SQL},
+        select_params=(query, query),
+        where=[SONG_MATCH_SQL],
+        params=(query, query)
+    ).order_by('-rank', '-id')
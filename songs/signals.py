@@ -0,0 +1,138 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from melody_buddy.cache import bump_song_versions, bump_user_versions
+from users.models import Skill
+from .archive import build_song_archive, clear_song_archives, get_downloadable_tracks, get_track_set_digest
+from .metadata import schedule_audio_analysis
+from .mixdown import schedule_song_mixdown
+from .models import Song, SongArchive, Track, TrackRequest
+from .peaks import schedule_audio_peaks
+from .recommendations import instrument_skills_changed, instrument_slots_changed
+from .renditions import schedule_audio_renditions
+from .slots import recompute_open_slots
+
+
+@receiver(post_save, sender=Track)
+@receiver(pre_delete, sender=Track)
+def track_changed(sender, instance, raw=False, **kwargs):
+    """
+    Rebuilds the archive and the mixdown of a song once its downloadable tracks differ from the ones they were made
+    of. The digest only sees the audio url, audio stored again under the same key is flagged by `set_audio`.
+    """
+    if raw:
+        return
+
+    song_id = instance.song_id
+    tracks = get_downloadable_tracks(song_id)
+
+    if kwargs['signal'] is pre_delete:
+        tracks = tracks.exclude(pk=instance.pk)
+
+    tracks = list(tracks)
+    digest = get_track_set_digest(tracks)
+    audio_replaced = getattr(instance, 'audio_replaced', False)
+    archive_digests = set(SongArchive.objects.filter(song_id=song_id).values_list('digest', flat=True))
+
+    if audio_replaced or archive_digests - {digest}:
+        clear_song_archives(song_id)
+        archive_digests = set()
+
+    if digest not in archive_digests and any(track.audio_url for track in tracks):
+        build_song_archive.enqueue(song_id)
+
+    if audio_replaced:
+        Song.objects.filter(pk=song_id).update(media_digest=None)
+
+    if not Song.objects.filter(pk=song_id, media_digest=digest).exists():
+        schedule_song_mixdown(song_id)
+
+
+@receiver(post_init, sender=Track)
+@receiver(post_init, sender=TrackRequest)
+def audio_loaded(sender, instance, **kwargs):
+    instance._saved_audio_url = instance.audio_url if instance.pk else None
+
+
+@receiver(post_save, sender=Track)
+@receiver(post_save, sender=TrackRequest)
+def audio_uploaded(sender, instance, raw=False, **kwargs):
+    """
+    Schedules the work derived from the audio when a save stored new audio, not on every edit of the row. Connected
+    after `track_changed`, which still needs the `audio_replaced` flag this resets.
+    """
+    new_audio = instance.audio_url != instance._saved_audio_url or getattr(instance, 'audio_replaced', False)
+    instance._saved_audio_url, instance.audio_replaced = instance.audio_url, False
+
+    if raw or not new_audio or not instance.audio_url:
+        return
+
+    schedule_audio_peaks(instance.audio_url, instance.audio_content_type)
+
+    # renditions wait for the analysis when the bitrate is not known yet
+    if instance.audio_duration is None:
+        schedule_audio_analysis(instance.audio_url, instance.audio_content_type)
+    else:
+        schedule_audio_renditions(instance.audio_url, instance.audio_content_type)
+
+
+def get_open_slot(track):
+    return track.instrument if track.public else None
+
+
+@receiver(post_init, sender=Track)
+def track_loaded(sender, instance, **kwargs):
+    instance._counted_slot = get_open_slot(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Track)
+@receiver(post_delete, sender=Track)
+def track_slot_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    slot = None if kwargs['signal'] is post_delete else get_open_slot(instance)
+
+    if slot != instance._counted_slot:
+        recompute_open_slots([instance.song_id])
+        instrument_slots_changed(instance._counted_slot, slot)
+
+    instance._counted_slot = slot
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def skill_changed(sender, instance, created=False, raw=False, **kwargs):
+    if not raw and (created or kwargs['signal'] is post_delete):
+        instrument_skills_changed(instance.name)
+
+
+@receiver(post_save, sender=Song)
+@receiver(post_delete, sender=Song)
+def song_cache_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_song_versions(instance.pk)
+        bump_user_versions(instance.created_by_id)
+
+
+@receiver(post_save, sender=Track)
+@receiver(post_delete, sender=Track)
+def track_cache_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_song_versions(instance.song_id)
+        bump_user_versions(instance.created_by_id, instance.contributed_by_id)
+
+
+@receiver(post_save, sender=TrackRequest)
+@receiver(post_delete, sender=TrackRequest)
+def track_request_cache_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    track = Track.objects.filter(pk=instance.track_id).values_list('song_id', 'created_by_id').first()
+
+    if track:
+        bump_song_versions(track[0])
+        bump_user_versions(track[1])
+
+    bump_user_versions(instance.created_by_id)
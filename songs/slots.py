@@ -0,0 +1,55 @@
+from django.db import connection
+
+from .models import Song, Track
+
+# recounts the open slots of every song and only writes the songs that drifted from their tracks
+RECOMPUTE_OPEN_SLOTS_SQL = '''
+    UPDATE {song} AS song
+    SET open_slot_count = slots.open_slot_count,
+        open_instruments = slots.open_instruments
+    FROM (
+        SELECT {song}.id AS song_id,
+            (SELECT COUNT(*) FROM {track} WHERE song_id = {song}.id AND public) AS open_slot_count,
+            ARRAY(SELECT DISTINCT instrument FROM {track} WHERE song_id = {song}.id AND public ORDER BY instrument
+            ) AS open_instruments
+        FROM {song}
+        WHERE TRUE {song_filter}
+    ) AS slots
+    WHERE song.id = slots.song_id
+        AND (song.open_slot_count, song.open_instruments) IS DISTINCT FROM
+        (slots.open_slot_count, slots.open_instruments)
+'''
+
+
+def recompute_open_slots(song_ids=None):
+    """
+    Returns how many songs had open slots that drifted from their public tracks. Only the given songs are recounted
+    when `song_ids` is passed, which is how a track change keeps its song current.
+    """
+    song_filter, params = '', []
+
+    if song_ids is not None:
+        song_filter, params = 'AND %s.id IN %%s' % Song._meta.db_table, [tuple(song_ids) or (None,)]
+
+    sql = RECOMPUTE_OPEN_SLOTS_SQL.format(song=Song._meta.db_table, track=Track._meta.db_table,
+                                          song_filter=song_filter)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def get_open_songs(queryset, exclude_user=None, instrument=None):
+    """
+    Narrows `queryset` to songs with an open slot. The filters only touch songs_song columns, so the partial open slot
+    indexes can serve them without joining tracks.
+    """
+    queryset = queryset.filter(open_slot_count__gt=0)
+
+    if exclude_user is not None:
+        queryset = queryset.exclude(created_by=exclude_user)
+
+    if instrument:
+        queryset = queryset.filter(open_instruments__contains=[instrument])
+
+    return queryset
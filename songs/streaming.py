@@ -0,0 +1,178 @@
+import hashlib
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+from melody_buddy.storage import MissingObject, StorageFileResponse
+
+from .renditions import RENDITION_CONTENT_TYPES, get_stream_rendition
+from .s3 import S3BaseUploadClient
+
+BYTE_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# the audio a track plays from, `key` in the storage, and the validators of that exact object
+AudioSource = namedtuple('AudioSource', ('key', 'size', 'content_type', 'etag', 'last_modified'))
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def get_audio_source(audio_url, audio_size, content_type, updated):
+    """
+    Returns where the audio of a track or track request is streamed from, its lightest rendition once one has been
+    transcoded and the original upload until then. None when there is no audio or it is not in the storage.
+    """
+    if not audio_url:
+        return None
+
+    rendition = get_stream_rendition(audio_url)
+
+    if rendition:
+        audio_url, audio_size, content_type = rendition.rendition_url, rendition.size, \
+            RENDITION_CONTENT_TYPES[rendition.format]
+
+    try:
+        key = S3BaseUploadClient.get_key_from_url(audio_url)
+    except ValueError:
+        return None
+
+    if audio_size is None:
+        try:
+            audio_size = S3BaseUploadClient.storage.size(key)
+        except MissingObject:
+            return None
+
+    # the object under a key is replaced when a track's audio is, which always moves its updated time
+    etag = hashlib.md5(('%s\n%s\n%s' % (key, audio_size, updated.timestamp())).encode('utf-8')).hexdigest()
+    return AudioSource(key, audio_size, content_type or 'application/octet-stream', etag, updated)
+
+
+def parse_byte_range(header, size):
+    """
+    Returns the first and last byte of the single range a Range header asks for, or None when the whole object
+    should be sent: no header, one that does not parse or one asking for several ranges, which are rare enough to be
+    answered in full.
+    """
+    match = BYTE_RANGE_RE.match(header.strip()) if header else None
+
+    if not match or not any(match.groups()):
+        return None
+
+    first, last = match.groups()
+
+    if not first:
+        # a suffix range, the last `last` bytes
+        if not int(last):
+            raise RangeNotSatisfiable()
+        return max(size - int(last), 0), size - 1
+
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+
+    if first >= size:
+        raise RangeNotSatisfiable()
+    if last < first:
+        return None
+
+    return first, last
+
+
+def is_range_current(request, etag, last_modified):
+    """
+    A range is only sent when the client's If-Range still matches the object, otherwise the part it holds is stale
+    and the whole object is sent instead.
+    """
+    if_range = request.META.get('HTTP_IF_RANGE')
+
+    if not if_range:
+        return True
+
+    if if_range.startswith('"'):
+        return etag is not None and etag in parse_etags(if_range)
+
+    if_range_date = parse_http_date_safe(if_range)
+    return last_modified is not None and if_range_date is not None and \
+        if_range_date == int(last_modified.timestamp())
+
+
+def get_audio_head(storage, key, etag):
+    """
+    Returns the start of an object from the audio cache, every player opening a track asks for its first seconds
+    and scrubbing back to the start asks again.
+    """
+    audio_cache = caches['audio']
+    cache_key = 'audio_head:%s' % etag
+    head = audio_cache.get(cache_key)
+
+    if head is None:
+        head = storage.get_range(key, 0, settings.AUDIO_HEAD_CACHE_BYTES - 1)[0]
+        audio_cache.set(cache_key, head)
+
+    return head
+
+
+def iter_byte_range(storage, key, first, last, etag=None):
+    """
+    Yields the bytes from `first` to `last` in chunks of AUDIO_STREAM_CHUNK_SIZE. With an `etag` the part within
+    the cached head of the object is served from the cache.
+    """
+    if etag is not None and first < settings.AUDIO_HEAD_CACHE_BYTES:
+        head = get_audio_head(storage, key, etag)
+
+        for offset in range(first, min(last + 1, len(head)), settings.AUDIO_STREAM_CHUNK_SIZE):
+            yield head[offset:min(offset + settings.AUDIO_STREAM_CHUNK_SIZE, last + 1)]
+
+        first = max(first, len(head))
+
+    if first <= last:
+        yield from storage.iter_chunks(key, settings.AUDIO_STREAM_CHUNK_SIZE, first, last)
+
+
+def stream_response(request, storage, key, size, content_type, etag=None, last_modified=None, cache_head=False):
+    """
+    Returns a response streaming an object from the storage that honours Range and If-Range, a 206 with the
+    requested part, a 416 for a range past the end, or the whole object. The start of the object is served from the
+    audio cache when `cache_head` is set.
+    """
+    try:
+        byte_range = parse_byte_range(request.META.get('HTTP_RANGE'), size)
+    except RangeNotSatisfiable:
+        if is_range_current(request, etag, last_modified):
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%d' % size
+            return response
+
+        byte_range = None
+
+    if byte_range and not is_range_current(request, etag, last_modified):
+        byte_range = None
+
+    first, last = byte_range or (0, size - 1)
+
+    if request.method == 'HEAD' or not size:
+        response = HttpResponse(content_type=content_type)
+    elif byte_range or cache_head:
+        response = StreamingHttpResponse(iter_byte_range(storage, key, first, last, etag if cache_head else None),
+                                         content_type=content_type)
+    else:
+        # a whole object is handed to the wsgi server's file wrapper when it is stored locally
+        response = StorageFileResponse(storage.open(key), content_type=content_type)
+
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = 'bytes %d-%d/%d' % (first, last, size)
+
+    response['Content-Length'] = last - first + 1 if size else 0
+    response['Accept-Ranges'] = 'bytes'
+
+    if etag is not None:
+        response['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+
+    return response
@@ -0,0 +1,17 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter(name='audio_duration')
+def format_audio_duration(seconds):
+    if seconds is None:
+        return ''
+
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours:
+        return '%d:%02d:%02d' % (hours, minutes, seconds)
+
+    return '%d:%02d' % (minutes, seconds)
@@ -0,0 +1,146 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from jobs.models import Job
+from melody_buddy.storage import LocalFileStorage, MissingObject, S3Storage
+
+from ..approvals import delete_stale_audio, move_approved_audio
+from ..models import AudioPeaks, AudioRendition, Song, Track, TrackRequest
+from ..s3 import S3BaseUploadClient
+from ..s3_local import LocalS3Client
+from .test_songs import SongTestCase
+
+AUDIO = b'0123456789abcdefghij'
+
+
+class ApproveTrackRequestTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = LocalS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.request_key = 'creator/songs/%s/requests/guitar.mp3' % self.song.uuid
+        self.rendition_key = 'creator/songs/%s/requests/guitar.96k.mp3' % self.song.uuid
+        self.put(self.request_key, AUDIO)
+        self.put(self.rendition_key, AUDIO[:8])
+
+        self.audio_url = self.url(self.request_key)
+        self.track = Track.objects.create(instrument='guitar_electric', created_by=self.user_creator, song=self.song,
+                                          public=True)
+        self.track_request = TrackRequest.objects.create(track=self.track, created_by=self.user_contributor,
+                                                         audio_url=self.audio_url, audio_size=len(AUDIO),
+                                                         audio_content_type='audio/mp3')
+        self.rendition = AudioRendition.objects.create(audio_url=self.audio_url, format='mp3', bitrate=96,
+                                                       size=8, rendition_url=self.url(self.rendition_key))
+        AudioPeaks.objects.create(audio_url=self.audio_url, data=b'peaks')
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def put(self, key, body):
+        self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=key, Body=body)
+
+    def url(self, key):
+        return S3BaseUploadClient.storage.url(key)
+
+    def exists(self, key):
+        try:
+            S3BaseUploadClient.storage.size(key)
+        except MissingObject:
+            return False
+        return True
+
+    def approve(self):
+        self.login(self.user_creator)
+        self.client.post(reverse('songs:track_request_approve', kwargs={
+            'pk': self.song.pk,
+            'track_id': self.track.pk,
+            'track_request_id': self.track_request.pk
+        }))
+        self.track.refresh_from_db()
+
+    def test_approval_schedules_the_move(self):
+        self.approve()
+
+        self.assertEqual(self.track.audio_url, self.audio_url)
+        self.assertTrue(Job.objects.filter(name__endswith='move_approved_audio').exists())
+
+    def test_approved_audio_is_copied_into_the_tracks_of_the_song(self):
+        self.approve()
+        move_approved_audio(self.track.pk, self.audio_url)
+
+        track_key = 'creator/songs/%s/tracks/guitar.mp3' % self.song.uuid
+        rendition_key = 'creator/songs/%s/tracks/guitar.96k.mp3' % self.song.uuid
+        self.track.refresh_from_db()
+        self.track_request.refresh_from_db()
+        self.rendition.refresh_from_db()
+
+        self.assertEqual(self.track.audio_url, self.url(track_key))
+        self.assertEqual(self.track_request.audio_url, self.url(track_key))
+        self.assertEqual((self.rendition.audio_url, self.rendition.rendition_url),
+                         (self.url(track_key), self.url(rendition_key)))
+        self.assertTrue(AudioPeaks.objects.filter(audio_url=self.url(track_key)).exists())
+        self.assertEqual(S3BaseUploadClient.storage.get_range(track_key, 0, 100), (AUDIO, len(AUDIO)))
+
+        # players that loaded the request keep streaming it until the deletion is due
+        self.assertTrue(self.exists(self.request_key))
+        deletion = Job.objects.get(name__endswith='delete_stale_audio')
+        self.assertGreater(deletion.run_at, timezone.now() + timedelta(hours=1))
+
+        delete_stale_audio([self.request_key, self.rendition_key])
+
+        self.assertFalse(self.exists(self.request_key))
+        self.assertFalse(self.exists(self.rendition_key))
+        self.assertTrue(self.exists(track_key))
+
+    def test_superseded_move_leaves_no_copies(self):
+        self.approve()
+        Track.objects.filter(pk=self.track.pk).update(audio_url=self.url('creator/songs/other/tracks/bass.mp3'))
+
+        move_approved_audio(self.track.pk, self.audio_url)
+
+        self.assertFalse(self.exists('creator/songs/%s/tracks/guitar.mp3' % self.song.uuid))
+        self.assertTrue(self.exists(self.request_key))
+        self.assertFalse(Job.objects.filter(name__endswith='delete_stale_audio').exists())
+
+    def test_referenced_audio_is_not_deleted(self):
+        delete_stale_audio([self.request_key])
+
+        self.assertTrue(self.exists(self.request_key))
+
+    def test_large_objects_are_copied_in_parts(self):
+        storage = S3BaseUploadClient.storage
+        storage.multipart_copy_threshold = 8
+        storage.copy_part_size = 6
+
+        storage.copy(self.request_key, 'creator/songs/copy.mp3')
+
+        self.assertEqual(storage.get_range('creator/songs/copy.mp3', 0, 100), (AUDIO, len(AUDIO)))
+        self.assertEqual(list(storage.list_multipart_uploads()), [])
+
+
+class LocalFileStorageCopyTestCase(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.storage = LocalFileStorage(self.root, '/storage/')
+        self.storage.put('creator/songs/1234/requests/guitar.mp3', io.BytesIO(AUDIO), 'audio/mp3')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_copy_survives_the_source(self):
+        self.storage.copy('creator/songs/1234/requests/guitar.mp3', 'creator/songs/1234/tracks/guitar.mp3')
+        self.storage.delete('creator/songs/1234/requests/guitar.mp3')
+
+        self.assertEqual(self.storage.get_range('creator/songs/1234/tracks/guitar.mp3', 0, 100), (AUDIO, len(AUDIO)))
+
+        with self.assertRaises(MissingObject):
+            self.storage.copy('creator/songs/1234/requests/guitar.mp3', 'creator/songs/1234/tracks/bass.mp3')
@@ -0,0 +1,198 @@
+import io
+import zipfile
+
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase
+
+from jobs.models import Job
+from melody_buddy.storage import S3Storage
+
+from ..archive import ZipStream, get_track_archive_name, get_track_set_digest, is_compressible, stream_song_archive
+from ..models import Song, SongArchive, SongStats, Track
+from ..s3 import S3BaseUploadClient
+from ..s3_local import LocalS3Client
+from .test_songs import SongTestCase
+
+
+class ZipStreamTestCase(SimpleTestCase):
+    def build_archive(self, entries):
+        archive = ZipStream()
+        chunks = []
+
+        for name, data, compress in entries:
+            chunks.extend(archive.write(name, [data[i:i + 64] for i in range(0, len(data), 64)],
+                                        size=len(data), compress=compress))
+
+        chunks.extend(archive.close())
+        return zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+
+    def test_zip_stream_stores_audio(self):
+        audio = bytes(range(256)) * 16
+        archive = self.build_archive([('track.mp3', audio, False)])
+
+        info = archive.getinfo('track.mp3')
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(info.file_size, len(audio))
+        self.assertEqual(archive.read('track.mp3'), audio)
+
+    def test_zip_stream_deflates_compressible_entries(self):
+        text = b'melody buddy ' * 1000
+        archive = self.build_archive([('track.wav', text, True), ('empty.txt', b'', True)])
+
+        info = archive.getinfo('track.wav')
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+        self.assertLess(info.compress_size, info.file_size)
+        self.assertEqual(archive.read('track.wav'), text)
+        self.assertEqual(archive.read('empty.txt'), b'')
+
+    def test_zip_stream_uses_zip64_for_unknown_sizes(self):
+        archive = ZipStream()
+        data = b''.join(archive.write('track.wav', [b'audio'])) + b''.join(archive.close())
+
+        self.assertTrue(archive.entries[0].zip64)
+        self.assertEqual(zipfile.ZipFile(io.BytesIO(data)).read('track.wav'), b'audio')
+
+    def test_is_compressible(self):
+        self.assertFalse(is_compressible('audio/mp3'))
+        self.assertTrue(is_compressible('audio/wav'))
+
+    def test_get_track_archive_name_deduplicates(self):
+        taken_names = set()
+        names = [get_track_archive_name(Track(audio_name='guitar.mp3'), taken_names) for _ in range(3)]
+
+        self.assertEqual(names, ['guitar.mp3', 'guitar (2).mp3', 'guitar (3).mp3'])
+
+
+class StreamSongArchiveTestCase(SimpleTestCase):
+    def setUp(self):
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = LocalS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+        self.song = Song(title='song title')
+        self.tracks = []
+
+        for index in range(6):
+            s3_key = 'creator/songs/%s/tracks/%s.mp3' % (self.song.uuid, index)
+            self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=s3_key,
+                                      Body=('audio %s' % index).encode('utf-8'))
+            self.tracks.append(Track(instrument='guitar_electric', audio_name='%s.mp3' % index, audio_size=7,
+                                     audio_content_type='audio/mp3', audio_url=S3BaseUploadClient.storage.url(s3_key)))
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def test_stream_song_archive_keeps_track_order(self):
+        for concurrency in (1, 4):
+            data = b''.join(stream_song_archive(self.song, self.tracks, concurrency=concurrency))
+            archive = zipfile.ZipFile(io.BytesIO(data))
+
+            self.assertEqual(archive.namelist(), ['%s.mp3' % index for index in range(6)])
+            self.assertEqual(archive.read('5.mp3'), b'audio 5')
+
+    def test_stream_song_archive_skips_tracks_without_audio(self):
+        self.tracks[0].audio_url = None
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_song_archive(self.song, self.tracks))))
+
+        self.assertNotIn('0.mp3', archive.namelist())
+
+
+class DownloadSongTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = LocalS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+        self.song = Song.objects.create(title='song title', description='song description',
+                                        created_by=self.user_creator)
+        SongStats.objects.create(song=self.song)
+
+        s3_key = 'creator/songs/%s/tracks/guitar.mp3' % self.song.uuid
+        self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=s3_key, Body=b'guitar')
+        self.track = Track.objects.create(
+            instrument="guitar_electric",
+            audio_url=S3BaseUploadClient.storage.url(s3_key),
+            audio_name="guitar.mp3",
+            audio_size=6,
+            audio_content_type="audio/mp3",
+            created_by=self.user_creator,
+            song=self.song)
+        self.song_download_url = reverse('songs:download', kwargs={'pk': self.song.pk})
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def download(self, **headers):
+        response = self.client.get(self.song_download_url, **headers)
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_song_download_denies_anonymous(self):
+        response = self.client.get(self.song_download_url)
+        self.assertRedirects(response, '%s/?next=%s' % (reverse('accounts:login'), self.song_download_url))
+
+    def test_song_download_builds_and_serves_cached_archive(self):
+        super().login(self.user_contributor)
+
+        response, content = self.download()
+        song_archive = SongArchive.objects.get(song=self.song)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"%s"' % song_archive.digest)
+        self.assertTrue(song_archive.built)
+        self.assertEqual(song_archive.archive_size, len(content))
+        self.assertEqual(zipfile.ZipFile(io.BytesIO(content)).read('guitar.mp3'), b'guitar')
+
+        cached_response, cached_content = self.download()
+        self.assertEqual(cached_response['Content-Length'], str(len(content)))
+        self.assertEqual(cached_content, content)
+
+    def test_song_download_honours_if_none_match(self):
+        super().login(self.user_contributor)
+        response, _ = self.download()
+
+        not_modified_response, _ = self.download(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified_response.status_code, 304)
+
+    def test_track_save_clears_cached_archive(self):
+        super().login(self.user_contributor)
+        response, _ = self.download()
+
+        self.track.audio_size = 7
+        self.track.save()
+
+        self.assertFalse(SongArchive.objects.filter(song=self.song).exists())
+        changed_response, _ = self.download(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed_response.status_code, 200)
+
+    def test_saves_outside_the_downloadable_tracks_keep_cached_archive(self):
+        super().login(self.user_contributor)
+        self.download()
+        Job.objects.all().delete()
+
+        Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song, public=True)
+        self.track.instrument = 'guitar_acoustic'
+        self.track.save()
+
+        self.assertTrue(SongArchive.objects.filter(song=self.song, built=True).exists())
+        self.assertFalse(Job.objects.filter(name__endswith='build_song_archive').exists())
+
+    def test_track_delete_clears_cached_archive(self):
+        super().login(self.user_contributor)
+        self.download()
+
+        self.track.delete()
+
+        self.assertFalse(SongArchive.objects.filter(song=self.song).exists())
+
+    def test_audio_replaced_under_the_same_url_clears_cached_archive(self):
+        super().login(self.user_contributor)
+        self.download()
+        Song.objects.filter(pk=self.song.pk).update(media_digest=get_track_set_digest([self.track]))
+        Job.objects.all().delete()
+
+        self.track.audio_replaced = True
+        self.track.save()
+
+        self.assertFalse(SongArchive.objects.filter(song=self.song).exists())
+        self.assertTrue(Job.objects.filter(name__endswith='render_song_mixdown').exists())
@@ -0,0 +1,68 @@
+import threading
+
+from django.core.urlresolvers import reverse
+
+from ..counters import StatsBuffer, song_stats
+from ..models import Song, SongStats
+from .test_songs import SongTestCase
+
+
+class StatsBufferTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.songs = [Song.objects.create(title='song %s' % index, created_by=self.user_creator)
+                      for index in range(2)]
+
+        for song in self.songs:
+            SongStats.objects.create(song=song, views=10)
+
+        self.buffer = StatsBuffer(SongStats, 'song_id', ('views', 'likes', 'downloads'), flush_interval=60)
+
+    def get_stats(self, song):
+        return SongStats.objects.values_list('views', 'likes', 'downloads').get(song=song)
+
+    def test_increments_are_buffered_until_flush(self):
+        self.buffer.increment(self.songs[0].pk, 'views')
+        self.assertEqual(self.get_stats(self.songs[0]), (10, 0, 0))
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.get_stats(self.songs[0]), (11, 0, 0))
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_flush_adds_every_song_and_counter_at_once(self):
+        for _ in range(3):
+            self.buffer.increment(self.songs[0].pk, 'views')
+        self.buffer.increment(self.songs[0].pk, 'downloads')
+        self.buffer.increment(self.songs[1].pk, 'likes', 2)
+
+        with self.assertNumQueries(1):
+            self.buffer.flush()
+
+        self.assertEqual(self.get_stats(self.songs[0]), (13, 0, 1))
+        self.assertEqual(self.get_stats(self.songs[1]), (10, 2, 0))
+
+    def test_increment_flushes_once_interval_passed(self):
+        self.buffer.flush_interval = 0
+        self.buffer.increment(self.songs[1].pk, 'views')
+
+        self.assertEqual(self.get_stats(self.songs[1]), (11, 0, 0))
+
+    def test_background_flush_does_not_wait_for_more_increments(self):
+        flushed = threading.Event()
+        buffer = StatsBuffer(SongStats, 'song_id', ('views',), flush_interval=0.01, background_flush=True)
+        buffer.flush = flushed.set
+        self.addCleanup(buffer.stopped.set)
+
+        buffer.increment(self.songs[0].pk, 'views')
+
+        self.assertTrue(flushed.wait(5))
+
+    def test_increment_rejects_unknown_counter(self):
+        with self.assertRaises(ValueError):
+            self.buffer.increment(self.songs[0].pk, 'plays')
+
+    def test_song_detail_counts_view(self):
+        self.client.get(reverse('songs:detail', kwargs={'pk': self.songs[0].pk}))
+        song_stats.flush()
+
+        self.assertEqual(self.get_stats(self.songs[0]), (11, 0, 0))
@@ -0,0 +1,62 @@
+from django.core.urlresolvers import reverse
+
+from ..models import Song, Track
+from .test_songs import SongTestCase
+
+
+class TrackManifestTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='guitar_electric', audio_url='file/path', audio_size=1024,
+                                          created_by=self.user_creator, song=self.song)
+        self.contributor_track = Track.objects.create(instrument='bass', public=True, created_by=self.user_creator,
+                                                      contributed_by=self.user_contributor, song=self.song)
+        self.manifest_url = reverse('songs:track_manifest', kwargs={'pk': self.song.pk})
+
+    def test_manifest_lists_player_fields(self):
+        # song state, tracks
+        with self.assertNumQueries(2):
+            response = self.client.get(self.manifest_url)
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json(), [{
+            'pk': self.track.pk,
+            'uuid': str(self.track.uuid),
+            'instrument': 'guitar_electric',
+            'audio_url': self.track.get_audio_url(),
+            'audio_size': 1024,
+            'audio_duration': None,
+            'peaks_url': self.track.get_peaks_url(),
+            'public': False,
+            'contributor': 'creator'
+        }, {
+            'pk': self.contributor_track.pk,
+            'uuid': str(self.contributor_track.uuid),
+            'instrument': 'bass',
+            'audio_url': None,
+            'audio_size': None,
+            'audio_duration': None,
+            'peaks_url': None,
+            'public': True,
+            'contributor': 'contributor'
+        }])
+
+    def test_manifest_revalidates(self):
+        response = self.client.get(self.manifest_url)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            not_modified_response = self.client.get(self.manifest_url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(not_modified_response.status_code, 304)
+
+        self.contributor_track.delete()
+        response = self.client.get(self.manifest_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_manifest_missing_song(self):
+        response = self.client.get(reverse('songs:track_manifest', kwargs={'pk': self.song.pk + 1}))
+        self.assertEqual(response.status_code, 404)
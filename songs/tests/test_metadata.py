@@ -0,0 +1,151 @@
+import io
+import wave
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase
+
+from melody_buddy.storage import S3Storage
+
+from ..metadata import AUDIO_HEADER_BYTES, analyze_audio, read_audio_metadata, read_wav_metadata
+from ..models import Song, Track, TrackRequest
+from ..s3 import S3BaseUploadClient, S3TrackUploadClient
+from ..s3_local import LocalS3Client
+from ..templatetags.audio_duration import format_audio_duration
+from .test_songs import SongTestCase
+
+# mpeg 1 layer iii, 128kbps, 44.1khz, mono: 417 byte frames of 1152 samples
+MP3_FRAME = b'\xff\xfb\x90\xc0' + b'\x00' * 413
+
+
+def build_wav(seconds, channels=2, sample_width=2, frame_rate=8000):
+    wav_file = io.BytesIO()
+
+    with wave.open(wav_file, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(sample_width)
+        writer.setframerate(frame_rate)
+        writer.writeframes(b'\x00' * int(seconds * frame_rate) * channels * sample_width)
+
+    return wav_file.getvalue()
+
+
+class RangeCountingS3Client(LocalS3Client):
+    def __init__(self):
+        super().__init__()
+        self.ranges = []
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self.ranges.append(Range)
+        return super().get_object(Bucket, Key, Range=Range, **kwargs)
+
+
+class ReadAudioMetadataTestCase(SimpleTestCase):
+    def setUp(self):
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = RangeCountingS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def put_audio(self, name, body):
+        s3_key = 'creator/songs/metadata/tracks/%s' % name
+        self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=s3_key, Body=body)
+        return S3BaseUploadClient.storage.url(s3_key)
+
+    def test_wav_is_read_from_its_header(self):
+        audio_url = self.put_audio('track.wav', build_wav(60))
+
+        metadata = read_audio_metadata(audio_url, 'audio/wav')
+
+        self.assertEqual(metadata, {
+            'audio_duration': 60.0,
+            'audio_sample_rate': 8000,
+            'audio_channels': 2,
+            'audio_bit_depth': 16,
+            'audio_bitrate': 256000,
+            'audio_codec': 'pcm',
+        })
+        self.assertEqual(self.s3_client.ranges, ['bytes=0-%d' % (AUDIO_HEADER_BYTES - 1)])
+
+    def test_streamed_wav_without_data_size_uses_object_size(self):
+        head = bytearray(build_wav(1))
+        # a recorder that never went back to write the data chunk size
+        head[40:44] = b'\x00\x00\x00\x00'
+
+        metadata = read_wav_metadata(bytes(head), len(head))
+
+        self.assertEqual(metadata['audio_duration'], 1.0)
+
+    def test_mp3_length_comes_from_object_size(self):
+        audio_url = self.put_audio('track.mp3', MP3_FRAME * 1000)
+
+        metadata = read_audio_metadata(audio_url, 'audio/mp3')
+
+        self.assertAlmostEqual(metadata['audio_duration'], 1000 * 1152 / 44100, places=1)
+        self.assertEqual(metadata['audio_sample_rate'], 44100)
+        self.assertEqual(metadata['audio_channels'], 1)
+        self.assertEqual(metadata['audio_bitrate'], 128000)
+        self.assertEqual(metadata['audio_codec'], 'mp3')
+        self.assertEqual(len(self.s3_client.ranges), 1)
+
+    def test_format_audio_duration(self):
+        self.assertEqual(format_audio_duration(None), '')
+        self.assertEqual(format_audio_duration(59.6), '1:00')
+        self.assertEqual(format_audio_duration(3725), '1:02:05')
+
+
+class AnalyzeAudioTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = LocalS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+        s3_key = 'creator/songs/metadata/tracks/track.wav'
+        self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=s3_key, Body=build_wav(2))
+        self.audio_url = S3BaseUploadClient.storage.url(s3_key)
+
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song,
+                                          public=True)
+        self.track_request = TrackRequest.objects.create(track=self.track, created_by=self.user_contributor,
+                                                         audio_url=self.audio_url, audio_content_type='audio/wav')
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def test_analyze_audio_stores_metadata_on_every_row_of_the_audio(self):
+        analyze_audio(self.audio_url, 'audio/wav')
+
+        self.track_request.refresh_from_db()
+        self.assertEqual(self.track_request.audio_duration, 2.0)
+        self.assertEqual(self.track_request.audio_sample_rate, 8000)
+        self.assertEqual(self.track_request.audio_codec, 'pcm')
+
+    def test_analyzed_audio_is_not_read_again(self):
+        analyze_audio(self.audio_url, 'audio/wav')
+        self.s3_client.delete_object(Bucket=S3BaseUploadClient.storage.bucket,
+                                     Key=S3BaseUploadClient.get_key_from_url(self.audio_url))
+
+        analyze_audio(self.audio_url, 'audio/wav')
+
+    def test_replaced_audio_is_analyzed_again(self):
+        audio_url = S3TrackUploadClient(self.song, self.track.uuid, 'audio/wav').get_upload_url()
+        Track.objects.filter(pk=self.track.pk).update(audio_url=audio_url, audio_duration=2.0,
+                                                      audio_sample_rate=8000, audio_codec='pcm')
+
+        self.login(self.user_creator)
+        self.client.post(reverse('songs:track_update', kwargs={'pk': self.song.pk, 'track_id': self.track.pk}), {
+            'instrument': 'guitar_electric',
+            'audio': SimpleUploadedFile('bass.wav', build_wav(3, frame_rate=16000), content_type='audio/wav')
+        })
+        self.track.refresh_from_db()
+
+        self.assertEqual((self.track.audio_duration, self.track.audio_sample_rate, self.track.audio_codec),
+                         (None, None, None))
+
+        analyze_audio(audio_url, 'audio/wav')
+        self.track.refresh_from_db()
+
+        self.assertEqual((self.track.audio_duration, self.track.audio_sample_rate), (3.0, 16000))
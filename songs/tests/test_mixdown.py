@@ -0,0 +1,57 @@
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase
+from pydub import AudioSegment
+
+from ..archive import get_track_set_digest
+from ..mixdown import MIXDOWN_CHANNELS, MIXDOWN_FRAME_RATE, mix_audio_segments
+from ..models import Song, SongStats, Track
+from .test_songs import SongTestCase
+
+
+class MixAudioSegmentsTestCase(SimpleTestCase):
+    def test_mix_audio_segments_matches_longest_track(self):
+        mixdown = mix_audio_segments([
+            AudioSegment.silent(duration=1000, frame_rate=22050),
+            AudioSegment.silent(duration=2500, frame_rate=44100)
+        ], 2)
+
+        self.assertEqual(len(mixdown), 2500)
+        self.assertEqual(mixdown.channels, MIXDOWN_CHANNELS)
+        self.assertEqual(mixdown.frame_rate, MIXDOWN_FRAME_RATE)
+
+
+class SongDetailMixdownTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.song = Song.objects.create(title='song title', description='song description',
+                                        created_by=self.user_creator)
+        SongStats.objects.create(song=self.song)
+        self.track = Track.objects.create(instrument="guitar_electric", audio_url="file/path",
+                                          audio_name="track.mp3", audio_size=1024, audio_content_type="audio/mp3",
+                                          created_by=self.user_creator, song=self.song)
+        self.contributor_track = Track.objects.create(instrument="string_violin", public=True,
+                                                      created_by=self.user_creator, song=self.song)
+        self.song_detail_url = reverse('songs:detail', kwargs={'pk': self.song.pk})
+
+    def publish_mixdown(self, digest):
+        Song.objects.filter(pk=self.song.pk).update(media_url='mixdown/path', media_digest=digest)
+
+    def test_song_detail_plays_current_mixdown(self):
+        self.publish_mixdown(get_track_set_digest([self.track]))
+        response = self.client.get(self.song_detail_url)
+
+        self.assertEqual(response.context['mixdown_url'], 'mixdown/path')
+        self.assertEqual(list(response.context['tracks']), [self.contributor_track])
+
+    def test_song_detail_loads_stems_on_request(self):
+        self.publish_mixdown(get_track_set_digest([self.track]))
+        response = self.client.get(self.song_detail_url, {'stems': 1})
+
+        self.assertNotIn('mixdown_url', response.context)
+        self.assertEqual(len(response.context['tracks']), 2)
+
+    def test_song_detail_ignores_stale_mixdown(self):
+        self.publish_mixdown('stale')
+        response = self.client.get(self.song_detail_url)
+
+        self.assertNotIn('mixdown_url', response.context)
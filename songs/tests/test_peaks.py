@@ -0,0 +1,107 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase
+from pydub import AudioSegment
+
+from melody_buddy.storage import S3Storage
+
+from ..models import AudioPeaks, Song, SongStats, Track
+from ..peaks import PEAK_ZOOM_LEVELS, PEAKS_FLAG_8_BIT, PEAKS_HEADER, compute_peaks, get_peaks_level
+from ..s3 import S3BaseUploadClient, S3TrackUploadClient
+from ..s3_local import LocalS3Client
+from .test_songs import SongTestCase
+
+
+class ComputePeaksTestCase(SimpleTestCase):
+    def setUp(self):
+        # one second of a stereo square wave at full scale
+        frames = b''.join(b'\xff\x7f\x00\x80' if i % 2 else b'\x00\x80\xff\x7f' for i in range(8000))
+        self.segment = AudioSegment(data=frames, metadata={
+            'channels': 2,
+            'sample_width': 2,
+            'frame_rate': 8000,
+            'frame_width': 4
+        })
+
+    def test_compute_peaks_stores_every_zoom_level(self):
+        data = compute_peaks(self.segment)
+
+        for zoom, level in enumerate(PEAK_ZOOM_LEVELS):
+            version, flags, sample_rate, samples_per_pixel, length = PEAKS_HEADER.unpack_from(
+                get_peaks_level(data, zoom))
+
+            self.assertEqual(flags, PEAKS_FLAG_8_BIT)
+            self.assertEqual(sample_rate, 8000)
+            self.assertEqual(length, level)
+            self.assertEqual(samples_per_pixel, -(-8000 // level))
+
+    def test_compute_peaks_scales_to_eight_bits(self):
+        level = get_peaks_level(compute_peaks(self.segment), 0)
+        peaks = [int.from_bytes(level[i:i + 1], 'little', signed=True) for i in range(PEAKS_HEADER.size, len(level))]
+
+        self.assertEqual(set(peaks[0::2]), {-127})
+        self.assertEqual(set(peaks[1::2]), {127})
+
+    def test_compute_peaks_handles_silence(self):
+        data = compute_peaks(AudioSegment.silent(duration=0))
+
+        self.assertEqual(PEAKS_HEADER.unpack_from(get_peaks_level(data, 2))[4], 0)
+
+
+class TrackPeaksTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        SongStats.objects.create(song=self.song)
+        self.track = Track.objects.create(instrument="guitar_electric", audio_url="file/path",
+                                          audio_name="track.mp3", audio_size=1024, audio_content_type="audio/mp3",
+                                          created_by=self.user_creator, song=self.song)
+        self.track_peaks_url = reverse('songs:track_peaks', kwargs={'pk': self.song.pk, 'track_id': self.track.pk})
+
+    def test_track_peaks_missing(self):
+        response = self.client.get(self.track_peaks_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_peaks_of_unknown_ids_are_not_found(self):
+        self.login(self.user_creator)
+
+        for url in (reverse('songs:track_peaks', kwargs={'pk': self.song.pk, 'track_id': 0}),
+                    reverse('songs:track_request_peaks', kwargs={'pk': self.song.pk, 'track_id': self.track.pk,
+                                                                 'track_request_id': 0}),
+                    reverse('songs:mixdown_peaks', kwargs={'pk': 0})):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_track_peaks_are_cacheable(self):
+        data = compute_peaks(AudioSegment.silent(duration=1000))
+        AudioPeaks.objects.create(audio_url=self.track.audio_url, data=data)
+
+        response = self.client.get(self.track_peaks_url, {'zoom': 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, get_peaks_level(data, 0))
+        self.assertIn('max-age', response['Cache-Control'])
+
+        not_modified_response = self.client.get(self.track_peaks_url, {'zoom': 0},
+                                                HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified_response.status_code, 304)
+
+    def test_track_manifest_points_at_peaks(self):
+        response = self.client.get(reverse('songs:track_manifest', kwargs={'pk': self.song.pk}))
+        self.assertTrue(response.json()[0]['peaks_url'].startswith(self.track_peaks_url))
+
+    def test_replaced_audio_drops_its_peaks(self):
+        original_storage = S3BaseUploadClient.storage
+        S3BaseUploadClient.storage = S3Storage(LocalS3Client())
+        self.addCleanup(setattr, S3BaseUploadClient, 'storage', original_storage)
+
+        audio_url = S3TrackUploadClient(self.song, self.track.uuid, 'audio/mp3').get_upload_url()
+        Track.objects.filter(pk=self.track.pk).update(audio_url=audio_url)
+        AudioPeaks.objects.create(audio_url=audio_url, data=compute_peaks(AudioSegment.silent(duration=1000)))
+
+        self.login(self.user_creator)
+        self.client.post(reverse('songs:track_update', kwargs={'pk': self.song.pk, 'track_id': self.track.pk}), {
+            'instrument': 'guitar_electric',
+            'audio': SimpleUploadedFile('guitar.mp3', b'new recording', content_type='audio/mp3')
+        })
+
+        self.assertEqual(Track.objects.get(pk=self.track.pk).audio_url, audio_url)
+        self.assertEqual(self.client.get(self.track_peaks_url).status_code, 404)
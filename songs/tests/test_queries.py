@@ -0,0 +1,83 @@
+import re
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Song, SongStats, Track, TrackRequest
+from .test_songs import SongTestCase
+
+
+class RowLoadTestCase(SongTestCase):
+    """
+    Every song and track a view works on should be read from the database once per request.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.song = Song.objects.create(title='song title', description='song description',
+                                        created_by=self.user_creator)
+        SongStats.objects.create(song=self.song)
+        self.track = Track.objects.create(instrument='guitar_electric', created_by=self.user_creator, song=self.song)
+        self.contributor = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song,
+                                                public=True)
+        self.track_request = TrackRequest.objects.create(track=self.contributor, created_by=self.user_contributor,
+                                                         audio_url='https://example.com/bass.mp3')
+
+    def count_row_loads(self, queries, table, pk):
+        pattern = re.compile(r'^SELECT .* FROM "%s"( INNER JOIN .*)? WHERE "%s"\."id" = %s\b' % (table, table, pk))
+        return len([query for query in queries if pattern.match(query['sql'])])
+
+    def assertLoadsRowsOnce(self, url, user=None, rows=()):
+        super().login(user or self.user_creator)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+        for table, pk in (('songs_song', self.song.pk),) + rows:
+            self.assertLessEqual(self.count_row_loads(queries.captured_queries, table, pk), 1,
+                                 '%s [%s] loaded more than once by %s' % (table, pk, url))
+
+    def test_song_detail(self):
+        self.assertLoadsRowsOnce(reverse('songs:detail', kwargs={'pk': self.song.pk}), rows=(
+            ('auth_user', self.user_creator.pk),))
+
+    def test_song_edit(self):
+        self.assertLoadsRowsOnce(reverse('songs:edit', kwargs={'pk': self.song.pk}), rows=(
+            ('auth_user', self.user_creator.pk),))
+
+    def test_track_create(self):
+        self.assertLoadsRowsOnce(reverse('songs:track_create', kwargs={'pk': self.song.pk}))
+
+    def test_track_update(self):
+        self.assertLoadsRowsOnce(reverse('songs:track_update', kwargs={
+            'pk': self.song.pk,
+            'track_id': self.track.pk
+        }), rows=(('songs_track', self.track.pk),))
+
+    def test_track_delete(self):
+        self.assertLoadsRowsOnce(reverse('songs:track_delete', kwargs={
+            'pk': self.song.pk,
+            'track_id': self.track.pk
+        }), rows=(('songs_track', self.track.pk),))
+
+    def test_contributor_update(self):
+        self.assertLoadsRowsOnce(reverse('songs:contributor_update', kwargs={
+            'pk': self.song.pk,
+            'track_id': self.contributor.pk
+        }), rows=(('songs_track', self.contributor.pk),))
+
+    def test_track_request_create(self):
+        self.assertLoadsRowsOnce(reverse('songs:track_request_create', kwargs={
+            'pk': self.song.pk,
+            'track_id': self.contributor.pk
+        }), user=self.user_contributor, rows=(('songs_track', self.contributor.pk),))
+
+    def test_track_request_detail(self):
+        self.assertLoadsRowsOnce(reverse('songs:track_request_detail', kwargs={
+            'pk': self.song.pk,
+            'track_id': self.contributor.pk,
+            'track_request_id': self.track_request.pk
+        }), rows=(('songs_track', self.contributor.pk),))
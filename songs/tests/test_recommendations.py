@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from users.models import Skill
+from ..models import Song, Track
+from ..recommendations import get_musicians_for_song, get_songs_needing_user
+from .test_songs import SongTestCase
+
+
+class RecommendationTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.song = self.create_song('needs bass and drums', 'bass', 'percussion_drum_set')
+        self.bass_song = self.create_song('needs bass', 'bass')
+        Skill.objects.create(user=self.user_contributor, name='bass')
+
+    def create_song(self, title, *instruments):
+        song = Song.objects.create(title=title, created_by=self.user_creator)
+
+        for instrument in instruments:
+            Track.objects.create(instrument=instrument, created_by=self.user_creator, song=song, public=True)
+
+        return song
+
+    def test_songs_matching_more_skills_first(self):
+        self.assertEqual(get_songs_needing_user(self.user_contributor), [self.bass_song, self.song])
+
+        Skill.objects.create(user=self.user_contributor, name='percussion_drum_set')
+        self.assertEqual(get_songs_needing_user(self.user_contributor), [self.song, self.bass_song])
+        self.assertEqual(get_songs_needing_user(self.user_creator), [])
+
+    def test_songs_are_cached_until_a_slot_changes(self):
+        self.assertEqual(len(get_songs_needing_user(self.user_contributor)), 2)
+
+        with self.assertNumQueries(1):
+            get_songs_needing_user(self.user_contributor)
+
+        # a new slot for an instrument the user does not play keeps the cached list
+        self.create_song('needs a violin', 'string_violin')
+
+        with self.assertNumQueries(1):
+            get_songs_needing_user(self.user_contributor)
+
+        # approving a track request fills the slot
+        track = Track.objects.get(song=self.bass_song)
+        track.public = False
+        track.contributed_by = self.user_contributor
+        track.save()
+        self.assertEqual(get_songs_needing_user(self.user_contributor), [self.song])
+
+    def test_musicians_for_open_slots(self):
+        drummer = User.objects.create_user(username='drummer', password='password')
+        Skill.objects.create(user=drummer, name='percussion_drum_set')
+        Skill.objects.create(user=drummer, name='bass')
+        Skill.objects.create(user=self.user_creator, name='bass')
+        song = Song.objects.get(pk=self.song.pk)
+
+        self.assertEqual(get_musicians_for_song(song), [drummer, self.user_contributor])
+        self.assertEqual(get_musicians_for_song(song)[0].matching_instruments, 2)
+
+        Skill.objects.filter(user=drummer).delete()
+        self.assertEqual(get_musicians_for_song(song), [self.user_contributor])
@@ -0,0 +1,166 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from jobs.models import Job
+from melody_buddy.storage import MissingObject, S3Storage
+
+from ..models import AudioRendition, Song, Track, TrackRequest
+from ..renditions import get_missing_renditions, get_stream_rendition, render_audio_renditions
+from ..s3 import S3AudioRenditionUploadClient, S3BaseUploadClient, S3TrackUploadClient
+from ..s3_local import LocalS3Client
+from ..streaming import get_audio_source
+from .test_songs import SongTestCase
+
+AUDIO_URL = S3BaseUploadClient.storage.url('creator/songs/1234/tracks/guitar.wav')
+
+
+class RenditionUploadClientTestCase(SimpleTestCase):
+    def test_rendition_is_stored_next_to_its_original(self):
+        upload_client = S3AudioRenditionUploadClient(AUDIO_URL, 96, 'audio/mp3')
+
+        self.assertEqual(upload_client.get_upload_path(), 'creator/songs/1234/tracks/guitar.96k.mp3')
+
+
+class RenditionTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='guitar_electric', audio_url=AUDIO_URL, audio_size=1024,
+                                          created_by=self.user_creator, song=self.song)
+        self.contributor = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song,
+                                                public=True)
+        self.track_request = TrackRequest.objects.create(track=self.contributor, created_by=self.user_contributor,
+                                                         audio_url=AUDIO_URL)
+
+    def add_rendition(self, bitrate):
+        return AudioRendition.objects.create(audio_url=AUDIO_URL, format='mp3', bitrate=bitrate, size=bitrate,
+                                             rendition_url=AUDIO_URL.replace('.wav', '.%dk.mp3' % bitrate))
+
+    def render_without_storage(self):
+        # the audio is not in this storage, reading it would raise
+        original_storage = S3BaseUploadClient.storage
+        S3BaseUploadClient.storage = S3Storage(LocalS3Client())
+
+        try:
+            render_audio_renditions(AUDIO_URL, 'audio/wav')
+        finally:
+            S3BaseUploadClient.storage = original_storage
+
+    def test_rendered_audio_is_not_read_again(self):
+        self.add_rendition(96)
+        self.add_rendition(160)
+
+        self.render_without_storage()
+
+    def test_stored_bitrate_decides_the_renditions(self):
+        Track.objects.filter(pk=self.track.pk).update(audio_bitrate=64000)
+
+        self.render_without_storage()
+
+        self.assertFalse(AudioRendition.objects.exists())
+
+    def test_edits_keeping_the_audio_do_not_schedule_renditions(self):
+        Job.objects.all().delete()
+
+        self.track.instrument = 'guitar_acoustic'
+        self.track.save()
+        self.track_request.status = 'approved'
+        self.track_request.save()
+
+        self.assertFalse(Job.objects.filter(name__endswith='render_audio_renditions').exists())
+        self.assertFalse(Job.objects.filter(name__endswith='generate_audio_peaks').exists())
+
+    def test_new_audio_is_analyzed_before_it_is_rendered(self):
+        Job.objects.all().delete()
+
+        self.track_request.audio_url = AUDIO_URL.replace('guitar', 'bass')
+        self.track_request.save()
+
+        self.assertTrue(Job.objects.filter(name__endswith='analyze_audio').exists())
+        self.assertFalse(Job.objects.filter(name__endswith='render_audio_renditions').exists())
+
+    def test_only_renditions_lighter_than_the_original_are_missing(self):
+        self.assertEqual(get_missing_renditions(AUDIO_URL, 1411200), [('mp3', 96), ('mp3', 160)])
+        self.assertEqual(get_missing_renditions(AUDIO_URL, 128000), [('mp3', 96)])
+        self.assertEqual(get_missing_renditions(AUDIO_URL, 64000), [])
+
+        self.add_rendition(96)
+        self.assertEqual(get_missing_renditions(AUDIO_URL, None), [('mp3', 160)])
+
+    def test_player_streams_the_lightest_rendition(self):
+        source = get_audio_source(AUDIO_URL, 1024, 'audio/wav', self.track.updated)
+        self.assertEqual((source.key, source.size, source.content_type),
+                         ('creator/songs/1234/tracks/guitar.wav', 1024, 'audio/wav'))
+
+        self.add_rendition(160)
+        self.add_rendition(96)
+        source = get_audio_source(AUDIO_URL, 1024, 'audio/wav', self.track.updated)
+
+        self.assertEqual((source.key, source.size, source.content_type),
+                         ('creator/songs/1234/tracks/guitar.96k.mp3', 96, 'audio/mp3'))
+
+    def test_track_request_streams_from_the_audio_endpoint(self):
+        self.login(self.user_creator)
+
+        response = self.client.get(reverse('songs:track_request_detail', kwargs={
+            'pk': self.song.pk,
+            'track_id': self.contributor.pk,
+            'track_request_id': self.track_request.pk
+        }))
+
+        self.assertEqual(json.loads(response.context['track_request_json'])[0]['audio_url'],
+                         self.track_request.get_audio_url())
+
+
+class ReplacedAudioTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = LocalS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='guitar_electric', created_by=self.user_creator, song=self.song)
+        self.audio_url = S3TrackUploadClient(self.song, self.track.uuid, 'audio/mp3').get_upload_url()
+        Track.objects.filter(pk=self.track.pk).update(audio_url=self.audio_url, audio_content_type='audio/mp3')
+
+        self.rendition_client = S3AudioRenditionUploadClient(self.audio_url, 96, 'audio/mp3')
+        self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket,
+                                  Key=self.rendition_client.get_upload_path(), Body=b'old rendition')
+        AudioRendition.objects.create(audio_url=self.audio_url, format='mp3', bitrate=96, size=13,
+                                      rendition_url=self.rendition_client.get_upload_url())
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def test_replaced_audio_is_rendered_again(self):
+        self.login(self.user_creator)
+        self.client.post(reverse('songs:track_update', kwargs={'pk': self.song.pk, 'track_id': self.track.pk}), {
+            'instrument': 'guitar_electric',
+            'audio': SimpleUploadedFile('guitar.mp3', b'new recording', content_type='audio/mp3')
+        })
+
+        self.assertEqual(Track.objects.get(pk=self.track.pk).audio_url, self.audio_url)
+        self.assertIsNone(get_stream_rendition(self.audio_url))
+        self.assertEqual(get_missing_renditions(self.audio_url, None), [('mp3', 96), ('mp3', 160)])
+
+        with self.assertRaises(MissingObject):
+            S3BaseUploadClient.storage.size(self.rendition_client.get_upload_path())
+
+    def test_new_tracks_have_nothing_to_clear(self):
+        self.login(self.user_creator)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('songs:track_create', kwargs={'pk': self.song.pk}), {
+                'instrument': 'guitar_electric',
+                'audio': SimpleUploadedFile('solo.mp3', b'solo recording', content_type='audio/mp3')
+            })
+
+        self.assertTrue(Track.objects.filter(song=self.song, audio_name='solo.mp3').exists())
+        self.assertFalse([query for query in queries.captured_queries
+                          if 'songs_audio_renditions' in query['sql'] or 'songs_audio_peaks' in query['sql']])
@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+
+from users.search import search_instruments, search_users
+from ..models import Song
+from ..search import search_songs
+from .test_songs import SongTestCase
+
+
+class SearchTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.moonlight = Song.objects.create(title='Moonlight Sonata', description='a slow piano piece',
+                                             created_by=self.user_creator)
+        self.river = Song.objects.create(title='Down by the river', description='moonlight over the water',
+                                         created_by=self.user_contributor)
+        Song.objects.create(title='Highway blues', created_by=self.user_creator)
+
+    def test_songs_match_title_before_description(self):
+        self.assertEqual(list(search_songs(Song.objects.all(), 'moonlight')), [self.moonlight, self.river])
+
+    def test_songs_match_misspelled_titles(self):
+        self.assertEqual(list(search_songs(Song.objects.all(), 'moonlite sonata')), [self.moonlight])
+
+    def test_search_vector_follows_title_changes(self):
+        self.moonlight.title = 'Clair de lune'
+        self.moonlight.save()
+        self.assertEqual(list(search_songs(Song.objects.all(), 'lune')), [self.moonlight])
+
+    def test_users_match_prefix_and_typos(self):
+        self.assertEqual(list(search_users(User.objects.all(), 'contrib')), [self.user_contributor])
+        self.assertEqual(list(search_users(User.objects.all(), 'craetor')), [self.user_creator])
+
+    def test_instruments_match_names(self):
+        self.assertEqual(search_instruments('violin')[0], ('string_violin', 'Violin'))
+        self.assertIn(('guitar_bass', 'Bass Guitar'), search_instruments('bass'))
+        self.assertEqual(search_instruments('saxaphone'), [('wind_saxophone', 'Saxophone')])
+
+    def test_search_page(self):
+        super().login(self.user_creator)
+        response = self.client.get(reverse('search'), {'q': 'moonlight'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['songs'], [self.moonlight, self.river])
+        self.assertIsNone(response.context['next_page'])
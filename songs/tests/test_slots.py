@@ -0,0 +1,46 @@
+from ..models import Song, Track
+from ..slots import get_open_songs, recompute_open_slots
+from .test_songs import SongTestCase
+
+
+class OpenSlotsTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        Track.objects.create(instrument='guitar_electric', created_by=self.user_creator, song=self.song)
+
+    def get_open_slots(self):
+        return Song.objects.values_list('open_slot_count', 'open_instruments').get(pk=self.song.pk)
+
+    def test_open_slots_follow_contributor_tracks(self):
+        bass = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song, public=True)
+        Track.objects.create(instrument='drums', created_by=self.user_creator, song=self.song, public=True)
+        Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song, public=True)
+        self.assertEqual(self.get_open_slots(), (3, ['bass', 'drums']))
+
+        # approving a track request fills the slot
+        bass = Track.objects.get(pk=bass.pk)
+        bass.public = False
+        bass.contributed_by = self.user_contributor
+        bass.save()
+        self.assertEqual(self.get_open_slots(), (2, ['bass', 'drums']))
+
+        Track.objects.filter(instrument='bass', public=True).get().delete()
+        self.assertEqual(self.get_open_slots(), (1, ['drums']))
+
+    def test_open_songs_filter_by_instrument_and_creator(self):
+        Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song, public=True)
+        Song.objects.create(title='closed song', created_by=self.user_contributor)
+
+        self.assertEqual(list(get_open_songs(Song.objects.all())), [self.song])
+        self.assertEqual(list(get_open_songs(Song.objects.all(), instrument='bass')), [self.song])
+        self.assertEqual(list(get_open_songs(Song.objects.all(), instrument='drums')), [])
+        self.assertEqual(list(get_open_songs(Song.objects.all(), exclude_user=self.user_creator)), [])
+
+    def test_recompute_fixes_drifted_songs(self):
+        Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song, public=True)
+        Song.objects.filter(pk=self.song.pk).update(open_slot_count=0, open_instruments=[])
+
+        self.assertEqual(recompute_open_slots(), 1)
+        self.assertEqual(self.get_open_slots(), (1, ['bass']))
+        self.assertEqual(recompute_open_slots(), 0)
@@ -3,7 +3,7 @@ from django.test import TestCase
 from django.core.urlresolvers import reverse
 from django.core.exceptions import ObjectDoesNotExist
 
-from ..models import Song, SongStats
+from ..models import Song, SongStats, Track
 
 
 class SongTestCase(TestCase):
@@ -33,6 +33,49 @@ class IndexSongTestCase(SongTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'songs/song_list.html')
 
+    def create_songs(self, count):
+        Song.objects.bulk_create([Song(title='song %s' % index, created_by=self.user_creator)
+                                  for index in range(count)])
+        return list(Song.objects.order_by('-created', '-id').values_list('id', flat=True))
+
+    def test_song_list_pages_by_cursor(self):
+        song_ids = self.create_songs(30)
+        super().login(self.user_creator)
+
+        response = self.client.get(self.song_index_url)
+        self.assertEqual([song.id for song in response.context['song_list']], song_ids[:25])
+
+        # session, auth user, songs with authors and stats
+        with self.assertNumQueries(3):
+            response = self.client.get(response.context['next_url'])
+
+        self.assertEqual([song.id for song in response.context['song_list']], song_ids[25:])
+        self.assertIsNone(response.context['next_url'])
+
+    def test_song_list_rejects_invalid_cursor(self):
+        super().login(self.user_creator)
+        response = self.client.get(self.song_index_url, {'cursor': 'not a cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_song_list_json(self):
+        song_ids = self.create_songs(26)
+        song = Song.objects.get(pk=song_ids[0])
+        Track.objects.create(instrument='bass', created_by=self.user_creator, song=song, public=True)
+        Track.objects.create(instrument='drums', created_by=self.user_creator, song=song)
+        super().login(self.user_contributor)
+
+        response = self.client.get(reverse('songs:index_json'), {'accepting_contributions': 'on'})
+        songs = response.json()['songs']
+        self.assertEqual([song['id'] for song in songs], [song.id])
+        self.assertEqual(songs[0]['track_count'], 2)
+        self.assertEqual(songs[0]['open_slot_count'], 1)
+        self.assertEqual(songs[0]['instruments'], ['bass'])
+        self.assertIsNone(response.json()['next'])
+
+        response = self.client.get(reverse('songs:index_json'))
+        self.assertEqual(len(response.json()['songs']), 25)
+        self.assertIn('index.json?cursor=', response.json()['next'])
+
 
 class CreateSongTestCase(SongTestCase):
     def setUp(self):
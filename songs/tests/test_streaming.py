@@ -0,0 +1,126 @@
+from django.core.cache import caches
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase, override_settings
+
+from melody_buddy.storage import S3Storage
+
+from ..models import Song, Track, TrackRequest
+from ..s3 import S3BaseUploadClient
+from ..s3_local import LocalS3Client
+from ..streaming import RangeNotSatisfiable, parse_byte_range
+from .test_songs import SongTestCase
+
+AUDIO = b'0123456789abcdefghij'
+
+
+class ParseByteRangeTestCase(SimpleTestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_byte_range('bytes=2-5', 20), (2, 5))
+        self.assertEqual(parse_byte_range('bytes=15-', 20), (15, 19))
+        self.assertEqual(parse_byte_range('bytes=10-100', 20), (10, 19))
+        self.assertEqual(parse_byte_range('bytes=-4', 20), (16, 19))
+        self.assertEqual(parse_byte_range('bytes=-40', 20), (0, 19))
+
+    def test_whole_object(self):
+        self.assertIsNone(parse_byte_range(None, 20))
+        self.assertIsNone(parse_byte_range('bytes=0-1,4-5', 20))
+        self.assertIsNone(parse_byte_range('bytes=5-2', 20))
+        self.assertIsNone(parse_byte_range('items=0-1', 20))
+
+    def test_unsatisfiable_ranges(self):
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_byte_range('bytes=20-', 20)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_byte_range('bytes=-0', 20)
+
+
+@override_settings(AUDIO_HEAD_CACHE_BYTES=8, AUDIO_STREAM_CHUNK_SIZE=4)
+class TrackAudioTestCase(SongTestCase):
+    def setUp(self):
+        super().setUp()
+        caches['audio'].clear()
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = LocalS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+
+        self.s3_key = 'creator/songs/1234/tracks/guitar.mp3'
+        self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=self.s3_key, Body=AUDIO)
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='guitar_electric', created_by=self.user_creator, song=self.song,
+                                          audio_url=S3BaseUploadClient.storage.url(self.s3_key),
+                                          audio_size=len(AUDIO), audio_content_type='audio/mp3')
+        self.audio_url = self.track.get_audio_url()
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.audio_url, **headers)
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_whole_track(self):
+        response, content = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, AUDIO)
+        self.assertEqual(response['Content-Type'], 'audio/mp3')
+        self.assertEqual(response['Content-Length'], str(len(AUDIO)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range(self):
+        response, content = self.get(HTTP_RANGE='bytes=6-13')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(content, b'6789abcd')
+        self.assertEqual(response['Content-Range'], 'bytes 6-13/20')
+        self.assertEqual(response['Content-Length'], '8')
+
+    def test_range_past_the_end(self):
+        response, _ = self.get(HTTP_RANGE='bytes=20-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */20')
+
+    def test_stale_if_range_sends_the_whole_track(self):
+        etag = self.get()[0]['ETag']
+
+        response, content = self.get(HTTP_RANGE='bytes=6-13', HTTP_IF_RANGE=etag)
+        self.assertEqual((response.status_code, content), (206, b'6789abcd'))
+
+        response, content = self.get(HTTP_RANGE='bytes=6-13', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((response.status_code, content), (200, AUDIO))
+
+    def test_unchanged_track_is_not_sent_again(self):
+        etag = self.get()[0]['ETag']
+
+        response, _ = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_opening_bytes_are_served_from_the_audio_cache(self):
+        self.get(HTTP_RANGE='bytes=0-')
+        self.s3_client.delete_object(Bucket=S3BaseUploadClient.storage.bucket, Key=self.s3_key)
+
+        response, content = self.get(HTTP_RANGE='bytes=2-7')
+
+        self.assertEqual((response.status_code, content), (206, b'234567'))
+
+    def test_track_without_audio_is_not_found(self):
+        track = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song, public=True)
+
+        response = self.client.get(reverse('songs:track_audio', kwargs={'pk': self.song.pk, 'track_id': track.pk}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_track_request_audio(self):
+        track_request = TrackRequest.objects.create(track=self.track, created_by=self.user_contributor,
+                                                    audio_url=self.track.audio_url, audio_size=len(AUDIO),
+                                                    audio_content_type='audio/mp3')
+        audio_url = track_request.get_audio_url()
+
+        self.assertEqual(self.client.get(audio_url).status_code, 302)
+
+        self.login(self.user_creator)
+        response, content = self.get(audio_url, HTTP_RANGE='bytes=-5')
+
+        self.assertEqual((response.status_code, content), (206, b'fghij'))
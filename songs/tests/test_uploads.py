@@ -0,0 +1,261 @@
+import io
+import json
+from datetime import timedelta
+
+from botocore.exceptions import ClientError
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from melody_buddy.storage import S3Storage, StorageError
+
+from ..models import Song, Track, TrackRequest, UploadSession
+from ..s3 import S3BaseUploadClient, S3ResumableUpload, S3TrackUploadClient, clear_abandoned_uploads
+from ..s3_local import LocalS3Client
+from .test_tracks import TrackTestCase
+
+
+class DirectUploadTestCase(TrackTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = LocalS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+        self.track_upload_url = reverse('songs:track_upload', kwargs={'pk': self.song.pk})
+        self.create_track_url = reverse('songs:track_create', kwargs={'pk': self.song.pk})
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def sign(self, url, content_type='audio/mp3'):
+        response = self.client.post(url, {'content_type': content_type})
+        return response, json.loads(response.content.decode('utf-8')) if response.status_code == 200 else None
+
+    def upload(self, upload, body=b'guitar audio'):
+        self.s3_client.put_object(Bucket=S3BaseUploadClient.storage.bucket, Key=upload['post']['fields']['key'],
+                                  Body=body, ContentType=upload['post']['fields']['Content-Type'])
+
+    def test_track_upload_denies_non_creators(self):
+        super().login(self.user_contributor)
+        response, _ = self.sign(self.track_upload_url)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_track_upload_rejects_non_audio(self):
+        super().login(self.user_creator)
+        response, _ = self.sign(self.track_upload_url, content_type='text/html')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_uploads_for_unknown_tracks_are_not_found(self):
+        super().login(self.user_creator)
+
+        response, _ = self.sign('%s?track_id=0' % self.track_upload_url)
+        self.assertEqual(response.status_code, 404)
+
+        response, _ = self.sign(reverse('songs:track_request_upload', kwargs={'pk': self.song.pk, 'track_id': 0}))
+        self.assertEqual(response.status_code, 404)
+
+        response, _ = self.sign(reverse('songs:track_upload', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_track_create_confirms_direct_upload(self):
+        super().login(self.user_creator)
+        _, upload = self.sign(self.track_upload_url)
+        self.upload(upload)
+
+        response = self.client.post(self.create_track_url, {
+            'instrument': 'guitar_electric',
+            'audio_upload_token': upload['token'],
+            'audio_name': 'guitar.mp3'
+        })
+
+        track = Track.objects.get(song=self.song)
+
+        self.assertRedirects(response, reverse('songs:edit', kwargs={'pk': self.song.pk}))
+        self.assertTrue(track.audio_url.endswith(upload['post']['fields']['key']))
+        self.assertEqual(track.audio_name, 'guitar.mp3')
+        self.assertEqual(track.audio_content_type, 'audio/mp3')
+        self.assertEqual(track.audio_size, len(b'guitar audio'))
+
+    def test_track_create_rejects_missing_upload(self):
+        super().login(self.user_creator)
+        _, upload = self.sign(self.track_upload_url)
+
+        response = self.client.post(self.create_track_url, {
+            'instrument': 'guitar_electric',
+            'audio_upload_token': upload['token']
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Track.objects.filter(song=self.song).exists())
+
+    def test_track_request_rejects_track_upload_token(self):
+        track = Track.objects.create(instrument='guitar_electric', created_by=self.user_creator, song=self.song,
+                                     public=True)
+        super().login(self.user_creator)
+        _, upload = self.sign(self.track_upload_url)
+        self.upload(upload)
+
+        response = self.client.post(reverse('songs:track_request_create', kwargs={
+            'pk': self.song.pk,
+            'track_id': track.pk
+        }), {'audio_upload_token': upload['token']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TrackRequest.objects.exists())
+
+
+class WorkerKilled(Exception):
+    pass
+
+
+class FlakyS3Client(LocalS3Client):
+    def __init__(self):
+        super().__init__()
+        self.failing_parts = set()
+        self.killing_parts = set()
+        self.uploaded_parts = []
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        if PartNumber in self.killing_parts:
+            raise WorkerKilled(PartNumber)
+
+        if PartNumber in self.failing_parts:
+            raise ClientError({'Error': {'Code': 'InternalError', 'Message': PartNumber}}, 'UploadPart')
+
+        self.uploaded_parts.append(PartNumber)
+        return super().upload_part(Bucket, Key, UploadId, PartNumber, Body, **kwargs)
+
+
+class ResumableUploadTestCase(TestCase):
+    def setUp(self):
+        self.original_storage = S3BaseUploadClient.storage
+        self.s3_client = FlakyS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+        self.song = Song(title='song title', created_by=User(username='creator'))
+        self.upload_client = S3TrackUploadClient(self.song, 'track', 'audio/wav')
+        self.data = bytes(range(256)) * 4
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+
+    def upload(self):
+        upload = S3ResumableUpload(self.upload_client, concurrency=3)
+        upload.part_size = 100
+        upload.retry_delay = 0
+        upload.upload(io.BytesIO(self.data))
+
+    def get_uploaded_data(self):
+        return self.s3_client.get_object(Bucket=S3BaseUploadClient.storage.bucket,
+                                         Key=self.upload_client.get_upload_path())['Body'].read()
+
+    def test_upload_sends_all_parts(self):
+        self.upload()
+
+        self.assertEqual(sorted(self.s3_client.uploaded_parts), list(range(1, 12)))
+        self.assertEqual(self.get_uploaded_data(), self.data)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_upload_resumes_after_failed_part(self):
+        self.s3_client.failing_parts = {7}
+
+        with self.assertRaises(StorageError):
+            self.upload()
+
+        session = UploadSession.objects.get(key=self.upload_client.get_upload_path())
+        self.assertNotIn(7, session.parts.values_list('part_number', flat=True))
+
+        self.s3_client.failing_parts = set()
+        self.s3_client.uploaded_parts = []
+        self.upload()
+
+        self.assertNotIn(1, self.s3_client.uploaded_parts)
+        self.assertIn(7, self.s3_client.uploaded_parts)
+        self.assertEqual(self.get_uploaded_data(), self.data)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_upload_restarts_changed_file(self):
+        self.s3_client.failing_parts = {11}
+
+        with self.assertRaises(StorageError):
+            self.upload()
+
+        self.s3_client.failing_parts = set()
+        self.s3_client.uploaded_parts = []
+        self.data = bytes(reversed(self.data))
+        self.upload()
+
+        self.assertEqual(sorted(self.s3_client.uploaded_parts), list(range(1, 12)))
+        self.assertEqual(self.get_uploaded_data(), self.data)
+
+    def test_clear_abandoned_uploads(self):
+        self.s3_client.failing_parts = {1}
+
+        with self.assertRaises(StorageError):
+            self.upload()
+
+        self.s3_client.create_multipart_upload(Bucket=S3BaseUploadClient.storage.bucket, Key='untracked')
+
+        self.assertEqual(clear_abandoned_uploads(timezone.now() - timedelta(hours=1)), 0)
+        self.assertEqual(clear_abandoned_uploads(timezone.now() + timedelta(seconds=1)), 2)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(self.s3_client.multipart_uploads)
+
+
+@override_settings(S3_MULTIPART_THRESHOLD=100)
+class FormUploadResumeTestCase(TrackTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original_storage = S3BaseUploadClient.storage
+        self.original_part_size, self.original_retry_delay = S3ResumableUpload.part_size, S3ResumableUpload.retry_delay
+        self.s3_client = FlakyS3Client()
+        S3BaseUploadClient.storage = S3Storage(self.s3_client)
+        S3ResumableUpload.part_size, S3ResumableUpload.retry_delay = 100, 0
+        self.create_track_url = reverse('songs:track_create', kwargs={'pk': self.song.pk})
+        self.data = bytes(range(256)) * 4
+
+    def tearDown(self):
+        S3BaseUploadClient.storage = self.original_storage
+        S3ResumableUpload.part_size, S3ResumableUpload.retry_delay = self.original_part_size, self.original_retry_delay
+
+    def create_track(self):
+        return self.client.post(self.create_track_url, {
+            'instrument': 'guitar_electric',
+            'audio': SimpleUploadedFile('guitar.wav', self.data, content_type='audio/wav')
+        })
+
+    def test_track_create_resumes_the_upload_of_a_failed_attempt(self):
+        super().login(self.user_creator)
+        self.s3_client.failing_parts = {7}
+
+        self.assertEqual(self.create_track().status_code, 200)
+        session = UploadSession.objects.get()
+
+        self.s3_client.failing_parts = set()
+        self.s3_client.uploaded_parts = []
+        self.create_track()
+        track = Track.objects.get(song=self.song)
+
+        self.assertTrue(track.audio_url.endswith(session.key))
+        self.assertNotIn(1, self.s3_client.uploaded_parts)
+        self.assertIn(7, self.s3_client.uploaded_parts)
+        self.assertNotIn('pending_audio_upload', ''.join(self.client.session.keys()))
+
+    def test_track_create_resumes_after_the_response_was_lost(self):
+        super().login(self.user_creator)
+        self.s3_client.killing_parts = {7}
+
+        with self.assertRaises(WorkerKilled):
+            self.create_track()
+
+        session = UploadSession.objects.get()
+
+        self.s3_client.killing_parts = set()
+        self.s3_client.uploaded_parts = []
+        self.create_track()
+
+        self.assertTrue(Track.objects.get(song=self.song).audio_url.endswith(session.key))
+        self.assertNotIn(1, self.s3_client.uploaded_parts)
@@ -0,0 +1,35 @@
+from django.core import signing
+
+UPLOAD_SALT = 'songs.uploads'
+# long enough for a multi hundred megabyte stem over a slow connection
+UPLOAD_TOKEN_MAX_AGE = 60 * 60 * 6
+UPLOAD_MAX_SIZE = 1024 * 1024 * 1024
+
+
+def sign_upload(upload_client, song, user, file_uuid, kind):
+    """
+    Returns everything a browser needs to upload a file straight to s3, plus a token that proves which key the
+    server handed out when the upload is confirmed.
+    """
+    token = signing.dumps({
+        'song': song.pk,
+        'user': user.pk,
+        'uuid': str(file_uuid),
+        'content_type': upload_client.file_content_type,
+        'kind': kind
+    }, salt=UPLOAD_SALT)
+
+    return {
+        'token': token,
+        'post': upload_client.get_presigned_post(UPLOAD_MAX_SIZE, expires_in=UPLOAD_TOKEN_MAX_AGE),
+        'put_url': upload_client.get_presigned_put_url(expires_in=UPLOAD_TOKEN_MAX_AGE)
+    }
+
+
+def confirm_upload(token, song, user, kind):
+    upload = signing.loads(token, salt=UPLOAD_SALT, max_age=UPLOAD_TOKEN_MAX_AGE)
+
+    if upload['song'] != song.pk or upload['user'] != user.pk or upload['kind'] != kind:
+        raise signing.BadSignature('upload token was not issued for this song')
+
+    return upload
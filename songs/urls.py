@@ -5,11 +5,13 @@ from . import views
 app_name = 'songs'
 urlpatterns = [
     url(r'^$', views.SongIndex.as_view(), name='index'),
+    url(r'^index\.json$', views.SongIndexJson.as_view(), name='index_json'),
     url(r'^(?P<pk>[0-9]+)/$', views.SongDetail.as_view(), name='detail'),
     url(r'^(?P<pk>[0-9]+)/delete$', views.SongDelete.as_view(), name='delete'),
     url(r'^(?P<pk>[0-9]+)/edit$', views.SongUpdate.as_view(), name='edit'),
 
     url(r'^(?P<pk>[0-9]+)/download$', views.download_song, name='download'),
+    url(r'^(?P<pk>[0-9]+)/mixdown/peaks$', views.mixdown_peaks, name='mixdown_peaks'),
 
     # song create wizard
     url(r'^create$', views.WizardCreate.as_view(), name='wizard_create'),
@@ -25,11 +27,15 @@ urlpatterns = [
     url(r'^create/(?P<pk>[0-9]+)/complete$', views.wizard_complete, name='wizard_complete'),
 
     # tracks
+    url(r'^(?P<pk>[0-9]+)/tracks\.json$', views.track_manifest, name="track_manifest"),
     url(r'^(?P<pk>[0-9]+)/tracks/create', views.TrackCreate.as_view(), name="track_create"),
+    url(r'^(?P<pk>[0-9]+)/tracks/upload$', views.sign_track_upload, name="track_upload"),
     url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/delete', views.TrackDelete.as_view(),
         name="track_delete"),
     url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/edit', views.TrackUpdate.as_view(),
         name="track_update"),
+    url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/peaks$', views.track_peaks, name="track_peaks"),
+    url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/audio$', views.track_audio, name="track_audio"),
 
     # contributors
     url(r'^(?P<pk>[0-9]+)/contributors/create', views.ContributorCreate.as_view(), name="contributor_create"),
@@ -41,11 +47,17 @@ urlpatterns = [
     # track requests
     url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/requests/create$', views.TrackRequestCreate.as_view(),
         name="track_request_create"),
+    url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/requests/upload$', views.sign_track_request_upload,
+        name="track_request_upload"),
     url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/requests/(?P<track_request_id>[0-9]+)$',
         views.TrackRequestDetail.as_view(),
         name="track_request_detail"),
     url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/requests/(?P<track_request_id>[0-9]+)/approve$',
         views.approve_track_request, name="track_request_approve"),
     url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/requests/(?P<track_request_id>[0-9]+)/decline$',
-        views.decline_track_request, name="track_request_decline")
+        views.decline_track_request, name="track_request_decline"),
+    url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/requests/(?P<track_request_id>[0-9]+)/peaks$',
+        views.track_request_peaks, name="track_request_peaks"),
+    url(r'^(?P<pk>[0-9]+)/tracks/(?P<track_id>[0-9]+)/requests/(?P<track_request_id>[0-9]+)/audio$',
+        views.track_request_audio, name="track_request_audio")
 ]
@@ -1,33 +1,50 @@
-import zipfile
-import os
-import boto3
+import hashlib
+import json
 import logging
 import uuid
 
-from django.http import HttpResponse, HttpResponseRedirect
-from django.core import serializers
-from django.core.files.base import File
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, \
+    HttpResponseNotModified, HttpResponseRedirect, JsonResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core import signing
 from django.core.urlresolvers import reverse
 from django.db.models import Q
-from django.shortcuts import redirect
+from django.db.models.expressions import RawSQL
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from django.views import generic
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.views.decorators.csrf import csrf_protect
-from shutil import rmtree
-from tempfile import mkdtemp
-
-from .s3 import S3TrackUploadClient, S3TrackRequestUploadClient
+from melody_buddy.cache import get_version_key, get_versions
+from melody_buddy.storage import MissingObject, StorageError, StorageFileResponse
+
+from .approvals import schedule_approved_audio_move
+from .archive import get_downloadable_tracks, get_track_set_digest, stream_cached_song_archive
+from .counters import song_stats
+from .s3 import S3BaseUploadClient, S3TrackUploadClient, S3TrackRequestUploadClient
+from .uploads import sign_upload
 from .notifications import NotificationTypes
 from .licenses import license
-from .models import Song, SongStats, Track, TrackRequest
-from .mixins import HasAccessToSongMixin, HasAccessToTrack, MediaPlayerMixin, SongMixin
+from .metadata import AUDIO_METADATA_FIELDS
+from .models import AudioPeaks, Song, SongStats, Track, TrackRequest
+from .identity_map import get_song, get_track
+from .pagination import InvalidCursor, get_keyset_page
+from .recommendations import get_musicians_for_song
+from .slots import get_open_songs
+from .streaming import get_audio_source, stream_response
+from .manifest import build_track_manifest, get_track_manifest_etag, get_track_manifest_last_modified, \
+    get_track_manifest_state
+from .mixins import AudioUploadMixin, HasAccessToSongMixin, HasAccessToTrack, MediaPlayerMixin, SongMixin, \
+    SongObjectMixin, TrackObjectMixin
+from .peaks import PEAK_ZOOM_LEVELS, get_peaks_level
 
 
 class BaseSongUpdate(LoginRequiredMixin,
                      HasAccessToSongMixin,
+                     SongObjectMixin,
                      MediaPlayerMixin,
                      generic.UpdateView):
     model = Song
@@ -48,7 +65,7 @@ class BaseContributorCreate(LoginRequiredMixin,
     fields = ['instrument']
 
     def form_valid(self, form):
-        song = Song.objects.get(pk=self.kwargs['pk'])
+        song = get_song(self.request, self.kwargs['pk'])
 
         form.instance.created_by = self.request.user
         form.instance.song = song
@@ -65,30 +82,25 @@ class BaseContributorCreate(LoginRequiredMixin,
 class BaseTrackCreate(LoginRequiredMixin,
                       HasAccessToSongMixin,
                       SongMixin,
+                      AudioUploadMixin,
                       generic.CreateView):
     model = Track
     fields = ['instrument']
 
     def form_valid(self, form):
-        audio_file = self.request.FILES.get('audio')
-        song = Song.objects.get(pk=self.kwargs['pk'])
+        song = get_song(self.request, self.kwargs['pk'])
 
-        track_uuid = uuid.uuid4()
+        try:
+            track_uuid = self.set_audio(form, song)
+        except (signing.BadSignature, StorageError):
+            return self.audio_upload_invalid(form)
 
         form.instance.created_by = self.request.user
         form.instance.song = song
-        form.instance.uuid = track_uuid
+        form.instance.uuid = track_uuid or uuid.uuid4()
 
         form.instance.public = False
 
-        if audio_file:
-            s3_track_upload_client = S3TrackUploadClient(song, track_uuid, audio_file.content_type)
-            form.instance.audio_url = s3_track_upload_client.get_upload_url()
-            form.instance.audio_name = audio_file.name
-            form.instance.audio_content_type = audio_file.content_type
-            form.instance.audio_size = audio_file.size
-            s3_track_upload_client.upload_file_obj(audio_file)
-
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -99,6 +111,7 @@ class BaseTrackCreate(LoginRequiredMixin,
 
 class BaseTrackDelete(LoginRequiredMixin,
                       HasAccessToTrack,
+                      TrackObjectMixin,
                       SongMixin,
                       generic.DeleteView):
     model = Track
@@ -115,17 +128,73 @@ class SongIndex(LoginRequiredMixin,
                 generic.ListView):
     model = Song
     context_object_name = 'song_list'
+    template_name = 'songs/song_list.html'
 
     def get_queryset(self):
-        accepting_contributions = self.request.GET.get('accepting_contributions')
+        queryset = Song.objects.select_related('created_by__profile', 'songstats').annotate(
+            track_count=RawSQL('SELECT COUNT(*) FROM songs_track WHERE songs_track.song_id = songs_song.id', ()))
+
+        if self.request.GET.get('accepting_contributions'):
+            queryset = get_open_songs(queryset, exclude_user=self.request.user,
+                                      instrument=self.request.GET.get('instrument'))
+
+        return queryset
+
+    def get(self, request, *args, **kwargs):
+        try:
+            self.object_list, self.next_cursor = get_keyset_page(self.get_queryset(), request.GET.get('cursor'))
+        except InvalidCursor:
+            return HttpResponseBadRequest()
+
+        return self.render_to_response(self.get_context_data())
+
+    def get_next_url(self):
+        if not self.next_cursor:
+            return None
 
-        if accepting_contributions:
-            return Song.objects.exclude(created_by=self.request.user).filter(track__public=True).distinct("id")
-        else:
-            return Song.objects.all()
+        query = self.request.GET.copy()
+        query['cursor'] = self.next_cursor
+        return '%s?%s' % (self.request.path, query.urlencode())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_url'] = self.get_next_url()
+        self.set_cache_versions(self.object_list)
+        return context
+
+    def set_cache_versions(self, songs):
+        # one cache read for the whole page instead of two per song when the fragments are rendered
+        keys = []
+
+        for song in songs:
+            keys.extend([get_version_key('song', song.pk), get_version_key('user', song.created_by_id)])
+
+        versions = iter(get_versions(keys))
+
+        for song in songs:
+            song.cache_version = '%s.%s' % (next(versions), next(versions))
+
+
+class SongIndexJson(SongIndex):
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse({
+            'songs': [{
+                'id': song.pk,
+                'title': song.title,
+                'description': song.description,
+                'created': song.created,
+                'created_by': song.created_by.username,
+                'url': reverse('songs:detail', kwargs={'pk': song.pk}),
+                'track_count': song.track_count,
+                'open_slot_count': song.open_slot_count,
+                'instruments': song.open_instruments
+            } for song in self.object_list],
+            'next': context['next_url']
+        })
 
 
-class SongDetail(MediaPlayerMixin,
+class SongDetail(SongObjectMixin,
+                 MediaPlayerMixin,
                  generic.DetailView):
     model = Song
     context_object_name = 'song'
@@ -134,11 +203,29 @@ class SongDetail(MediaPlayerMixin,
         context = super().get_context_data()
         song = context['song']
 
-        song.songstats.views += 1
-        song.songstats.save()
+        song_stats.increment(song.pk, 'views')
+
+        if song.created_by_id == self.request.user.pk:
+            context['recommended_musicians'] = get_musicians_for_song(song)
+
+        if not self.request.GET.get('stems'):
+            self.use_mixdown(context)
 
         return context
 
+    def use_mixdown(self, context):
+        song = context['song']
+        mixed_tracks = sorted([track for track in context['tracks'] if not track.public], key=lambda track: track.pk)
+
+        # a mixdown from an older track set is never played, the stems are loaded until the new render is ready
+        if not song.media_url or song.media_digest != get_track_set_digest(mixed_tracks):
+            return
+
+        context['mixdown_url'] = song.media_url
+        context['mixdown_peaks_url'] = '%s?v=%s' % (reverse('songs:mixdown_peaks', kwargs={'pk': song.pk}),
+                                                    song.media_digest)
+        context['tracks'] = [track for track in context['tracks'] if track.public]
+
 
 class SongUpdate(BaseSongUpdate):
     template_name = 'songs/song_update.html'
@@ -150,6 +237,7 @@ class SongUpdate(BaseSongUpdate):
 
 class SongDelete(LoginRequiredMixin,
                  HasAccessToSongMixin,
+                 SongObjectMixin,
                  generic.DeleteView):
     model = Song
     template_name = 'songs/song_confirm_delete.html'
@@ -229,7 +317,7 @@ class WizardContributorDelete(BaseTrackDelete):
 # Redirect the user to song edit once song creation is complete.
 @login_required
 def wizard_complete(request, pk):
-    song = Song.objects.get(pk=pk)
+    song = get_song(request, pk)
     messages.success(request, '"%s" has been created.' % song.title)
     return HttpResponseRedirect(reverse('songs:edit', kwargs={
         'pk': song.pk
@@ -254,7 +342,9 @@ class TrackCreate(BaseTrackCreate):
 
 class TrackUpdate(LoginRequiredMixin,
                   HasAccessToTrack,
+                  TrackObjectMixin,
                   SongMixin,
+                  AudioUploadMixin,
                   generic.UpdateView):
     model = Track
     fields = ['instrument']
@@ -262,19 +352,18 @@ class TrackUpdate(LoginRequiredMixin,
     context_object_name = 'track'
     pk_url_kwarg = 'track_id'
 
+    def get_direct_upload_url(self):
+        return '%s?track_id=%s' % (super().get_direct_upload_url(), self.object.pk)
+
     def form_valid(self, form):
-        audio_file = self.request.FILES.get('audio')
-        song = Song.objects.get(pk=self.kwargs['pk'])
+        song = get_song(self.request, self.kwargs['pk'])
 
-        form.instance.public = False
+        try:
+            self.set_audio(form, song, self.object.uuid)
+        except (signing.BadSignature, StorageError):
+            return self.audio_upload_invalid(form)
 
-        if audio_file:
-            s3_track_upload_client = S3TrackUploadClient(song, self.object.uuid, audio_file.content_type)
-            form.instance.audio_url = s3_track_upload_client.get_upload_url()
-            form.instance.audio_name = audio_file.name
-            form.instance.audio_content_type = audio_file.content_type
-            form.instance.audio_size = audio_file.size
-            s3_track_upload_client.upload_file_obj(audio_file)
+        form.instance.public = False
 
         return super().form_valid(form)
 
@@ -297,6 +386,7 @@ class ContributorCreate(BaseContributorCreate):
 
 class ContributorUpdate(LoginRequiredMixin,
                         HasAccessToTrack,
+                        TrackObjectMixin,
                         SongMixin,
                         generic.UpdateView):
     model = Track
@@ -331,41 +421,49 @@ class ContributorDelete(BaseTrackDelete):
 
 class TrackRequestCreate(LoginRequiredMixin,
                          SongMixin,
+                         AudioUploadMixin,
                          generic.CreateView):
     model = TrackRequest
     fields = []
     template_name = 'songs/track_request_create.html'
+    upload_client_class = S3TrackRequestUploadClient
+    upload_kind = 'track_request'
+
+    def get_direct_upload_url(self):
+        return reverse('songs:track_request_upload', kwargs={
+            'pk': self.kwargs['pk'],
+            'track_id': self.kwargs['track_id']
+        })
 
     def form_valid(self, form):
-        audio_file = self.request.FILES.get('audio')
-        song = Song.objects.get(pk=self.kwargs['pk'])
-        track_request_uuid = uuid.uuid4()
+        song = get_song(self.request, self.kwargs['pk'])
+
+        try:
+            track_request_uuid = self.set_audio(form, song)
+        except (signing.BadSignature, StorageError):
+            return self.audio_upload_invalid(form)
 
-        s3_track_request_upload_client = S3TrackRequestUploadClient(song, track_request_uuid, audio_file.content_type)
+        if not track_request_uuid:
+            form.add_error(None, 'An audio file is required.')
+            return self.form_invalid(form)
 
         form.instance.uuid = track_request_uuid
         form.instance.created_by = self.request.user
         form.instance.track_id = self.kwargs['track_id']
-        form.instance.audio_url = s3_track_request_upload_client.get_upload_url()
-        form.instance.audio_name = audio_file.name
-        form.instance.audio_content_type = audio_file.content_type
-        form.instance.audio_size = audio_file.size
-
-        s3_track_request_upload_client.upload_file_obj(audio_file)
 
         return super().form_valid(form)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['track'] = Track.objects.get(pk=self.kwargs['track_id'])
+        context['track'] = get_track(self.request, self.kwargs['track_id'])
         return context
 
     def get_success_url(self):
         messages.success(self.request, 'Created track request')
-        NotificationTypes.track_request_pending(self.request.user,
-                                                recipient=self.object.track.song.created_by,
-                                                action_object=self.object,
-                                                target=self.object.track.song)
+        NotificationTypes.track_request_pending.enqueue(self.request.user,
+                                                        recipient=self.object.track.song.created_by,
+                                                        action_object=self.object,
+                                                        target=self.object.track.song)
 
         return reverse('songs:detail', kwargs={
             'pk': self.kwargs['pk']
@@ -376,6 +474,7 @@ class TrackRequestDetail(LoginRequiredMixin,
                          SongMixin,
                          generic.DetailView):
     model = TrackRequest
+    queryset = TrackRequest.objects.select_related('track')
     template_name = 'songs/track_request_detail.html'
     context_object_name = 'track_request'
     pk_url_kwarg = 'track_request_id'
@@ -384,9 +483,15 @@ class TrackRequestDetail(LoginRequiredMixin,
         context = super().get_context_data(**kwargs)
 
         # only grab confirmed tracks and the track which is being viewed for a request
-        context['tracks'] = context['song'].track_set.filter(Q(public=False) | Q(pk=self.kwargs['track_id']))
-        context['tracks_json'] = serializers.serialize("json", context['tracks'])
-        context['track_request_json'] = serializers.serialize("json", [context['track_request'], ])
+        context['tracks'] = context['song'].track_set.filter(
+            Q(public=False) | Q(pk=self.kwargs['track_id'])
+        ).select_related('created_by__profile', 'contributed_by__profile')
+        track_request = context['track_request']
+        context['track_request_json'] = json.dumps([{
+            'track': track_request.track_id,
+            'audio_url': track_request.get_audio_url(),
+            'peaks_url': track_request.get_peaks_url()
+        }])
         return context
 
 
@@ -397,11 +502,14 @@ def approve_track_request(request, *args, **kwargs):
     track_request = TrackRequest.objects.get(pk=kwargs['track_request_id'])
     track = track_request.track
 
-    # TODO: move s3 resource as well
     track.audio_content_type = track_request.audio_content_type
     track.audio_name = track_request.audio_name
     track.audio_size = track_request.audio_size
     track.audio_url = track_request.audio_url
+
+    for field in AUDIO_METADATA_FIELDS:
+        setattr(track, field, getattr(track_request, field))
+
     track.public = False
     track.contributed_by = track_request.created_by
     track.save()
@@ -409,9 +517,12 @@ def approve_track_request(request, *args, **kwargs):
     track_request.status = 'approved'
     track_request.save()
 
+    # the audio stays under the request's key until a copy under the song's tracks has been made
+    schedule_approved_audio_move(track)
+
     messages.success(request, 'Track request approved')
-    NotificationTypes.track_request_approved(request.user, recipient=track_request.created_by,
-                                             action_object=track_request)
+    NotificationTypes.track_request_approved.enqueue(request.user, recipient=track_request.created_by,
+                                                     action_object=track_request)
 
     return redirect(reverse('songs:track_request_detail', kwargs=kwargs))
 
@@ -426,58 +537,225 @@ def decline_track_request(request, *args, **kwargs):
     track_request.save()
 
     messages.success(request, 'Track request declined')
-    NotificationTypes.track_request_declined(request.user, recipient=track_request.created_by,
-                                             action_object=track_request)
+    NotificationTypes.track_request_declined.enqueue(request.user, recipient=track_request.created_by,
+                                                     action_object=track_request)
 
     return redirect(reverse('users:track_requests', kwargs={
         'username': request.user.username
     }))
 
 
+def get_upload_content_type(request):
+    content_type = request.POST.get('content_type', '')
+    return content_type if content_type.startswith('audio/') else None
+
+
 @login_required()
+@require_http_methods(["POST"])
+@csrf_protect
+def sign_track_upload(request, pk):
+    try:
+        song = get_song(request, pk)
+    except Song.DoesNotExist:
+        raise Http404('No song found matching the query')
+
+    content_type = get_upload_content_type(request)
+
+    if song.created_by_id != request.user.pk:
+        return HttpResponseForbidden()
+
+    if not S3BaseUploadClient.storage.direct_uploads:
+        return HttpResponseBadRequest('Audio files have to be sent with the form')
+
+    if not content_type:
+        return HttpResponseBadRequest('Only audio files can be uploaded')
+
+    track_id = request.GET.get('track_id')
+    track_uuid = get_object_or_404(Track, pk=track_id, song=song).uuid if track_id else uuid.uuid4()
+
+    return JsonResponse(sign_upload(S3TrackUploadClient(song, track_uuid, content_type), song, request.user,
+                                    track_uuid, 'track'))
+
+
+@login_required()
+@require_http_methods(["POST"])
+@csrf_protect
+def sign_track_request_upload(request, pk, track_id):
+    song = get_object_or_404(Song, pk=pk, track__pk=track_id)
+    content_type = get_upload_content_type(request)
+
+    if not S3BaseUploadClient.storage.direct_uploads:
+        return HttpResponseBadRequest('Audio files have to be sent with the form')
+
+    if not content_type:
+        return HttpResponseBadRequest('Only audio files can be uploaded')
+
+    track_request_uuid = uuid.uuid4()
+
+    return JsonResponse(sign_upload(S3TrackRequestUploadClient(song, track_request_uuid, content_type), song,
+                                    request.user, track_request_uuid, 'track_request'))
+
+
 @require_http_methods(["GET"])
-def download_song(request, pk):
-    s3_bucket = os.environ.get('S3_BUCKET')
-    s3_client = boto3.client('s3')
+@condition(etag_func=get_track_manifest_etag, last_modified_func=get_track_manifest_last_modified)
+def track_manifest(request, pk):
+    if get_track_manifest_state(request, pk) is None:
+        raise Http404('No song found matching the query')
+
+    response = HttpResponse(build_track_manifest(pk), content_type='application/json')
+    # clients keep the manifest but check back with its ETag before every use
+    patch_cache_control(response, no_cache=True)
+    return response
 
-    song = Song.objects.get(pk=pk)
-    downloadable_tracks = song.track_set.exclude(public=True)
 
-    temp_download_dir = mkdtemp()
+def get_song_archive_etag(request, pk):
+    return get_track_set_digest(get_downloadable_tracks(pk))
 
-    archive_file_name = '%s.zip' % song.title
-    archive_file_path = '%s/%s' % (temp_download_dir, archive_file_name)
 
-    archive = zipfile.ZipFile(archive_file_path, 'w')
+@login_required()
+@require_http_methods(["GET"])
+@condition(etag_func=get_song_archive_etag)
+def download_song(request, pk):
+    song = get_song(request, pk)
+    downloadable_tracks = list(get_downloadable_tracks(song.pk))
+
+    archive_file_name = '%s.zip' % song.title
 
     logging.info('download song: [%s] with title: [%s]' % (song.id, song.title))
+    song_stats.increment(song.pk, 'downloads')
+
+    archive, archive_size = stream_cached_song_archive(song, downloadable_tracks,
+                                                       get_track_set_digest(downloadable_tracks))
+
+    # a cached archive is an open file, served by the wsgi server's file wrapper when it is stored locally
+    response = StorageFileResponse(archive, content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename=%s' % archive_file_name
 
-    for track in downloadable_tracks:
-        s3_track_file_path = '%s/songs/%s/tracks/%s' % (song.created_by, song.uuid, track.audio_name)
-        temp_download_file_path = os.path.join(temp_download_dir, track.audio_name)
-        logging.info('downloading track [%s] to [%s]' % (s3_track_file_path, temp_download_file_path))
+    if archive_size is not None:
+        response['Content-Length'] = archive_size
 
-        s3_client.download_file(
-            Bucket=s3_bucket,
-            Key=s3_track_file_path,
-            Filename=temp_download_file_path)
+    return response
 
-        archive.write(temp_download_file_path, track.audio_name)
 
-    # add license to the download zip
-    # archive.writestr('LICENSE.txt', license[song.license]['text'])
+# peaks urls carry a version, so a response never changes once it has been cached
+PEAKS_MAX_AGE = 60 * 60 * 24 * 365
 
-    logging.info('zip file created name: [%s] at path: [%s]' % (archive_file_name, archive_file_path))
-    archive.close()
 
-    with File(open(archive_file_path, 'rb')) as f:
-        response = HttpResponse(f.chunks())
+def peaks_response(request, audio_url):
+    audio_peaks = AudioPeaks.objects.filter(audio_url=audio_url).first() if audio_url else None
 
-    response['Content-Type'] = 'application/zip'
-    response['Content-Disposition'] = 'attachment; filename=%s' % archive_file_name
+    if not audio_peaks:
+        raise Http404('No peaks have been generated for this audio')
 
-    logging.info('clean up temporary download directory [%s]' % temp_download_dir)
+    try:
+        zoom = min(max(int(request.GET.get('zoom', 1)), 0), len(PEAK_ZOOM_LEVELS) - 1)
+    except ValueError:
+        zoom = 1
 
-    rmtree(temp_download_dir)
+    data = get_peaks_level(bytes(audio_peaks.data), zoom)
+    etag = hashlib.md5(data).hexdigest()
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(data, content_type='application/octet-stream')
+
+    response['ETag'] = quote_etag(etag)
+    patch_cache_control(response, public=True, max_age=PEAKS_MAX_AGE)
 
     return response
+
+
+@require_http_methods(["GET"])
+def track_peaks(request, pk, track_id):
+    track = get_object_or_404(Track.objects.only('audio_url'), pk=track_id, song_id=pk)
+    return peaks_response(request, track.audio_url)
+
+
+@login_required()
+@require_http_methods(["GET"])
+def track_request_peaks(request, pk, track_id, track_request_id):
+    track_request = get_object_or_404(TrackRequest.objects.only('audio_url'), pk=track_request_id,
+                                      track_id=track_id)
+    return peaks_response(request, track_request.audio_url)
+
+
+@require_http_methods(["GET"])
+def mixdown_peaks(request, pk):
+    song = get_object_or_404(Song.objects.only('media_url'), pk=pk)
+    return peaks_response(request, song.media_url)
+
+
+# audio urls carry a version as well, the ETag still lets a player resume a range it already holds
+AUDIO_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def get_track_audio_source(request, pk, track_id):
+    """
+    Returns the audio a track streams from, looked up once per request for the ETag and Last-Modified checks and
+    the response.
+    """
+    if not hasattr(request, 'audio_source'):
+        track = Track.objects.only('audio_url', 'audio_size', 'audio_content_type', 'updated').filter(
+            pk=track_id, song_id=pk).first()
+        request.audio_source = get_audio_source(track.audio_url, track.audio_size, track.audio_content_type,
+                                                track.updated) if track else None
+
+    return request.audio_source
+
+
+def get_track_request_audio_source(request, pk, track_id, track_request_id):
+    if not hasattr(request, 'audio_source'):
+        track_request = TrackRequest.objects.only(
+            'audio_url', 'audio_size', 'audio_content_type', 'updated'
+        ).filter(pk=track_request_id, track_id=track_id, track__song_id=pk).first()
+        request.audio_source = get_audio_source(track_request.audio_url, track_request.audio_size,
+                                                track_request.audio_content_type,
+                                                track_request.updated) if track_request else None
+
+    return request.audio_source
+
+
+def get_audio_etag(get_source):
+    def audio_etag(request, *args, **kwargs):
+        source = get_source(request, *args, **kwargs)
+        return source.etag if source else None
+
+    return audio_etag
+
+
+def get_audio_last_modified(get_source):
+    def audio_last_modified(request, *args, **kwargs):
+        source = get_source(request, *args, **kwargs)
+        return source.last_modified if source else None
+
+    return audio_last_modified
+
+
+def audio_response(request, source):
+    if source is None:
+        raise Http404('No audio has been uploaded for this track')
+
+    try:
+        response = stream_response(request, S3BaseUploadClient.storage, source.key, source.size, source.content_type,
+                                   etag=source.etag, last_modified=source.last_modified, cache_head=True)
+    except MissingObject:
+        raise Http404('The audio of this track is missing from the storage')
+
+    patch_cache_control(response, public=True, max_age=AUDIO_MAX_AGE)
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+@condition(etag_func=get_audio_etag(get_track_audio_source),
+           last_modified_func=get_audio_last_modified(get_track_audio_source))
+def track_audio(request, pk, track_id):
+    return audio_response(request, get_track_audio_source(request, pk, track_id))
+
+
+@login_required()
+@require_http_methods(["GET", "HEAD"])
+@condition(etag_func=get_audio_etag(get_track_request_audio_source),
+           last_modified_func=get_audio_last_modified(get_track_request_audio_source))
+def track_request_audio(request, pk, track_id, track_request_id):
+    return audio_response(request, get_track_request_audio_source(request, pk, track_id, track_request_id))
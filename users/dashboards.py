@@ -0,0 +1,70 @@
+from songs.models import TrackRequest
+
+TRACK_REQUEST_PAGE_SIZE = 25
+TRACK_REQUEST_STATUSES = [status for status, name in TrackRequest.STATUS_CHOICES]
+
+# numbers the requests of each status newest first and keeps the window of every status's current page
+PAGED_TRACK_REQUESTS_SQL = '''
+    songs_track_requests.id IN (
+        SELECT ranked.id FROM (
+            SELECT id, status, row_number() OVER (PARTITION BY status ORDER BY created DESC, id DESC) AS position
+            FROM songs_track_requests
+            WHERE {track_request_filter}
+        ) AS ranked
+        JOIN (VALUES {pages}) AS pages (status, start) ON pages.status = ranked.status
+        WHERE ranked.position > pages.start AND ranked.position <= pages.start + %s
+    )
+'''
+
+
+class StatusPage(object):
+    def __init__(self, request, status, number, object_list, has_next):
+        self.request = request
+        self.status = status
+        self.number = number
+        self.start = (number - 1) * TRACK_REQUEST_PAGE_SIZE
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = number > 1
+
+    def get_page_url(self, number):
+        query = self.request.GET.copy()
+        query['%s_page' % self.status] = number
+        return '%s?%s' % (self.request.path, query.urlencode())
+
+    def next_url(self):
+        return self.get_page_url(self.number + 1) if self.has_next else None
+
+    def previous_url(self):
+        return self.get_page_url(self.number - 1) if self.has_previous else None
+
+
+def get_page_number(value):
+    return int(value) if value and value.isdigit() and int(value) > 0 else 1
+
+
+def get_track_request_pages(request, track_request_filter, params):
+    """
+    Returns a page of track requests for every status, read in a single query. `track_request_filter` is sql against
+    songs_track_requests, each status is paged by its own `<status>_page` query parameter.
+    """
+    numbers = {status: get_page_number(request.GET.get('%s_page' % status)) for status in TRACK_REQUEST_STATUSES}
+    pages_sql = ', '.join(['(%s::varchar, %s::integer)'] * len(TRACK_REQUEST_STATUSES))
+    page_params = []
+
+    for status in TRACK_REQUEST_STATUSES:
+        page_params.extend([status, (numbers[status] - 1) * TRACK_REQUEST_PAGE_SIZE])
+
+    track_requests = TrackRequest.objects.select_related('track__song', 'created_by').extra(
+        where=[PAGED_TRACK_REQUESTS_SQL.format(track_request_filter=track_request_filter, pages=pages_sql)],
+        params=list(params) + page_params + [TRACK_REQUEST_PAGE_SIZE + 1]
+    ).order_by('-created', '-id')
+
+    grouped = {status: [] for status in TRACK_REQUEST_STATUSES}
+
+    for track_request in track_requests:
+        grouped[track_request.status].append(track_request)
+
+    return {status: StatusPage(request, status, numbers[status], grouped[status][:TRACK_REQUEST_PAGE_SIZE],
+                               len(grouped[status]) > TRACK_REQUEST_PAGE_SIZE)
+            for status in TRACK_REQUEST_STATUSES}
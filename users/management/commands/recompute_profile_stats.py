@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from users.stats import recompute_profile_stats
+
+
+class Command(BaseCommand):
+    help = 'Recounts the profile counters of every user in bulk and fixes the ones that drifted'
+
+    def handle(self, *args, **options):
+        self.stdout.write('fixed %d drifted profiles' % recompute_profile_stats())
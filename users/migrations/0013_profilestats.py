@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0012_follower'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True,
+                                              serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('song_count', models.IntegerField(default=0)),
+                ('skill_count', models.IntegerField(default=0)),
+                ('contribution_count', models.IntegerField(default=0)),
+                ('pending_track_request_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'users_profile_stats',
+            },
+        ),
+    ]
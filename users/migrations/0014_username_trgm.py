@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0013_profilestats'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ['CREATE EXTENSION IF NOT EXISTS pg_trgm'],
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            ['CREATE INDEX users_username_trgm ON auth_user USING GIN (username gin_trgm_ops)'],
+            ['DROP INDEX users_username_trgm'],
+        ),
+    ]
@@ -4,23 +4,37 @@ from django.views.generic.base import ContextMixin
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
 from django.shortcuts import redirect
+from melody_buddy.cache import AnonymousPageCacheMixin, get_user_id, get_version_key
 
-from songs.models import TrackRequest
+from .stats import get_profile_stats
 
 
 class ProfileMixin(ContextMixin):
+    def get_view_user(self):
+        if not hasattr(self, 'view_user'):
+            self.view_user = User.objects.select_related('profile', 'profilestats').get(
+                username=self.kwargs['username'])
+
+        return self.view_user
+
     def get_context_data(self, **kwargs):
         context = super(ProfileMixin, self).get_context_data(**kwargs)
-        user = User.objects.get(username=self.kwargs['username'])
+        user = self.get_view_user()
+        profile_stats = get_profile_stats(user)
 
         context['view_user'] = user
-        context['pending_track_request_count'] = TrackRequest.objects.filter(
-            track__created_by=user, status='pending').count()
-        context['skill_count'] = user.skill_set.count()
-        context['song_count'] = user.song_set.count()
+        context['pending_track_request_count'] = profile_stats.pending_track_request_count
+        context['skill_count'] = profile_stats.skill_count
+        context['song_count'] = profile_stats.song_count
+        context['contribution_count'] = profile_stats.contribution_count
         return context
 
 
+class ProfilePageCacheMixin(AnonymousPageCacheMixin):
+    def get_page_cache_version_keys(self):
+        return [get_version_key('user', get_user_id(self.kwargs['username']))]
+
+
 class HasAccessToRestrictedUserProfile(object):
     def get_redirect_url(self):
         return reverse('users:detail', kwargs={
@@ -89,3 +89,14 @@ class Skill(models.Model):
 
     class Meta:
         unique_together = (("name", "user"),)
+
+
+class ProfileStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    song_count = models.IntegerField(default=0)
+    skill_count = models.IntegerField(default=0)
+    contribution_count = models.IntegerField(default=0)
+    pending_track_request_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'users_profile_stats'
@@ -0,0 +1,48 @@
+from difflib import SequenceMatcher
+
+from .models import Skill
+
+USER_MATCH_SQL = "auth_user.username %% %s OR auth_user.username ILIKE %s"
+USER_RANK_SQL = "GREATEST(similarity(auth_user.username, %s), CASE WHEN auth_user.username ILIKE %s THEN 1 ELSE 0 END)"
+
+INSTRUMENT_MIN_SIMILARITY = 0.6
+
+
+def search_users(queryset, query):
+    """
+    Narrows `queryset` to users whose username starts with or resembles `query`, best match first.
+    """
+    prefix = '%s%%' % query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    return queryset.extra(
+        select={'rank': USER_RANK_SQL},
+        select_params=(query, prefix),
+        where=[USER_MATCH_SQL],
+        params=(query, prefix)
+    ).order_by('-rank', 'username')
+
+
+def get_instrument_similarity(query, name):
+    query, name = query.lower(), name.lower()
+
+    if query in name:
+        return 1.0
+
+    return max(SequenceMatcher(None, query, word).ratio() for word in name.split() + [name])
+
+
+def search_instruments(query):
+    """
+    Returns the (value, name) of every instrument whose name contains or resembles `query`, best match first. The
+    instruments are a fixed list, so they are matched in python rather than in the database.
+    """
+    matches = []
+
+    for category, instruments in Skill.SKILL_CHOICES:
+        for value, name in instruments:
+            similarity = get_instrument_similarity(query, name)
+
+            if similarity >= INSTRUMENT_MIN_SIMILARITY:
+                matches.append((similarity, value, name))
+
+    return [(value, name) for similarity, value, name in sorted(matches, key=lambda match: -match[0])]
@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from melody_buddy.cache import bump_user_versions, set_user_id
+from songs.models import Song, TrackRequest
+from .models import Profile, ProfileStats, Skill
+from .stats import update_profile_stats
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ProfileStats.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Song)
+def song_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_profile_stats({'user_id': instance.created_by_id}, song_count=1)
+
+
+@receiver(post_delete, sender=Song)
+def song_deleted(sender, instance, **kwargs):
+    update_profile_stats({'user_id': instance.created_by_id}, song_count=-1)
+
+
+@receiver(post_save, sender=Skill)
+def skill_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_profile_stats({'user_id': instance.user_id}, skill_count=1)
+
+
+@receiver(post_delete, sender=Skill)
+def skill_deleted(sender, instance, **kwargs):
+    update_profile_stats({'user_id': instance.user_id}, skill_count=-1)
+
+
+@receiver(post_init, sender=TrackRequest)
+def track_request_loaded(sender, instance, **kwargs):
+    instance._counted_status = instance.status if instance.pk else None
+
+
+@receiver(post_save, sender=TrackRequest)
+@receiver(post_delete, sender=TrackRequest)
+def track_request_counted(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+
+    deleted = kwargs['signal'] is post_delete
+    was_pending = instance._counted_status == 'pending'
+    is_pending = instance.status == 'pending' and not deleted
+
+    if created or deleted:
+        update_profile_stats({'user_id': instance.created_by_id}, contribution_count=-1 if deleted else 1)
+
+    if was_pending != is_pending:
+        update_profile_stats({'user__track': instance.track_id},
+                             pending_track_request_count=1 if is_pending else -1)
+
+    instance._counted_status = None if deleted else instance.status
+
+
+@receiver(post_save, sender=User)
+def user_cache_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        set_user_id(instance.username, instance.pk)
+        bump_user_versions(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def profile_cache_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_user_versions(instance.user_id)
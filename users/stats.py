@@ -0,0 +1,75 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import F
+
+from songs.models import Song, Track, TrackRequest
+from .models import ProfileStats, Skill
+
+PROFILE_STATS_FIELDS = ('song_count', 'skill_count', 'contribution_count', 'pending_track_request_count')
+
+# recounts every profile and only writes the rows that drifted from their counts
+RECOMPUTE_PROFILE_STATS_SQL = '''
+    INSERT INTO {profile_stats} (user_id, song_count, skill_count, contribution_count, pending_track_request_count)
+    SELECT id, 0, 0, 0, 0 FROM {user}
+    WHERE id NOT IN (SELECT user_id FROM {profile_stats}) {user_filter};
+
+    UPDATE {profile_stats} AS stats
+    SET song_count = counts.song_count,
+        skill_count = counts.skill_count,
+        contribution_count = counts.contribution_count,
+        pending_track_request_count = counts.pending_track_request_count
+    FROM (
+        SELECT {user}.id AS user_id,
+            (SELECT COUNT(*) FROM {song} WHERE created_by_id = {user}.id) AS song_count,
+            (SELECT COUNT(*) FROM {skill} WHERE user_id = {user}.id) AS skill_count,
+            (SELECT COUNT(*) FROM {track_request} WHERE created_by_id = {user}.id) AS contribution_count,
+            (SELECT COUNT(*) FROM {track_request} JOIN {track} ON {track}.id = {track_request}.track_id
+             WHERE {track}.created_by_id = {user}.id AND {track_request}.status = 'pending'
+            ) AS pending_track_request_count
+        FROM {user}
+        WHERE TRUE {user_filter}
+    ) AS counts
+    WHERE stats.user_id = counts.user_id
+        AND (stats.song_count, stats.skill_count, stats.contribution_count, stats.pending_track_request_count)
+        IS DISTINCT FROM
+        (counts.song_count, counts.skill_count, counts.contribution_count, counts.pending_track_request_count)
+'''
+
+
+def update_profile_stats(user_filter, **deltas):
+    """
+    Adds `deltas` to the counters of the profiles matching `user_filter` in the database, never in python, so
+    concurrent changes do not overwrite each other.
+    """
+    ProfileStats.objects.filter(**user_filter).update(
+        **{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def recompute_profile_stats(user_ids=None):
+    """
+    Returns how many profiles had counters that drifted from the rows they count.
+    """
+    user_filter, params = '', []
+
+    if user_ids is not None:
+        user_filter, params = 'AND %s.id IN %%s' % User._meta.db_table, [tuple(user_ids) or (None,)]
+
+    sql = RECOMPUTE_PROFILE_STATS_SQL.format(
+        profile_stats=ProfileStats._meta.db_table, user=User._meta.db_table, song=Song._meta.db_table,
+        skill=Skill._meta.db_table, track=Track._meta.db_table, track_request=TrackRequest._meta.db_table,
+        user_filter=user_filter)
+    insert_sql, update_sql = sql.split(';')
+
+    with connection.cursor() as cursor:
+        cursor.execute(insert_sql, params)
+        cursor.execute(update_sql, params)
+        return cursor.rowcount
+
+
+def get_profile_stats(user):
+    try:
+        return user.profilestats
+    except ProfileStats.DoesNotExist:
+        # profiles created before the stats table existed are counted the first time they are viewed
+        recompute_profile_stats([user.pk])
+        return ProfileStats.objects.get(user=user)
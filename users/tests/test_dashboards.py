@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from songs.models import Song, Track, TrackRequest
+from ..dashboards import TRACK_REQUEST_PAGE_SIZE
+
+
+class TrackRequestDashboardTestCase(TestCase):
+    def setUp(self):
+        self.user_creator = User.objects.create_user(username='creator', password='password')
+        self.user_contributor = User.objects.create_user(username='contributor', password='password')
+        song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='bass', created_by=self.user_creator, song=song, public=True)
+
+        for index in range(TRACK_REQUEST_PAGE_SIZE + 2):
+            TrackRequest.objects.create(track=self.track, created_by=self.user_contributor, status='pending')
+
+        self.approved = TrackRequest.objects.create(track=self.track, created_by=self.user_contributor,
+                                                    status='approved')
+
+    def test_track_requests_page_each_status(self):
+        self.client.login(username='creator', password='password')
+        url = reverse('users:track_requests', kwargs={'username': 'creator'})
+        pending = list(TrackRequest.objects.filter(status='pending').order_by('-created', '-id'))
+
+        # session, auth user, profile user, track requests of every status
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.context['pending_track_request_list'], pending[:TRACK_REQUEST_PAGE_SIZE])
+        self.assertEqual(response.context['approved_track_request_list'], [self.approved])
+        self.assertEqual(response.context['declined_track_request_list'], [])
+        self.assertIn('pending_page=2', response.context['pending_page'].next_url())
+        self.assertIsNone(response.context['approved_page'].next_url())
+
+        response = self.client.get(url, {'pending_page': 2})
+        self.assertEqual(response.context['pending_track_request_list'], pending[TRACK_REQUEST_PAGE_SIZE:])
+        self.assertEqual(response.context['approved_track_request_list'], [self.approved])
+
+    def test_contributions_page_each_status(self):
+        url = reverse('users:contributions', kwargs={'username': 'contributor'})
+
+        response = self.client.get(url, {'pending_page': 2, 'approved_page': 2})
+        self.assertEqual(len(response.context['pending_contribution_list']), 2)
+        self.assertEqual(response.context['approved_contribution_list'], [])
+
+        response = self.client.get(reverse('users:contributions', kwargs={'username': 'creator'}))
+        self.assertEqual(response.context['pending_contribution_list'], [])
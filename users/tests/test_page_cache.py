@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from melody_buddy.cache import get_version_key, get_versions
+from songs.models import Song, Track, TrackRequest
+from ..models import Skill
+
+
+class PageCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user_creator = User.objects.create_user(username='creator', password='password')
+        self.user_contributor = User.objects.create_user(username='contributor', password='password')
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song,
+                                          public=True)
+
+    def get_version(self, scope, pk):
+        return get_versions([get_version_key(scope, pk)])[0]
+
+    def test_versions_follow_rows(self):
+        song_version = self.get_version('song', self.song.pk)
+        creator_version = self.get_version('user', self.user_creator.pk)
+        contributor_version = self.get_version('user', self.user_contributor.pk)
+
+        TrackRequest.objects.create(track=self.track, created_by=self.user_contributor)
+
+        self.assertGreater(self.get_version('song', self.song.pk), song_version)
+        self.assertGreater(self.get_version('user', self.user_creator.pk), creator_version)
+        self.assertGreater(self.get_version('user', self.user_contributor.pk), contributor_version)
+
+        contributor_version = self.get_version('user', self.user_contributor.pk)
+        Skill.objects.create(user=self.user_contributor, name='guitar_bass')
+        self.assertGreater(self.get_version('user', self.user_contributor.pk), contributor_version)
+
+    def test_anonymous_profile_page_is_served_from_cache(self):
+        url = reverse('users:skills', kwargs={'username': self.user_contributor.username})
+        response = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url)
+
+        self.assertEqual(cached_response.content, response.content)
+
+        Skill.objects.create(user=self.user_contributor, name='guitar_bass')
+        response = self.client.get(url)
+        self.assertContains(response, 'Bass Guitar')
+
+    def test_signed_in_profile_page_is_not_cached(self):
+        self.client.login(username='creator', password='password')
+        url = reverse('users:skills', kwargs={'username': self.user_contributor.username})
+        self.client.get(url)
+
+        with self.assertNumQueries(4):
+            self.client.get(url)
@@ -0,0 +1,58 @@
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from songs.models import Song, Track, TrackRequest
+from ..models import ProfileStats, Skill
+from ..stats import recompute_profile_stats
+
+
+class ProfileStatsTestCase(TestCase):
+    def setUp(self):
+        self.user_creator = User.objects.create_user(username='creator', password='password')
+        self.user_contributor = User.objects.create_user(username='contributor', password='password')
+        self.song = Song.objects.create(title='song title', created_by=self.user_creator)
+        self.track = Track.objects.create(instrument='bass', created_by=self.user_creator, song=self.song,
+                                          public=True)
+
+    def get_stats(self, user):
+        return ProfileStats.objects.values_list(
+            'song_count', 'skill_count', 'contribution_count', 'pending_track_request_count').get(user=user)
+
+    def test_counters_follow_rows(self):
+        Skill.objects.create(user=self.user_creator, name='guitar_bass')
+        track_request = TrackRequest.objects.create(track=self.track, created_by=self.user_contributor)
+
+        self.assertEqual(self.get_stats(self.user_creator), (1, 1, 0, 1))
+        self.assertEqual(self.get_stats(self.user_contributor), (0, 0, 1, 0))
+
+        track_request.status = 'approved'
+        track_request.save()
+        self.assertEqual(self.get_stats(self.user_creator), (1, 1, 0, 0))
+
+        TrackRequest.objects.create(track=self.track, created_by=self.user_contributor)
+        self.song.delete()
+        self.assertEqual(self.get_stats(self.user_creator), (0, 1, 0, 0))
+        self.assertEqual(self.get_stats(self.user_contributor), (0, 0, 0, 0))
+
+    def test_recompute_fixes_drifted_and_missing_rows(self):
+        TrackRequest.objects.create(track=self.track, created_by=self.user_contributor)
+        ProfileStats.objects.filter(user=self.user_creator).update(song_count=7, pending_track_request_count=0)
+        ProfileStats.objects.filter(user=self.user_contributor).delete()
+
+        self.assertEqual(recompute_profile_stats(), 2)
+        self.assertEqual(self.get_stats(self.user_creator), (1, 0, 0, 1))
+        self.assertEqual(self.get_stats(self.user_contributor), (0, 0, 1, 0))
+        self.assertEqual(recompute_profile_stats(), 0)
+
+    def test_profile_pages_read_user_and_counters_together(self):
+        self.client.login(username='creator', password='password')
+        url = reverse('users:skills', kwargs={'username': 'creator'})
+        self.client.get(url)
+
+        # session, auth user, profile user with avatar and counters, skill list
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.context['song_count'], 1)
+        self.assertEqual(response.context['view_user'], self.user_creator)
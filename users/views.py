@@ -1,38 +1,47 @@
 from django.contrib.auth.models import User
 from django.views import generic
 from songs.models import Song, TrackRequest
+from songs.recommendations import get_songs_needing_user
+from songs.search import search_songs
 
-from .mixins import ProfileMixin, HasAccessToRestrictedUserProfile
+from .dashboards import get_track_request_pages
+from .mixins import ProfileMixin, ProfilePageCacheMixin, HasAccessToRestrictedUserProfile
 from .models import Skill
+from .search import search_instruments
 
 
-class Detail(ProfileMixin, generic.DetailView):
+class Detail(ProfilePageCacheMixin, ProfileMixin, generic.DetailView):
     model = User
     template_name = 'users/user_detail_overview.html'
     context_object_name = 'view_user'
 
     def get_object(self, queryset=None):
-        return User.objects.get(username=self.kwargs['username'])
+        return self.get_view_user()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        if self.object == self.request.user:
+            context['recommended_songs'] = get_songs_needing_user(self.object)
+
+        return context
 
 
-class SongIndex(ProfileMixin, generic.ListView):
+class SongIndex(ProfilePageCacheMixin, ProfileMixin, generic.ListView):
     template_name = 'users/user_detail_song_list.html'
     context_object_name = 'song_list'
 
     def get_queryset(self):
-        song_list_filter = {
-            'created_by__username': self.kwargs['username']
-        }
-
+        queryset = Song.objects.filter(created_by__username=self.kwargs['username'])
         title = self.request.GET.get('title')
 
         if title:
-            song_list_filter['title__icontains'] = self.request.GET.get('title')
+            queryset = search_songs(queryset, title)
 
-        return Song.objects.filter(**song_list_filter)
+        return queryset
 
 
-class SkillIndex(ProfileMixin, generic.ListView):
+class SkillIndex(ProfilePageCacheMixin, ProfileMixin, generic.ListView):
     model = Skill
     template_name = 'users/user_detail_skill_list.html'
     context_object_name = 'skill_list'
@@ -43,7 +52,8 @@ class SkillIndex(ProfileMixin, generic.ListView):
         name = self.request.GET.get('name')
 
         if name:
-            skill_list_filter['name__icontains'] = self.request.GET.get('name')
+            # skills are stored by value, so the search runs against the instrument names people see
+            skill_list_filter['name__in'] = [value for value, instrument in search_instruments(name)]
 
         return Skill.objects.filter(user__username=self.kwargs['username'], **skill_list_filter)
 
@@ -56,32 +66,42 @@ class TrackRequestIndex(HasAccessToRestrictedUserProfile,
     context_object_name = 'pending_track_request_list'
 
     def get_queryset(self):
-        return TrackRequest.objects.filter(track__song__created_by=self.request.user, status='pending')
+        self.track_request_pages = get_track_request_pages(
+            self.request,
+            'track_id IN (SELECT songs_track.id FROM songs_track '
+            'JOIN songs_song ON songs_song.id = songs_track.song_id WHERE songs_song.created_by_id = %s)',
+            [self.request.user.pk])
+
+        return self.track_request_pages['pending'].object_list
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        context['approved_track_request_list'] = TrackRequest.objects.filter(
-            track__song__created_by=self.request.user, status='approved')
-        context['declined_track_request_list'] = TrackRequest.objects.filter(
-            track__song__created_by=self.request.user, status='declined')
+
+        for status, page in self.track_request_pages.items():
+            context['%s_track_request_list' % status] = page.object_list
+            context['%s_page' % status] = page
 
         return context
 
 
-class ContributionIndex(ProfileMixin,
+class ContributionIndex(ProfilePageCacheMixin,
+                        ProfileMixin,
                         generic.ListView):
     model = TrackRequest
     template_name = 'users/user_detail_contribution_list.html'
     context_object_name = 'pending_contribution_list'
 
     def get_queryset(self):
-        return TrackRequest.objects.filter(created_by__username=self.kwargs['username'], status='pending')
+        self.contribution_pages = get_track_request_pages(self.request, 'created_by_id = %s',
+                                                          [self.get_view_user().pk])
+
+        return self.contribution_pages['pending'].object_list
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        context['approved_contribution_list'] = TrackRequest.objects.filter(
-            created_by__username=self.kwargs['username'], status='approved')
-        context['declined_contribution_list'] = TrackRequest.objects.filter(
-            created_by__username=self.kwargs['username'], status='declined')
+
+        for status, page in self.contribution_pages.items():
+            context['%s_contribution_list' % status] = page.object_list
+            context['%s_page' % status] = page
 
         return context